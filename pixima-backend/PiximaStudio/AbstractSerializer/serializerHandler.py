@@ -1,7 +1,8 @@
 from abc import abstractmethod, ABCMeta
 from rest_framework.serializers import Serializer
 from Core.models import ImageModel
-from PiximaStudio.settings import MEDIA_ROOT
+from PiximaStudio.MediaLayout import media_path
+from PiximaTools.DeltaHistory import version_exists
 from . import serializer
 import os
 
@@ -23,6 +24,8 @@ class ImageSerializerHandler(SerializerHandler):
         preview_optinos: list = None,
     ) -> None:
         super().__init__(serializer)
+        # The Validated ImageModel, Views Use It Instead Of Fetching It Again
+        self.instance = None
         if preview_optinos is None:
             self.preview_options = ["None", "Low", "Mid", "High"]
 
@@ -33,11 +36,7 @@ class ImageSerializerHandler(SerializerHandler):
             return True
         return (
             True
-            if os.path.exists(
-                os.path.join(
-                    MEDIA_ROOT, "Images", str(directory_id), str(index) + ".jpg"
-                )
-            )
+            if version_exists(media_path("Images", directory_id, f"{index}.jpg"))
             else False
         )
 
@@ -51,9 +50,7 @@ class ImageSerializerHandler(SerializerHandler):
                 self.errors = {"Message": "Both id and Image Can't Be Null"}
                 return False
             try:
-                query_set = ImageModel.objects.get(id=self.serializer.data["id"])
-                if not query_set:
-                    raise ImageModel.DoesNotExist()
+                self.instance = ImageModel.objects.get(id=self.serializer.data["id"])
             except ImageModel.DoesNotExist as ex:
                 self.errors = {"Message": "Id Not Found"}
                 return False
@@ -1,3 +1,100 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from django.test import SimpleTestCase
+from PIL import Image
+from PiximaTools import Tiling, BasicTools
+from PiximaTools.BasicTools import ResizeTool, FlipTool, ContrastTool
+import cv2
+import numpy as np
 
-# Create your tests here.
+
+def smooth_image(height, width, seed=0):
+    "Noise Blurred Into Gradients, Cubic Resampling Of It Is Well Conditioned"
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 256, (height, width, 3)).astype(np.uint8)
+    return cv2.GaussianBlur(image, (0, 0), 3)
+
+
+def vertical_blur(image):
+    return cv2.blur(image, (1, 5))
+
+
+class MapBandsTests(SimpleTestCase):
+    def test_halo_matches_whole_frame(self):
+        image = np.random.default_rng(1).integers(0, 256, (50, 20, 3), np.uint8)
+        expected = vertical_blur(image)
+        for rows in (1, 7, 16, 50):
+            tiled = Tiling.map_bands(image, vertical_blur, halo=2, rows=rows)
+            np.testing.assert_array_equal(tiled, expected)
+        # Without The Halo The Band Edges Are Blurred Against The Border
+        tiled = Tiling.map_bands(image, vertical_blur, rows=7)
+        self.assertFalse(np.array_equal(tiled, expected))
+
+    def test_others_and_in_place(self):
+        image = np.zeros((30, 10, 3), np.uint8)
+        mask = np.zeros((30, 10), bool)
+        mask[5:25, 2:4] = True
+
+        def paint(band, band_mask):
+            band[band_mask] = 200
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            result = Tiling.map_bands(
+                image, paint, mask, destination=image, rows=4, executor=executor
+            )
+        self.assertIs(result, image)
+        np.testing.assert_array_equal(image[..., 0] == 200, mask)
+
+    def test_parallel_equals_serial(self):
+        image = smooth_image(120, 80)
+        expected = cv2.convertScaleAbs(image, alpha=1.4, beta=10)
+        with mock.patch.object(Tiling, "BAND_MIN_MEGAPIXELS", 0), mock.patch.object(
+            Tiling, "band_workers", 4
+        ):
+            result = Tiling.parallel(
+                image, lambda band: cv2.convertScaleAbs(band, alpha=1.4, beta=10)
+            )
+        np.testing.assert_array_equal(result, expected)
+
+    def test_mask_box(self):
+        mask = np.zeros((20, 30), bool)
+        self.assertIsNone(Tiling.mask_box(mask))
+        mask[3:9, 11:12] = True
+        mask[7, 20] = True
+        self.assertEqual(tuple(map(int, Tiling.mask_box(mask))), (3, 9, 11, 21))
+
+
+@mock.patch.object(Tiling, "TILING_MIN_MEGAPIXELS", 0.001)
+class TiledToolTests(SimpleTestCase):
+    def test_allocate_and_spill_are_memory_mapped(self):
+        image = smooth_image(64, 48)
+        self.assertIsInstance(Tiling.allocate((64, 48, 3)), np.memmap)
+        self.assertNotIsInstance(Tiling.allocate((8, 8, 3)), np.memmap)
+        spilled = Tiling.spill(Image.fromarray(image), rows=10)
+        self.assertIsInstance(spilled, np.memmap)
+        np.testing.assert_array_equal(spilled, image)
+        self.assertIsNone(Tiling.spill(Image.fromarray(image).convert("L")))
+
+    def test_tiled_resize_matches_resize(self):
+        image = smooth_image(300, 200)
+        for width, height in ((90, 70), (200, 300), (310, 450)):
+            expected = cv2.resize(image, (width, height), interpolation=cv2.INTER_CUBIC)
+            with mock.patch.object(BasicTools, "TILE_ROWS", 32):
+                tiled = ResizeTool.tiled_resize(image, width, height)
+            self.assertEqual(tiled.shape, expected.shape)
+            difference = np.abs(tiled.astype(int) - expected.astype(int))
+            # warpAffine And resize Round Their Interpolation Weights Differently
+            self.assertLessEqual(difference.max(), 2)
+
+    def test_tiled_tools_match_whole_frame(self):
+        # Several TILE_ROWS Bands
+        image = smooth_image(3 * Tiling.TILE_ROWS + 17, 12)
+        for direction in ("Hor", "Ver"):
+            tiled = FlipTool(direction).add_image(image.copy()).apply()
+            self.assertIsInstance(tiled.Image, np.memmap)
+            code = 0 if direction == "Hor" else 1
+            np.testing.assert_array_equal(tiled.Image, cv2.flip(image, code))
+        tiled = ContrastTool(contrast=70, brightness=5).add_image(image).apply()
+        np.testing.assert_array_equal(
+            tiled.Image, cv2.convertScaleAbs(image, alpha=70 / 50, beta=5)
+        )
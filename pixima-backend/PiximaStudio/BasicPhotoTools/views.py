@@ -22,7 +22,7 @@ from PiximaTools.BasicTools import (
     RotatTool,
     SaturationTool,
 )
-from Core.models import ImageModel, ImageOperationsModel
+from Core.models import ImageOperationsModel
 from PiximaStudio.AbstractView import RESTView
 
 
@@ -33,9 +33,8 @@ class CropToolView(RESTView):
         im_handler = CropImageSerializerHandler(crop_serializer)
         try:
             if "Image" in request.data.keys() and request.data["Image"] != "":
-                crop_tool.request2data(request=request).apply()
-                image_path = crop_tool.save_image()
-                imagepreview_path = crop_tool.get_preview()
+                crop_tool.request2data(request=request).process()
+                image_path, imagepreview_path = crop_tool.save_outputs()
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -43,17 +42,16 @@ class CropToolView(RESTView):
                     }
                 )
             if im_handler.handle():
-                image_path = (
-                    crop_tool.serializer2data(serializer=crop_serializer)
+                image_path, imagepreview_path = (
+                    crop_tool.add_image_model(im_handler.instance)
+                    .serializer2data(serializer=crop_serializer)
                     .read_image()
-                    .apply()
-                    .save_image()
+                    .process()
+                    .save_outputs()
                 )
-                imagepreview_path = crop_tool.get_preview()
-                ImageObj = ImageModel.objects.get(id=crop_serializer["id"].value)
                 ImageOperationsModel.objects.create(
-                    image=ImageObj, operation_name="CropTool"
-                ).save()
+                    image=im_handler.instance, operation_name="CropTool"
+                )
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -72,9 +70,8 @@ class FlipToolView(RESTView):
         im_handler = FlipImageSerializerHandler(flip_serializer)
         try:
             if "Image" in request.data.keys() and request.data["Image"] != "":
-                flip_tool.request2data(request=request).apply()
-                image_path = flip_tool.save_image()
-                imagepreview_path = flip_tool.get_preview()
+                flip_tool.request2data(request=request).process()
+                image_path, imagepreview_path = flip_tool.save_outputs()
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -82,16 +79,15 @@ class FlipToolView(RESTView):
                     }
                 )
             if im_handler.handle():
-                image_path = (
-                    flip_tool.serializer2data(flip_serializer)
-                    .read_image()()
-                    .save_image()
+                image_path, imagepreview_path = (
+                    flip_tool.add_image_model(im_handler.instance)
+                    .serializer2data(flip_serializer)
+                    .read_image().process()
+                    .save_outputs()
                 )
-                imagepreview_path = flip_tool.get_preview()
-                ImageObj = ImageModel.objects.get(id=flip_serializer["id"].value)
                 ImageOperationsModel.objects.create(
-                    image=ImageObj, operation_name="FlipTool"
-                ).save()
+                    image=im_handler.instance, operation_name="FlipTool"
+                )
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -110,25 +106,23 @@ class RotateToolView(RESTView):
         im_handler = RotateImageSerializerHandler(rotate_serializer)
         try:
             if "Image" in request.data.keys() and request.data["Image"] != "":
-                rotate_tool.request2data(request=request).apply()
-                image_path = rotate_tool.save_image()
-                imagepreview_path = rotate_tool.get_preview()
+                rotate_tool.request2data(request=request).process()
+                image_path, imagepreview_path = rotate_tool.save_outputs()
                 return self.ok_request({
                         "Image": image_path,
                         "ImagePreview": imagepreview_path,
                     }
                 )
             if im_handler.handle():
-                image_path = (
-                    rotate_tool.serializer2data(rotate_serializer)
-                    .read_image()()
-                    .save_image()
+                image_path, imagepreview_path = (
+                    rotate_tool.add_image_model(im_handler.instance)
+                    .serializer2data(rotate_serializer)
+                    .read_image().process()
+                    .save_outputs()
                 )
-                imagepreview_path = rotate_tool.get_preview()
-                ImageObj = ImageModel.objects.get(id=rotate_serializer["id"].value)
                 ImageOperationsModel.objects.create(
-                    image=ImageObj, operation_name="RotateTool"
-                ).save()
+                    image=im_handler.instance, operation_name="RotateTool"
+                )
                 return self.ok_request({
                         "Image": image_path,
                         "ImagePreview": imagepreview_path,
@@ -146,25 +140,23 @@ class ResizeToolView(RESTView):
         im_handler = ResizeImageSerializerHandler(resize_serializer)
         try:
             if "Image" in request.data.keys() and request.data["Image"] != "":
-                resize_tool.request2data(request=request).apply()
-                image_path = resize_tool.save_image()
-                imagepreview_path = resize_tool.get_preview()
+                resize_tool.request2data(request=request).process()
+                image_path, imagepreview_path = resize_tool.save_outputs()
                 return self.ok_request({
                         "Image": image_path,
                         "ImagePreview": imagepreview_path,
                     }
                 )
             if im_handler.handle():
-                image_path = (
-                    resize_tool.serializer2data(resize_serializer)
-                    .read_image()()
-                    .save_image()
+                image_path, imagepreview_path = (
+                    resize_tool.add_image_model(im_handler.instance)
+                    .serializer2data(resize_serializer)
+                    .read_image().process()
+                    .save_outputs()
                 )
-                imagepreview_path = resize_tool.get_preview()
-                ImageObj = ImageModel.objects.get(id=resize_serializer["id"].value)
                 ImageOperationsModel.objects.create(
-                    image=ImageObj, operation_name="ResizeTool"
-                ).save()
+                    image=im_handler.instance, operation_name="ResizeTool"
+                )
                 return self.ok_request({
                         "Image": image_path,
                         "ImagePreview": imagepreview_path,
@@ -183,26 +175,24 @@ class ContrastToolView(RESTView):
         im_handler = ContrastImageSerializerHandler(contrast_serializer)
         try:
             if "Image" in request.data.keys() and request.data["Image"] != "":
-                contrast_tool.request2data(request=request)()
-                image_path = contrast_tool.save_image()
-                imagepreview_path = contrast_tool.get_preview()
+                contrast_tool.request2data(request=request).process()
+                image_path, imagepreview_path = contrast_tool.save_outputs()
                 return self.ok_request({
                         "Image": image_path,
                         "ImagePreview": imagepreview_path,
                     }
                 )
             if im_handler.handle():
-                image_path = (
-                    contrast_tool.serializer2data(contrast_serializer)
+                image_path, imagepreview_path = (
+                    contrast_tool.add_image_model(im_handler.instance)
+                    .serializer2data(contrast_serializer)
                     .read_image()
-                    .apply()
-                    .save_image()
+                    .process()
+                    .save_outputs()
                 )
-                imagepreview_path = contrast_tool.get_preview()
-                ImageObj = ImageModel.objects.get(id=contrast_serializer["id"].value)
                 ImageOperationsModel.objects.create(
-                    image=ImageObj, operation_name="ContrastTool"
-                ).save()
+                    image=im_handler.instance, operation_name="ContrastTool"
+                )
                 return self.ok_request({
                         "Image": image_path,
                         "ImagePreview": imagepreview_path,
@@ -223,26 +213,24 @@ class SaturationToolView(RESTView):
         im_handler = SaturationImageSerializerHandler(saturation_serializer)
         try:
             if "Image" in request.data.keys() and request.data["Image"] != "":
-                saturation_tool.request2data(request=request)()
-                image_path = saturation_tool.save_image()
-                imagepreview_path = saturation_tool.get_preview()
+                saturation_tool.request2data(request=request).process()
+                image_path, imagepreview_path = saturation_tool.save_outputs()
                 return self.ok_request({
                         "Image": image_path,
                         "ImagePreview": imagepreview_path,
                     }
                 )
             if im_handler.handle():
-                image_path = (
-                    saturation_tool.serializer2data(saturation_serializer)
+                image_path, imagepreview_path = (
+                    saturation_tool.add_image_model(im_handler.instance)
+                    .serializer2data(saturation_serializer)
                     .read_image()
-                    .apply()
-                    .save_image()
+                    .process()
+                    .save_outputs()
                 )
-                imagepreview_path = saturation_tool.get_preview()
-                ImageObj = ImageModel.objects.get(id=saturation_serializer["id"].value)
                 ImageOperationsModel.objects.create(
-                    image=ImageObj, operation_name="SaturationTool"
-                ).save()
+                    image=im_handler.instance, operation_name="SaturationTool"
+                )
                 return self.ok_request({
                         "Image": image_path,
                         "ImagePreview": imagepreview_path,
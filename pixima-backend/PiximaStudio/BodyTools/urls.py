@@ -1,5 +1,7 @@
 from django.urls import path
 from . import views
+from PiximaStudio.AbstractView import tool_view
+
 urlpatterns = [
-    path('api-colorhair_tool',views.ColorHairToolView.as_view(),name='HairToolAPI')
+    path('api-colorhair_tool',tool_view(views.ColorHairToolView),name='HairToolAPI')
 ]
\ No newline at end of file
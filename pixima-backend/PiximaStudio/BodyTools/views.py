@@ -4,7 +4,7 @@ from .serializer import ColorHairSerializer
 from .serializerHandler import ColorHairSerializerHandler
 from PiximaTools.Exceptions import RequiredValue, NoFace
 from PiximaTools.BodyTools import HairTool
-from Core.models import ImageModel,ImageOperationsModel
+from Core.models import ImageOperationsModel
 
 class ColorHairToolView(RESTView):
     def post(self, request, format=None):
@@ -13,10 +13,10 @@ class ColorHairToolView(RESTView):
         colorhair_serializerhandler = ColorHairSerializerHandler(colorhair_serializer)
         try:
             if "Image" in request.data.keys() and request.data["Image"] != "":
-                hair_tool.request2data(request=request)()
-                image_path = hair_tool.save_image()
-                imagepreview_path = hair_tool.get_preview()
-                mask_path = hair_tool.save_mask()
+                hair_tool.request2data(request=request).process()
+                image_path, imagepreview_path, mask_path = hair_tool.save_outputs(
+                    with_mask=True
+                )
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -25,14 +25,16 @@ class ColorHairToolView(RESTView):
                     }
                 )
             if colorhair_serializerhandler.handle():
-                hair_tool.serializer2data(colorhair_serializer).read_image().apply()
-                image_path = hair_tool.save_image()
-                imagepreview_path = hair_tool.get_preview()
-                mask_path = hair_tool.save_mask()
-                ImageObj = ImageModel.objects.get(id=colorhair_serializer["id"].value)
+                hair_tool.add_image_model(
+                    colorhair_serializerhandler.instance
+                ).serializer2data(colorhair_serializer).read_image().process()
+                image_path, imagepreview_path, mask_path = hair_tool.save_outputs(
+                    with_mask=True
+                )
                 ImageOperationsModel.objects.create(
-                    image=ImageObj, operation_name="ColorHairTool"
-                ).save()
+                    image=colorhair_serializerhandler.instance,
+                    operation_name="ColorHairTool",
+                )
                 return self.ok_request(
                     {
                         "Image": image_path,
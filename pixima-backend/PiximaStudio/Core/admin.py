@@ -3,4 +3,6 @@ from . import models
 
 # Register your models here.
 
-admin.site.register([models.ImageModel, models.ImageOperationsModel])
+admin.site.register(
+    [models.ImageModel, models.ImageOperationsModel, models.ImageVersion]
+)
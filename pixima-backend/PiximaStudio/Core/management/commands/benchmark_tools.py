@@ -0,0 +1,403 @@
+import json
+import os
+import platform
+import time
+import tracemalloc
+from types import SimpleNamespace
+from django.core.management.base import BaseCommand, CommandError
+from PiximaStudio.settings import BASE_DIR
+from PiximaTools import AI_Models, Tiling
+import numpy as np
+import cv2
+
+DEFAULT_BASELINE = os.path.join(BASE_DIR, "benchmarks", "tools_baseline.json")
+DEFAULT_RESOLUTIONS = ["640x480", "1920x1080", "4000x3000"]
+
+
+# Stand-In Models: Same Result Shapes As MediaPipe And The Segmentation DNNs,
+# Built From A Fixed Face Layout, So The Tools Run Their Full Code Path.
+# The Numbers Measure The Tools, Not The Models.
+
+
+def _landmarks(seed=0, count=478):
+    rng = np.random.default_rng(seed)
+    angles = rng.uniform(0, 2 * np.pi, count)
+    radii = np.sqrt(rng.uniform(0.05, 1, count))
+    return [
+        SimpleNamespace(
+            x=0.5 + 0.16 * r * np.cos(a), y=0.45 + 0.22 * r * np.sin(a), z=0.0
+        )
+        for a, r in zip(angles, radii)
+    ]
+
+
+class StandInFaceMesh:
+    def __init__(self):
+        self.face = SimpleNamespace(landmark=_landmarks())
+
+    def process(self, image):
+        return SimpleNamespace(multi_face_landmarks=[self.face])
+
+
+class StandInFaceDetection:
+    def __init__(self):
+        # Right Eye, Left Eye, Nose Tip, Mouth, Right Ear, Left Ear
+        keypoints = [
+            (0.44, 0.38),
+            (0.56, 0.38),
+            (0.5, 0.47),
+            (0.5, 0.56),
+            (0.36, 0.42),
+            (0.64, 0.42),
+        ]
+        self.detection = SimpleNamespace(
+            location_data=SimpleNamespace(
+                relative_bounding_box=SimpleNamespace(
+                    xmin=0.34, ymin=0.23, width=0.32, height=0.44
+                ),
+                relative_keypoints=[SimpleNamespace(x=x, y=y) for x, y in keypoints],
+            ),
+            score=[0.99],
+        )
+
+    def process(self, image):
+        return SimpleNamespace(detections=[self.detection])
+
+
+class StandInSelfieSegmentation:
+    def process(self, image):
+        h, w = image.shape[:2]
+        mask = np.zeros((h, w), np.float32)
+        cv2.ellipse(mask, (w // 2, h // 2), (w // 4, h // 2), 0, 0, 360, 1.0, -1)
+        return SimpleNamespace(segmentation_mask=mask)
+
+
+class StandInSegmentationModel:
+    def predict(self, input):
+        h, w, _ = input.shape
+        mask = np.zeros((h, w), np.float32)
+        cv2.ellipse(mask, (w // 2, h // 2), (w // 4, h // 3), 0, 0, 360, 1.0, -1)
+        return cv2.GaussianBlur(mask, (0, 0), 4)
+
+
+def stand_in_models():
+    return {
+        "face_mesh": StandInFaceMesh(),
+        "face_detection": StandInFaceDetection(),
+        "selfie_segmentation": StandInSelfieSegmentation(),
+        "face_segmentation": StandInSegmentationModel(),
+        "hair_segmentation": StandInSegmentationModel(),
+    }
+
+
+def real_models():
+    for model in AI_Models.registered_model_classes:
+        if not os.path.exists(model.default_path):
+            raise FileNotFoundError(model.default_path)
+    return {
+        "face_mesh": AI_Models.get_two_stage_face_mesh_model(),
+        "face_detection": AI_Models.get_face_detection_model(),
+        "selfie_segmentation": AI_Models.get_selfie_segmentation_model(),
+        "face_segmentation": AI_Models.FaceSegmentationModel.shared(),
+        "hair_segmentation": AI_Models.HairSegmentationModel.shared(),
+    }
+
+
+def tool_cases(models):
+    "Tool Name -> Factory Returning A Configured Tool Without An Image"
+    from PiximaTools import BasicTools, Filters
+    from PiximaTools.FaceTools import FaceTools, EyesTool, NoseTool
+    from PiximaTools.BodyTools import HairTool
+
+    def configured(tool, **attributes):
+        tool.__dict__.update(attributes)
+        return tool
+
+    return {
+        "CropTool": lambda: BasicTools.CropTool(ratio="4:3"),
+        "FlipTool": lambda: BasicTools.FlipTool("Hor"),
+        "RotatTool": lambda: BasicTools.RotatTool(angle=30).add_area_mode(
+            "constant"
+        ),
+        "ResizeTool": lambda: BasicTools.ResizeTool(width=720, high=480),
+        "ContrastTool": lambda: BasicTools.ContrastTool(contrast=30, brightness=20),
+        "SaturationTool": lambda: BasicTools.SaturationTool(saturation=60),
+        "GlitchFilter": lambda: Filters.GlitchFilter(),
+        # Fixed Center, The Face Key Lookup Needs The Real mediapipe Module
+        "CirclesFilter": lambda: Filters.CirclesFilter().add_center(200, 150),
+        "SmoothFaceTool": lambda: configured(
+            FaceTools.SmoothFaceTool(
+                faceDetector=models["face_detection"],
+                faceMeshDetector=models["face_mesh"],
+                face_segmentation=models["face_segmentation"],
+            ),
+            method="BiB",
+            kernal=9,
+            sigmax=75,
+            sigmay=75,
+        ),
+        "WhiteTeethTool": lambda: FaceTools.WhiteTeethTool(
+            faceMeshDetector=models["face_mesh"]
+        ),
+        "ColorLipsTool": lambda: FaceTools.ColorLipsTool(
+            faceMeshDetector=models["face_mesh"], saturation=40, color=170
+        ),
+        "SmileTool": lambda: FaceTools.SmileTool(faceMeshDetector=models["face_mesh"]),
+        "EyesColorTool": lambda: configured(
+            EyesTool.EyesColorTool(faceMeshDetector=models["face_mesh"]),
+            color=[100],
+            saturation=[60],
+        ),
+        "EyesResizeTool": lambda: EyesTool.EyesResizeTool(
+            faceDetector=models["face_detection"],
+            faceMeshDetector=models["face_mesh"],
+        ),
+        "NoseResizeTool": lambda: configured(
+            NoseTool.NoseResizeTool(faceDetector=models["face_detection"]),
+            factor=0.9,
+            radius=75,
+            x=0,
+            y=0,
+        ),
+        "ColorHairTool": lambda: HairTool.ColorHairTool(
+            faceDetector=models["face_detection"],
+            selfie_segmentation=models["selfie_segmentation"],
+            hair_seg_model=models["hair_segmentation"],
+            saturation=40,
+            color=20,
+        ),
+    }
+
+
+def synthetic_image(width, height, seed=0):
+    "Gradient Background, Skin Ellipse With Eyes And Lips, Sensor Noise"
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 1, width, dtype=np.float32)
+    y = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    red = 80 + 100 * x + 0 * y
+    green = 90 + 60 * y + 0 * x
+    blue = 140 - 60 * x * y
+    image = np.stack([red, green, blue], -1).astype(np.uint8)
+    cx, cy, s = width // 2, int(height * 0.45), min(width, height)
+    face_axes = (int(s * 0.16), int(s * 0.22))
+    cv2.ellipse(image, (cx, cy), face_axes, 0, 0, 360, (224, 172, 150), -1)
+    for side in (-1, 1):
+        eye = (cx + side * int(s * 0.06), cy - int(s * 0.05))
+        cv2.circle(image, eye, max(int(s * 0.018), 2), (70, 50, 40), -1)
+    lips_axes = (int(s * 0.05), int(s * 0.015))
+    cv2.ellipse(
+        image, (cx, cy + int(s * 0.11)), lips_axes, 0, 0, 360, (170, 60, 70), -1
+    )
+    noise = rng.normal(0, 4, image.shape)
+    return np.clip(image + noise, 0, 255).astype(np.uint8)
+
+
+def photo_image(path, width, height):
+    image = cv2.imread(path)
+    if image is None:
+        raise CommandError(f"Can Not Read Image {path}")
+    image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+class Command(BaseCommand):
+    help = "Benchmark Every PiximaTools Tool At Several Resolutions And Compare With A JSON Baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tools", nargs="+", default=None)
+        parser.add_argument(
+            "--resolutions", nargs="+", default=DEFAULT_RESOLUTIONS, help="WxH"
+        )
+        parser.add_argument("--repeats", type=int, default=5)
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument(
+            "--stand-in",
+            choices=["auto", "always", "never"],
+            default="auto",
+            help="Stand-In Models, auto Uses Them When mediapipe Or The .h5 Files Are Missing",
+        )
+        parser.add_argument(
+            "--image", default=None, help="A Face Photo Used Instead Of The Synthetic Image"
+        )
+        parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Write The Results As The New Baseline Instead Of Comparing",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.25,
+            help="Allowed Relative Slowdown Or Memory Growth Before Failing",
+        )
+        parser.add_argument("--output", default=None, help="Also Write Results Here")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            nargs="+",
+            default=None,
+            help="Band Thread Counts To Run Each Tool With (e.g. 1 4 8 16), "
+            "Reports The Speedup Over The First",
+        )
+
+    def handle(self, *args, **options):
+        stand_in = options["stand_in"] == "always"
+        if not stand_in:
+            try:
+                models = real_models()
+            except Exception as e:
+                if options["stand_in"] == "never":
+                    raise CommandError(f"Models Are Not Available: {e}")
+                self.stdout.write(self.style.WARNING(f"Using Stand-In Models ({e})"))
+                stand_in = True
+        if stand_in:
+            models = stand_in_models()
+        cases = tool_cases(models)
+        names = options["tools"] or list(cases)
+        unknown = set(names) - set(cases)
+        if unknown:
+            raise CommandError(
+                f"Unknown Tools {sorted(unknown)}, Choices {list(cases)}"
+            )
+
+        workers = options["workers"] or [None]
+        if any(count and count > (os.cpu_count() or 1) for count in workers):
+            self.stdout.write(
+                self.style.WARNING(
+                    f"More Workers Than The {os.cpu_count()} CPUs Of This Machine"
+                )
+            )
+        results = {}
+        for resolution in options["resolutions"]:
+            width, height = (int(v) for v in resolution.lower().split("x"))
+            if options["image"]:
+                image = photo_image(options["image"], width, height)
+            else:
+                image = synthetic_image(width, height)
+            for name in names:
+                for count in workers:
+                    # Keys Without A Worker Count Stay Comparable With Old Baselines
+                    key = f"{name}@{width}x{height}"
+                    if count is not None:
+                        Tiling.set_workers(count)
+                        key += f"/{count}w"
+                    try:
+                        results[key] = self.measure(cases[name], image, options)
+                    except Exception as e:
+                        results[key] = {"error": f"{type(e).__name__}: {e}"}
+                    results[key]["stand_in"] = stand_in
+                    self.report(key, results[key])
+                if len(workers) > 1:
+                    self.report_scaling(f"{name}@{width}x{height}", workers, results)
+
+        document = {
+            "machine": {
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+            },
+            "repeats": options["repeats"],
+            "workers": options["workers"],
+            "results": results,
+        }
+        if options["output"]:
+            self.write(options["output"], document)
+        if options["save_baseline"]:
+            self.write(options["baseline"], document)
+            self.stdout.write(
+                self.style.SUCCESS(f"Baseline Saved {options['baseline']}")
+            )
+            return
+        if os.path.exists(options["baseline"]):
+            self.compare(options["baseline"], results, options["threshold"])
+        else:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"No Baseline At {options['baseline']}, Run With --save-baseline"
+                )
+            )
+
+    def measure(self, factory, image, options):
+        for _ in range(options["warmup"]):
+            factory().add_image(image.copy()).apply()
+
+        durations = []
+        for _ in range(options["repeats"]):
+            tool = factory().add_image(image.copy())
+            started = time.perf_counter()
+            tool.apply()
+            durations.append((time.perf_counter() - started) * 1000)
+
+        # Separate Run, tracemalloc Slows Everything Down. numpy Buffers Are
+        # Traced, OpenCV's Own Allocations Are Not
+        tool = factory().add_image(image.copy())
+        tracemalloc.start()
+        try:
+            tool.apply()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "median_ms": float(np.median(durations)),
+            "p95_ms": float(np.percentile(durations, 95)),
+            "min_ms": float(np.min(durations)),
+            "peak_mb": peak / 2**20,
+        }
+
+    def report(self, key, result):
+        if "error" in result:
+            self.stdout.write(self.style.WARNING(f"{key}: {result['error']}"))
+            return
+        self.stdout.write(
+            f"{key}: median {result['median_ms']:.1f} ms, "
+            f"p95 {result['p95_ms']:.1f} ms, peak {result['peak_mb']:.1f} MB"
+        )
+
+    def report_scaling(self, key, workers, results):
+        "Median Of Each Worker Count And Its Speedup Over The First"
+        base = results[f"{key}/{workers[0]}w"].get("median_ms")
+        parts = []
+        for count in workers:
+            median = results[f"{key}/{count}w"].get("median_ms")
+            if median is None or base is None:
+                parts.append(f"{count}w failed")
+                continue
+            parts.append(f"{count}w {median:.1f} ms ({base / median:.2f}x)")
+        self.stdout.write(f"{key} scaling: " + ", ".join(parts))
+
+    def write(self, path, document):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+
+    def compare(self, path, results, threshold):
+        with open(path) as f:
+            baseline = json.load(f)["results"]
+        regressions = []
+        for key, result in results.items():
+            base = baseline.get(key)
+            if "error" in result:
+                # A Tool That Starts Raising Is The Worst Regression
+                passed = base is not None and "error" not in base
+                regressions.append(
+                    f"{key} error: {result['error']}"
+                    + (" (Passed In The Baseline)" if passed else "")
+                )
+                continue
+            if base is None or "error" in base:
+                continue
+            if base.get("stand_in") != result["stand_in"]:
+                # Stand-In And Real Model Numbers Are Not Comparable
+                continue
+            for metric in ("median_ms", "peak_mb"):
+                limit = base[metric] * (1 + threshold)
+                if result[metric] > limit:
+                    regressions.append(
+                        f"{key} {metric}: {result[metric]:.1f} > {base[metric]:.1f} "
+                        f"(+{100 * threshold:.0f}%)"
+                    )
+        if regressions:
+            raise CommandError("Performance Regressions:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS(f"No Regressions Against {path}"))
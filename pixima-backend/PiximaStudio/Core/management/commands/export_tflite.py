@@ -0,0 +1,122 @@
+import json
+import os
+from django.core.management.base import BaseCommand, CommandError
+from skimage.color import rgb2gray
+from PiximaTools.AI_Models import (
+    FaceSegmentationModel,
+    HairSegmentationModel,
+    KerasBackend,
+    TFLiteBackend,
+    tflite_path,
+)
+import numpy as np
+import cv2
+
+MODELS = {"face": FaceSegmentationModel, "hair": HairSegmentationModel}
+QUANTIZATIONS = ["none", "float16", "int8"]
+
+
+class Command(BaseCommand):
+    help = "Export The Segmentation DNNs To TFLite And Report The Accuracy Delta Against Keras"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--models", nargs="+", choices=list(MODELS), default=list(MODELS)
+        )
+        parser.add_argument("--quantization", choices=QUANTIZATIONS, default="none")
+        parser.add_argument(
+            "--images",
+            default=None,
+            help="Directory Of Sample Photos Used For int8 Calibration And The Report",
+        )
+        parser.add_argument("--samples", type=int, default=16)
+        parser.add_argument(
+            "--report", default=None, help="Also Write The Report As JSON To This Path"
+        )
+
+    def handle(self, *args, **options):
+        import tensorflow as tf
+
+        inputs = self.sample_inputs(options["images"], options["samples"])
+        quantization = options["quantization"]
+        report = {}
+        for name in options["models"]:
+            h5_path = MODELS[name].default_path
+            if not os.path.exists(h5_path):
+                raise CommandError(f"Model Not Found {h5_path}")
+            keras_backend = KerasBackend(h5_path)
+
+            converter = tf.lite.TFLiteConverter.from_keras_model(keras_backend.model)
+            if quantization == "float16":
+                converter.optimizations = [tf.lite.Optimize.DEFAULT]
+                converter.target_spec.supported_types = [tf.float16]
+            elif quantization == "int8":
+                converter.optimizations = [tf.lite.Optimize.DEFAULT]
+                converter.representative_dataset = lambda: (
+                    [x[np.newaxis].astype(np.float32)] for x in inputs
+                )
+            out_path = tflite_path(h5_path, quantization)
+            with open(out_path, "wb") as f:
+                f.write(converter.convert())
+
+            report[name] = {
+                "keras_path": h5_path,
+                "tflite_path": out_path,
+                "quantization": quantization,
+                "keras_bytes": os.path.getsize(h5_path),
+                "tflite_bytes": os.path.getsize(out_path),
+                **self.compare(keras_backend, TFLiteBackend(out_path), inputs),
+            }
+            self.stdout.write(
+                self.style.SUCCESS(f"{name}: {out_path}")
+                + "\n"
+                + "\n".join(f"  {k}: {v}" for k, v in report[name].items())
+            )
+
+        if options["report"]:
+            with open(options["report"], "w") as f:
+                json.dump(report, f, indent=2)
+
+    def sample_inputs(self, images_dir, samples):
+        "Same Preprocessing The Tools Use: Gray, 256x256, Values In [0, 1]"
+        inputs = []
+        if images_dir:
+            for name in sorted(os.listdir(images_dir)):
+                img = cv2.imread(os.path.join(images_dir, name))
+                if img is None:
+                    continue
+                gray = rgb2gray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+                inputs.append(
+                    cv2.resize(gray, (256, 256), interpolation=cv2.INTER_CUBIC)
+                )
+                if len(inputs) == samples:
+                    break
+        # Smooth Random Fields When No Photos Are Given
+        rng = np.random.default_rng(0)
+        while len(inputs) < samples:
+            field = cv2.GaussianBlur(rng.random((256, 256)), (0, 0), 8)
+            inputs.append(cv2.normalize(field, None, 0, 1, cv2.NORM_MINMAX))
+        return np.asarray(inputs, np.float32).reshape((-1, 256, 256, 1))
+
+    def binary_mask(self, output):
+        mask = cv2.normalize(output, None, 0, 255, cv2.NORM_MINMAX, cv2.CV_8U)
+        return cv2.threshold(mask, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1] > 0
+
+    def compare(self, keras_backend, tflite_backend, inputs):
+        keras_out = keras_backend.forward(inputs).reshape((-1, 256, 256))
+        tflite_out = np.concatenate(
+            [tflite_backend.forward(x[np.newaxis]) for x in inputs]
+        ).reshape((-1, 256, 256))
+        delta = np.abs(keras_out - tflite_out)
+        ious = []
+        for k, t in zip(keras_out, tflite_out):
+            k, t = self.binary_mask(k), self.binary_mask(t)
+            union = np.logical_or(k, t).sum()
+            ious.append(np.logical_and(k, t).sum() / union if union else 1.0)
+        return {
+            "samples": len(inputs),
+            "mean_abs_delta": float(delta.mean()),
+            "max_abs_delta": float(delta.max()),
+            "mean_mask_iou": float(np.mean(ious)),
+            "min_mask_iou": float(np.min(ious)),
+        }
@@ -0,0 +1,79 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from Core.models import ImageModel, ImageOperationsModel, ImageVersion, file_stats
+from PiximaStudio.MediaLayout import media_path
+from PiximaTools.DeltaHistory import version_shape
+
+
+class Command(BaseCommand):
+    help = (
+        "Index Version Files Saved Before image_versions Existed And Fill The "
+        "Size And Digest Of Versions Written Behind The Request"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--image", default=None, help="Only Index This Image Id")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        images = ImageModel.objects.all()
+        if options["image"]:
+            images = images.filter(pk=options["image"])
+            if not images.exists():
+                raise CommandError(f"No Image With Id {options['image']}")
+
+        created = completed = 0
+        for image in images.iterator():
+            directory = media_path("Images", image.id)
+            if not os.path.isdir(directory):
+                continue
+            indexed = {
+                version.index: version
+                for version in ImageVersion.objects.filter(image=image)
+            }
+            # Operation n Produced Version n
+            tools = dict(
+                ImageOperationsModel.objects.filter(image=image).values_list(
+                    "operation_num", "operation_name"
+                )
+            )
+            for file_name in os.listdir(directory):
+                stem = file_name.split(".")[0]
+                full_path = os.path.join(directory, file_name)
+                # Write-Behind Placeholders Are Empty Until The Encode Lands
+                if not stem.isdigit() or os.path.getsize(full_path) == 0:
+                    continue
+                index = int(stem)
+                version = indexed.get(index)
+                if version is not None and version.digest:
+                    continue
+                if options["dry_run"]:
+                    self.stdout.write(f"{image.id} {index} {file_name}")
+                elif version is not None:
+                    ImageVersion.objects.filter(pk=version.pk).update(
+                        **file_stats(full_path)
+                    )
+                else:
+                    # Delta Versions Are Indexed Under The .jpg The Media View Serves
+                    version_path = os.path.join(directory, f"{index}.jpg")
+                    height, width = version_shape(version_path)[:2]
+                    ImageVersion.objects.record(
+                        image.id,
+                        index,
+                        version_path,
+                        stored_path=full_path,
+                        width=width,
+                        height=height,
+                        tool="Upload" if index == 0 else tools.get(index),
+                    )
+                if version is None:
+                    created += 1
+                else:
+                    completed += 1
+
+        verb = "Would Index" if options["dry_run"] else "Indexed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {created} New Versions, {completed} Missing Digests"
+            )
+        )
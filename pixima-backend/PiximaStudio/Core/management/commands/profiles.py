@@ -0,0 +1,71 @@
+import io
+import json
+import os
+import pstats
+from django.core.management.base import BaseCommand, CommandError
+from PiximaStudio.settings import PROFILE_DIR
+
+
+class Command(BaseCommand):
+    help = "List And Summarize The Request Profiles Captured In PROFILE_DIR"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "name", nargs="?", default=None, help="Profile To Summarize (Or A Prefix)"
+        )
+        parser.add_argument("--tool", default=None, help="Only List This Tool/View")
+        parser.add_argument("--limit", type=int, default=25)
+        parser.add_argument(
+            "--sort", default="cumulative", choices=["cumulative", "tottime", "calls"]
+        )
+        parser.add_argument(
+            "--clear", action="store_true", help="Delete Every Captured Profile"
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.isdir(PROFILE_DIR):
+            self.stdout.write(f"No Profiles In {PROFILE_DIR}")
+            return
+        names = sorted(
+            f[: -len(".prof")] for f in os.listdir(PROFILE_DIR) if f.endswith(".prof")
+        )
+        if options["clear"]:
+            for f in os.listdir(PROFILE_DIR):
+                if f.endswith((".prof", ".json")):
+                    os.remove(os.path.join(PROFILE_DIR, f))
+            self.stdout.write(self.style.SUCCESS(f"Removed {len(names)} Profiles"))
+            return
+        if options["name"]:
+            return self.summarize(names, options)
+
+        for name in names:
+            tags = self.tags(name)
+            if options["tool"] and options["tool"] not in (
+                tags.get("tool"),
+                tags.get("view"),
+            ):
+                continue
+            self.stdout.write(
+                f"{name}  {tags.get('method', '')} {tags.get('path', '')} "
+                f"{tags.get('status', '')} {tags.get('duration_ms', '?')} ms"
+            )
+
+    def tags(self, name):
+        try:
+            with open(os.path.join(PROFILE_DIR, f"{name}.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def summarize(self, names, options):
+        matches = [name for name in names if name.startswith(options["name"])]
+        if not matches:
+            raise CommandError(f"No Profile Named {options['name']}")
+        name = matches[-1]
+        self.stdout.write(self.style.SUCCESS(name))
+        for key, value in self.tags(name).items():
+            self.stdout.write(f"  {key}: {value}")
+        summary = io.StringIO()
+        stats = pstats.Stats(os.path.join(PROFILE_DIR, f"{name}.prof"), stream=summary)
+        stats.strip_dirs().sort_stats(options["sort"]).print_stats(options["limit"])
+        self.stdout.write(summary.getvalue())
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+from PiximaStudio.MediaGC import MediaSweeper, SweepLocked, media_sweeper
+
+
+def megabytes(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Evict Old Previews, Masks And Versions From MEDIA_ROOT And Enforce The "
+        "Media Quota, Limits Default To The Media Retention Settings"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--preview-ttl", type=float, default=None, help="Seconds")
+        parser.add_argument("--mask-ttl", type=float, default=None, help="Seconds")
+        parser.add_argument("--orphan-ttl", type=float, default=None, help="Seconds")
+        parser.add_argument("--max-versions", type=int, default=None)
+        parser.add_argument("--quota-mb", type=float, default=None)
+
+    def handle(self, *args, **options):
+        sweeper = MediaSweeper(
+            media_sweeper.root,
+            self.option(options, "preview_ttl", media_sweeper.preview_ttl_s),
+            self.option(options, "mask_ttl", media_sweeper.mask_ttl_s),
+            self.option(options, "orphan_ttl", media_sweeper.orphan_ttl_s),
+            self.option(options, "max_versions", media_sweeper.max_versions),
+            (
+                int(options["quota_mb"] * 1024 * 1024)
+                if options["quota_mb"] is not None
+                else media_sweeper.quota_bytes
+            ),
+            0,
+        )
+        try:
+            report = sweeper.locked_sweep(dry_run=options["dry_run"])
+        except SweepLocked as e:
+            raise CommandError(str(e))
+
+        verb = "Would Reclaim" if options["dry_run"] else "Reclaimed"
+        reclaimed = 0
+        for reason in (
+            "placeholders",
+            "orphans",
+            "previews",
+            "masks",
+            "history",
+            "quota",
+        ):
+            files, size = report[reason]["files"], report[reason]["bytes"]
+            reclaimed += size
+            self.stdout.write(f"{reason:<12} {files:>8} files {megabytes(size):>12}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {megabytes(reclaimed)} Of {megabytes(report['total_bytes'])}, "
+                f"{megabytes(report['remaining_bytes'])} Left"
+            )
+        )
+
+    @staticmethod
+    def option(options, name, default):
+        return options[name] if options[name] is not None else default
@@ -0,0 +1,84 @@
+import os
+from uuid import UUID
+from django.core.management.base import BaseCommand
+from django.db.models import Value
+from django.db.models.functions import Replace
+from Core.models import ImageModel, ImageVersion
+from PiximaStudio.MediaLayout import DIRECTORIES, image_dirs, is_shard, media_path
+from PiximaStudio.settings import MEDIA_ROOT, MEDIA_SHARD_DEPTH
+
+
+class Command(BaseCommand):
+    help = (
+        "Move The Image Directories Of MEDIA_ROOT To The MEDIA_SHARD_DEPTH Layout "
+        "And Update The Paths Stored In The Database, Safe To Run Again"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--depth",
+            type=int,
+            default=MEDIA_SHARD_DEPTH,
+            help="Shard Levels To Move To, 0 Flattens The Tree",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        depth, dry_run = options["depth"], options["dry_run"]
+        moved = 0
+        for directory in DIRECTORIES:
+            # Listed Up Front, Moving While Scanning Would Revisit Directories
+            for image_id, path in list(image_dirs(directory)):
+                target = media_path(directory, image_id, depth=depth).rstrip(os.sep)
+                if os.path.normpath(path) == os.path.normpath(target):
+                    continue
+                moved += 1
+                if dry_run:
+                    self.stdout.write(f"{path} -> {target}")
+                    continue
+                self.move(path, target)
+                if directory == "Images":
+                    self.update_paths(path, target)
+            if not dry_run:
+                self.remove_empty_shards(os.path.join(MEDIA_ROOT, directory))
+
+        verb = "Would Move" if dry_run else "Moved"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {moved} Image Directories"))
+
+    @staticmethod
+    def move(path: str, target: str):
+        "Renames The Directory, Merges File By File When The Target Exists"
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.rename(path, target)
+            return
+        except OSError:
+            pass
+        os.makedirs(target, exist_ok=True)
+        for file_name in os.listdir(path):
+            os.replace(os.path.join(path, file_name), os.path.join(target, file_name))
+        os.rmdir(path)
+
+    @staticmethod
+    def update_paths(path: str, target: str):
+        try:
+            image_id = UUID(os.path.basename(target))
+        except ValueError:
+            return
+        old = os.path.relpath(path, MEDIA_ROOT) + os.sep
+        new = os.path.relpath(target, MEDIA_ROOT) + os.sep
+        ImageModel.objects.filter(pk=image_id).update(
+            Image=Replace("Image", Value(old), Value(new))
+        )
+        ImageVersion.objects.filter(image_id=image_id).update(
+            path=Replace("path", Value(old), Value(new))
+        )
+
+    @staticmethod
+    def remove_empty_shards(top: str):
+        for current, directories, files in os.walk(top, topdown=False):
+            if current != top and is_shard(os.path.basename(current)):
+                try:
+                    os.rmdir(current)
+                except OSError:
+                    pass
@@ -0,0 +1,43 @@
+# Generated by Django 4.0.5 on 2026-10-19 12:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_operations_count(apps, schema_editor):
+    ImageModel = apps.get_model('Core', 'ImageModel')
+    ImageOperationsModel = apps.get_model('Core', 'ImageOperationsModel')
+    counts = (
+        ImageOperationsModel.objects.filter(image=OuterRef('pk'))
+        .order_by()
+        .values('image')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    ImageModel.objects.update(operations_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Core', '0002_alter_imagemodel_options_alter_imagemodel_table_and_more'),
+    ]
+
+    operations = [
+        # The Model Was Renamed Without A Migration, db_table Keeps The Table
+        migrations.RenameModel(
+            old_name='ImageOperations',
+            new_name='ImageOperationsModel',
+        ),
+        migrations.AddField(
+            model_name='imagemodel',
+            name='operations_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='imageoperationsmodel',
+            index=models.Index(fields=['image', 'operation_num'], name='image_operation_num_idx'),
+        ),
+        migrations.RunPython(backfill_operations_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.0.5 on 2026-10-19 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Core', '0003_imagemodel_operations_count_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.IntegerField()),
+                ('path', models.CharField(max_length=255)),
+                ('width', models.IntegerField(blank=True, null=True)),
+                ('height', models.IntegerField(blank=True, null=True)),
+                ('byte_size', models.BigIntegerField(blank=True, null=True)),
+                ('digest', models.CharField(blank=True, max_length=64, null=True)),
+                ('tool', models.CharField(blank=True, max_length=100, null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('image', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='Versions', to='Core.imagemodel')),
+            ],
+            options={
+                'db_table': 'image_versions',
+                'ordering': ('index',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='imageversion',
+            constraint=models.UniqueConstraint(fields=('image', 'index'), name='image_version_index_unique'),
+        ),
+    ]
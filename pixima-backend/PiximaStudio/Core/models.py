@@ -1,12 +1,17 @@
 from uuid import uuid4
-from django.db import models
+from django.db import connections, models, transaction, IntegrityError
+from django.db.models import F
+from PiximaStudio.settings import MEDIA_ROOT
+from PiximaStudio.MediaLayout import media_name
+from PiximaTools.Timing import timed
+import hashlib
 import os
 
 # Model For Upload Images
 
 
 def upload_to(ins, filename):
-    return f'{os.path.join("Images",str(ins.id),"0."+filename.split(".")[-1])}'
+    return media_name("Images", ins.id, "0." + filename.split(".")[-1])
 
 
 class ImageModel(models.Model):
@@ -19,20 +24,75 @@ class ImageModel(models.Model):
     )
     Image = models.ImageField(upload_to=upload_to)
     upload_time = models.DateTimeField(auto_now_add=True)
+    # Number Of Operations, Also The Index Of The Latest Version File
+    operations_count = models.IntegerField(default=0)
 
     def __str__(self) -> str:
         return str(self.id)
 
 
 class ImageOperationsManager(models.Manager):
+    @timed("db")
     def create(self, **kwargs):
-        try:
-            query = ImageOperationsModel.objects.filter(image_id=str(kwargs["image"]))
-            kwargs["operation_num"] = query.count() + 1
-            return super().create(**kwargs)
-        except Exception as e:
+        """
+        Numbers The Operation From ImageModel.operations_count, The UPDATE Holds
+        The Image Row Lock Until Commit, So Concurrent Operations Get
+        Consecutive Numbers Whatever The History Length.
+        \nOn PostgreSQL The UPDATE And The INSERT Are One Statement, One Round Trip.
+        """
+        image_id = getattr(kwargs["image"], "pk", kwargs["image"])
+        if connections[self.db].vendor == "postgresql" and set(kwargs) <= {
+            "image",
+            "operation_name",
+        }:
+            return self._numbered_insert(image_id, **kwargs)
+        with transaction.atomic(using=self.db):
+            ImageModel.objects.filter(pk=image_id).update(
+                operations_count=F("operations_count") + 1
+            )
+            kwargs["operation_num"] = ImageModel.objects.values_list(
+                "operations_count", flat=True
+            ).get(pk=image_id)
+            if not isinstance(kwargs["image"], ImageModel):
+                # Same As The PostgreSQL Path, image May Be The Image's pk
+                kwargs["image_id"] = kwargs.pop("image")
             return super().create(**kwargs)
 
+    def _numbered_insert(self, image_id, image, operation_name=None):
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        images, operations = ImageModel._meta, self.model._meta
+        image_table, image_pk = quote(images.db_table), quote(images.pk.column)
+        count = quote(images.get_field("operations_count").column)
+        operation_num = quote(operations.get_field("operation_num").column)
+        columns = ", ".join(
+            quote(operations.get_field(name).column)
+            for name in ("image", "operation_num", "operation_name")
+        )
+        sql = (
+            f"WITH numbered AS (UPDATE {image_table} SET {count} = {count} + 1"
+            f" WHERE {image_pk} = %s RETURNING {image_pk}, {count})"
+            f" INSERT INTO {quote(operations.db_table)} ({columns})"
+            f" SELECT {image_pk}, {count}, %s FROM numbered"
+            f" RETURNING {quote(operations.pk.column)}, {operation_num}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [image_id, operation_name])
+            row = cursor.fetchone()
+        if row is None:
+            raise ImageModel.DoesNotExist("ImageModel matching query does not exist.")
+        if isinstance(image, ImageModel):
+            image.operations_count = row[1]
+        else:
+            image = ImageModel(pk=image_id, operations_count=row[1])
+            image._state.adding = False
+        operation = self.model(
+            pk=row[0], image=image, operation_num=row[1], operation_name=operation_name
+        )
+        operation._state.adding = False
+        operation._state.db = self.db
+        return operation
+
 
 class ImageOperationsModel(models.Model):
     objects = ImageOperationsManager()
@@ -40,6 +100,11 @@ class ImageOperationsModel(models.Model):
     class Meta:
         db_table = "image_operations"
         ordering = ("operation_num",)
+        indexes = [
+            models.Index(
+                fields=["image", "operation_num"], name="image_operation_num_idx"
+            )
+        ]
 
     image = models.ForeignKey(
         ImageModel,
@@ -52,3 +117,71 @@ class ImageOperationsModel(models.Model):
 
     def __str__(self) -> str:
         return self.operation_name + " Id: " + str(self.image.id)
+
+
+def file_stats(full_path: str) -> dict:
+    "byte_size And sha256 digest Of A Written Version File"
+    digest = hashlib.sha256()
+    with open(full_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return {"byte_size": os.path.getsize(full_path), "digest": digest.hexdigest()}
+
+
+class ImageVersionManager(models.Manager):
+    @timed("db")
+    def record(
+        self,
+        image_id,
+        index: int,
+        full_path: str,
+        written: bool = True,
+        stored_path: str = None,
+        **values,
+    ):
+        """
+        Indexes Version index Of An Image (values: width, height, tool).
+        \nWith written=False (Write-Behind, The File Is Still Being Encoded)
+        byte_size And digest Stay Empty, `manage.py index_versions` Fills Them.
+        stored_path Is The File Actually Written When It Is Not full_path (.delta).
+        """
+        values["path"] = os.path.relpath(full_path, MEDIA_ROOT)
+        if written:
+            values.update(file_stats(stored_path or full_path))
+        try:
+            with transaction.atomic(using=self.db):
+                return self.create(image_id=image_id, index=index, **values)
+        except IntegrityError:
+            self.filter(image_id=image_id, index=index).update(**values)
+            return self.get(image_id=image_id, index=index)
+
+
+class ImageVersion(models.Model):
+    "One Saved Version Of An Image, Index 0 Is The Upload"
+
+    objects = ImageVersionManager()
+
+    class Meta:
+        db_table = "image_versions"
+        ordering = ("index",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["image", "index"], name="image_version_index_unique"
+            )
+        ]
+
+    image = models.ForeignKey(
+        ImageModel, related_name="Versions", on_delete=models.CASCADE
+    )
+    index = models.IntegerField()
+    # Relative To MEDIA_ROOT
+    path = models.CharField(max_length=255)
+    width = models.IntegerField(blank=True, null=True)
+    height = models.IntegerField(blank=True, null=True)
+    byte_size = models.BigIntegerField(blank=True, null=True)
+    digest = models.CharField(max_length=64, blank=True, null=True)
+    tool = models.CharField(max_length=100, blank=True, null=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"{self.image_id} Version {self.index}"
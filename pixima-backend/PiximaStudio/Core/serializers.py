@@ -1,6 +1,12 @@
 from operator import mod
 from pyexpat import model
-from rest_framework.serializers import ModelSerializer, Serializer, UUIDField
+from rest_framework.serializers import (
+    IntegerField,
+    ModelSerializer,
+    Serializer,
+    UUIDField,
+)
+from PiximaStudio.settings import VERSIONS_PAGE_SIZE, VERSIONS_MAX_PAGE_SIZE
 from . import models
 
 
@@ -12,6 +18,11 @@ class UploadImageSerializer(ModelSerializer):
 
 class GetImageSerializer(Serializer):
     id = UUIDField(format="hex_verbose")
+    # Keyset Pagination: Versions With An Index Greater Than after
+    after = IntegerField(default=-1, min_value=-1)
+    limit = IntegerField(
+        default=VERSIONS_PAGE_SIZE, min_value=1, max_value=VERSIONS_MAX_PAGE_SIZE
+    )
 
     def create(self, validated_data):
         return models.ImageModel.objects.create(**validated_data)
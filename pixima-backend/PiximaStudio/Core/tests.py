@@ -1,3 +1,611 @@
-from django.test import TestCase
+from unittest import mock
+from uuid import uuid4
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import connection
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+)
+from PIL import Image
+from PiximaStudio.AbstractView import RESTView, async_tool_view
+from PiximaStudio.MediaGC import MediaSweeper
+from PiximaTools import InferencePool, abstractTools
+from PiximaTools.Exceptions import ImageNotSaved
+from .models import ImageModel, ImageOperationsModel
+from PiximaTools import DeltaHistory
+from PiximaTools.VersionRing import VersionRing
+from PiximaTools.WriteBehind import WriteBehindStore
+from PiximaTools.DeltaHistory import (
+    changed_box,
+    delta_parent,
+    delta_path,
+    encode_delta,
+    read_version,
+    version_depth,
+    version_exists,
+    version_shape,
+    write_delta,
+)
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
 
-# Create your tests here.
+
+def flat_image(height=64, width=96, color=(120, 80, 40)):
+    image = np.zeros((height, width, 3), np.uint8)
+    image[:] = color
+    return image
+
+
+class DeltaHistoryTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        # The Keyframe As Readers See It, Decoded From Its JPEG
+        Image.fromarray(flat_image()).save(self.version(0), quality=95)
+        self.keyframe = read_version(self.version(0))
+
+    def version(self, index):
+        return os.path.join(self.directory.name, f"{index}.jpg")
+
+    def write(self, index, parent_index, parent, image):
+        depth = version_depth(self.version(parent_index))
+        data = encode_delta(parent_index, depth, parent, image)
+        self.assertIsNotNone(data)
+        write_delta(delta_path(self.version(index)), data)
+
+    def test_changed_box(self):
+        image = self.keyframe.copy()
+        self.assertEqual(changed_box(self.keyframe, image), (0, 0, 0, 0))
+        image[10:20, 30:45] = 255
+        self.assertEqual(changed_box(self.keyframe, image), (10, 20, 30, 45))
+        self.assertIsNone(changed_box(self.keyframe, image[:32]))
+
+    def test_rebuild_chain(self):
+        first = self.keyframe.copy()
+        first[8:24, 16:40] = (250, 250, 250)
+        self.write(1, 0, self.keyframe, first)
+        second = read_version(self.version(1))
+        second[40:56, 60:80] = (10, 10, 10)
+        self.write(2, 1, read_version(self.version(1)), second)
+
+        self.assertFalse(os.path.exists(self.version(2)))
+        self.assertTrue(version_exists(self.version(2)))
+        self.assertEqual(version_depth(self.version(0)), 0)
+        self.assertEqual(version_depth(self.version(2)), 2)
+        self.assertEqual(version_shape(self.version(2)), self.keyframe.shape)
+        self.assertEqual(delta_parent(delta_path(self.version(2))), 1)
+        self.assertIsNone(delta_parent(self.version(0)))
+
+        rebuilt = read_version(self.version(2)).astype(int)
+        # Outside Both Patches The Keyframe Pixels Are Kept Exactly
+        untouched = np.ones(self.keyframe.shape[:2], bool)
+        untouched[8:24, 16:40] = untouched[40:56, 60:80] = False
+        np.testing.assert_array_equal(
+            rebuilt[untouched], self.keyframe.astype(int)[untouched]
+        )
+        # Inside Them, The JPEG Patch Of A Flat Area
+        self.assertLess(np.abs(rebuilt[8:24, 16:40] - 250).max(), 8)
+        self.assertLess(np.abs(rebuilt[40:56, 60:80] - 10).max(), 8)
+
+    def test_keyframe_when_too_large_or_too_deep(self):
+        image = self.keyframe.copy()
+        image[:40, :] = 0
+        self.assertIsNone(encode_delta(0, 0, self.keyframe, image))
+        self.assertIsNone(encode_delta(0, 0, self.keyframe, image[:, :48]))
+        image = self.keyframe.copy()
+        image[0:4, 0:4] = 0
+        self.assertIsNotNone(encode_delta(0, 0, self.keyframe, image))
+        depth = DeltaHistory.DELTA_KEYFRAME_INTERVAL - 1
+        self.assertIsNone(encode_delta(0, depth, self.keyframe, image))
+
+    def test_unchanged_version_has_empty_patch(self):
+        self.write(1, 0, self.keyframe, self.keyframe.copy())
+        np.testing.assert_array_equal(read_version(self.version(1)), self.keyframe)
+
+
+class VersionRingTests(SimpleTestCase):
+    def test_count_cap_per_image(self):
+        ring = VersionRing(size=2, memory_bytes=1 << 20, compress=False)
+        for index in range(3):
+            ring.put("a", index, flat_image(8, 8, (index, 0, 0)))
+        ring.put("b", 0, flat_image(8, 8))
+        self.assertIsNone(ring.get("a", 0))
+        self.assertEqual(ring.get("a", 2)[0, 0, 0], 2)
+        self.assertIsNotNone(ring.get("b", 0))
+        self.assertEqual(ring.counts, {"a": 2, "b": 1})
+
+    def test_byte_cap_evicts_least_recently_used(self):
+        nbytes = flat_image(8, 8).nbytes
+        ring = VersionRing(size=8, memory_bytes=2 * nbytes, compress=False)
+        ring.put("a", 0, flat_image(8, 8))
+        ring.put("b", 0, flat_image(8, 8))
+        ring.get("a", 0)
+        ring.put("c", 0, flat_image(8, 8))
+        self.assertIsNone(ring.get("b", 0))
+        self.assertIsNotNone(ring.get("a", 0))
+        self.assertEqual(ring.bytes, 2 * nbytes)
+        # Larger Than The Whole Ring, Never Stored
+        ring.put("d", 0, flat_image(16, 16))
+        self.assertIsNone(ring.get("d", 0))
+        self.assertEqual(ring.bytes, 2 * nbytes)
+
+    def test_copies_in_and_out(self):
+        for compress in (False, True):
+            ring = VersionRing(size=2, memory_bytes=1 << 20, compress=compress)
+            image = flat_image(8, 8)
+            ring.put("a", 0, image)
+            image[:] = 0
+            cached = ring.get("a", 0)
+            np.testing.assert_array_equal(cached, flat_image(8, 8))
+            cached[:] = 0
+            np.testing.assert_array_equal(ring.get("a", 0), flat_image(8, 8))
+
+    def test_memory_mapped_images_are_skipped(self):
+        ring = VersionRing(size=2, memory_bytes=1 << 20, compress=False)
+        with tempfile.TemporaryFile() as file:
+            image = np.memmap(file, np.uint8, "w+", shape=(8, 8, 3))
+            ring.put("a", 0, image)
+        self.assertIsNone(ring.get("a", 0))
+
+    def test_disabled(self):
+        ring = VersionRing(size=0, memory_bytes=1 << 20, compress=False)
+        ring.put("a", 0, flat_image(8, 8))
+        self.assertIsNone(ring.get("a", 0))
+
+
+class MediaSweeperTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.root = self.directory.name
+        self.image_id = str(uuid4())
+        self.now = time.time()
+        unindex = mock.patch.object(MediaSweeper, "unindex")
+        self.unindex = unindex.start()
+        self.addCleanup(unindex.stop)
+
+    def sweeper(self, max_versions=0, quota_bytes=0, stored=True, **ttls):
+        sweeper = MediaSweeper(
+            self.root,
+            ttls.get("preview_ttl_s", 3600),
+            ttls.get("mask_ttl_s", 3600),
+            ttls.get("orphan_ttl_s", 3600),
+            max_versions,
+            quota_bytes,
+            0,
+            ttls.get("placeholder_ttl_s", 10),
+        )
+        sweeper.stored_ids = lambda ids: set(ids) if stored else set()
+        return sweeper
+
+    def add(self, directory, file_name, data=b"x" * 1000, age=0):
+        "A File Last Used age Seconds Ago"
+        path = os.path.join(self.root, directory, self.image_id, file_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(data)
+        os.utime(path, (self.now - age, self.now - age))
+        return path
+
+    def add_delta(self, index, parent, depth, age=0):
+        image = flat_image(8, 8)
+        changed = image.copy()
+        changed[0, 0] = 0
+        return self.add(
+            "Images", f"{index}.delta", encode_delta(parent, depth, image, changed), age
+        )
+
+    def remaining(self, directory="Images"):
+        path = os.path.join(self.root, directory, self.image_id)
+        return sorted(os.listdir(path)) if os.path.isdir(path) else []
+
+    def test_history_keeps_upload_latest_and_ancestors(self):
+        for index in range(3):
+            self.add("Images", f"{index}.jpg", age=100 - index)
+        self.add_delta(3, 1, 1, age=50)
+        self.add_delta(4, 2, 1, age=40)
+        self.add_delta(5, 4, 2, age=30)
+        report = self.sweeper(max_versions=2).sweep()
+        # 5 Is Rebuilt From 4, 4 From 2, 1 And 3 Are The Oldest Unneeded Ones
+        self.assertEqual(self.remaining(), ["0.jpg", "2.jpg", "4.delta", "5.delta"])
+        self.assertEqual(report["history"]["files"], 2)
+        self.unindex.assert_called_once()
+        (evicted,) = self.unindex.call_args[0]
+        self.assertEqual(sorted(evicted[self.image_id]), [1, 3])
+
+    def test_quota_evicts_previews_and_masks_first(self):
+        for index in range(4):
+            self.add("Images", f"{index}.jpg", age=100 - index)
+        self.add("Temp", "3_Low.jpg", age=5)
+        self.add("ImageMasks", "0.jpg", age=1)
+        report = self.sweeper(quota_bytes=4500).sweep()
+        self.assertEqual(report["quota"]["files"], 2)
+        self.assertEqual(self.remaining("Temp"), [])
+        self.assertEqual(self.remaining("ImageMasks"), [])
+        self.assertEqual(len(self.remaining()), 4)
+
+        # Then Versions By Last Use, Never The Upload Or The Latest
+        report = self.sweeper(quota_bytes=1000).sweep()
+        self.assertEqual(report["quota"]["files"], 2)
+        self.assertEqual(self.remaining(), ["0.jpg", "3.jpg"])
+        self.assertEqual(report["remaining_bytes"], 2000)
+
+    def test_ttls_orphans_and_placeholders(self):
+        self.add("Images", "0.jpg", age=10)
+        self.add("Images", "1.jpg", data=b"", age=60)
+        self.add("Images", "2.jpg", data=b"", age=1)
+        self.add("Temp", "0_Low.jpg", age=7200)
+        self.add("Temp", "0_Mid.jpg", age=60)
+        report = self.sweeper().sweep()
+        self.assertEqual(report["placeholders"]["files"], 1)
+        self.assertEqual(report["previews"]["files"], 1)
+        self.assertEqual(self.remaining(), ["0.jpg", "2.jpg"])
+        self.assertEqual(self.remaining("Temp"), ["0_Mid.jpg"])
+
+        report = self.sweeper(stored=False, orphan_ttl_s=5).sweep()
+        self.assertEqual(report["orphans"]["files"], 2)
+        self.assertEqual(self.remaining(), [])
+
+    def test_dry_run_removes_nothing(self):
+        for index in range(4):
+            self.add("Images", f"{index}.jpg", age=100 - index)
+        report = self.sweeper(max_versions=2).sweep(dry_run=True)
+        self.assertEqual(report["history"]["files"], 2)
+        self.assertEqual(len(self.remaining()), 4)
+        self.unindex.assert_not_called()
+
+
+class OperationNumberingTests(TestCase):
+    def test_consecutive_per_image(self):
+        first = ImageModel.objects.create(Image="Images/first/0.jpg")
+        second = ImageModel.objects.create(Image="Images/second/0.jpg")
+        numbers = [
+            ImageOperationsModel.objects.create(
+                image=image, operation_name="FlipTool"
+            ).operation_num
+            for image in (first, first, second, first)
+        ]
+        self.assertEqual(numbers, [1, 2, 1, 3])
+        first.refresh_from_db()
+        self.assertEqual(first.operations_count, 3)
+        self.assertEqual(
+            list(
+                ImageOperationsModel.objects.filter(image=first).values_list(
+                    "operation_num", "operation_name"
+                )
+            ),
+            [(1, "FlipTool"), (2, "FlipTool"), (3, "FlipTool")],
+        )
+
+    def test_by_image_id(self):
+        image = ImageModel.objects.create(Image="Images/image/0.jpg")
+        operation = ImageOperationsModel.objects.create(
+            image=image.pk, operation_name="ResizeTool"
+        )
+        self.assertEqual(operation.operation_num, 1)
+        self.assertEqual(ImageOperationsModel.objects.get().image_id, image.pk)
+
+    def test_missing_image(self):
+        with self.assertRaises(ImageModel.DoesNotExist):
+            ImageOperationsModel.objects.create(
+                image=uuid4(), operation_name="FlipTool"
+            )
+
+
+class ConcurrentOperationNumberingTests(TransactionTestCase):
+    def test_concurrent_operations_get_distinct_numbers(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("Row Locks Across Connections Need PostgreSQL")
+        image = ImageModel.objects.create(Image="Images/image/0.jpg")
+
+        def create(_):
+            try:
+                return ImageOperationsModel.objects.create(
+                    image=image.pk, operation_name="FlipTool"
+                ).operation_num
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            numbers = sorted(executor.map(create, range(40)))
+        self.assertEqual(numbers, list(range(1, 41)))
+        image.refresh_from_db()
+        self.assertEqual(image.operations_count, 40)
+
+
+class LazyImportTests(SimpleTestCase):
+    def test_worker_start_skips_ml_frameworks(self):
+        # A Fresh Interpreter Started Like A Worker, This One May Have Them Already
+        script = (
+            "import sys, PiximaStudio.wsgi\n"
+            "from django.urls import get_resolver\n"
+            "get_resolver().url_patterns\n"
+            "print(sorted({'mediapipe', 'tensorflow', 'keras'} & set(sys.modules)))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "PiximaStudio.settings"},
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+
+class ThreadNameView(RESTView):
+    def post(self, request, format=None):
+        return self.ok_request(
+            {"Thread": threading.current_thread().name, **request.data}
+        )
+
+
+class AsyncToolViewTests(SimpleTestCase):
+    def test_runs_the_sync_view_on_tool_executor(self):
+        view = async_tool_view(ThreadNameView)
+        self.assertTrue(asyncio.iscoroutinefunction(view))
+        self.assertTrue(view.csrf_exempt)
+        self.assertIs(view.view_class, ThreadNameView)
+        request = RequestFactory().post(
+            "/", {"Value": 7}, content_type="application/json"
+        )
+        response = async_to_sync(view)(request)
+        data = json.loads(response.content)
+        self.assertEqual(data["status"], "OK")
+        self.assertEqual(data["Value"], 7)
+        self.assertTrue(data["Thread"].startswith("PiximaTool"))
+
+
+class InvertInPlace:
+    def add_image(self, image):
+        self.Image = image
+        return self
+
+    def apply(self):
+        self.Image[...] = 255 - self.Image
+        self.Mask = self.Image[..., 0] > 127
+
+
+class AddOffset(InvertInPlace):
+    def apply(self):
+        self.Image = self.Image + self.offset
+
+
+class FlipRows(InvertInPlace):
+    def apply(self):
+        # Same Segment, Shape And dtype As The Input, Other Strides
+        self.Image = self.Image[::-1]
+
+
+class InferencePoolTests(SimpleTestCase):
+    def setUp(self):
+        self.image = np.arange(4 * 5 * 3, dtype=np.uint8).reshape(4, 5, 3)
+
+    def run_tool(self, tool_class, state=None):
+        shm, spec = InferencePool._to_shared(self.image)
+        self.addCleanup(shm.unlink)
+        self.addCleanup(shm.close)
+        outputs = InferencePool._run_tool(
+            __name__, tool_class.__name__, state or {}, spec
+        )
+        results = {}
+        for name, out_spec in outputs.items():
+            out_shm, view = InferencePool._attach(out_spec)
+            results[name] = (out_spec[0] == spec[0], view.copy())
+            del view
+            out_shm.close()
+            if out_spec[0] != spec[0]:
+                out_shm.unlink()
+        return results
+
+    def test_in_place_edit_is_read_from_the_input_segment(self):
+        results = self.run_tool(InvertInPlace)
+        in_place, image = results["Image"]
+        self.assertTrue(in_place)
+        np.testing.assert_array_equal(image, 255 - self.image)
+        in_place, mask = results["Mask"]
+        self.assertFalse(in_place)
+        np.testing.assert_array_equal(mask, (255 - self.image)[..., 0] > 127)
+
+    def test_new_array_gets_its_own_segment(self):
+        in_place, image = self.run_tool(AddOffset, {"offset": 3})["Image"]
+        self.assertFalse(in_place)
+        np.testing.assert_array_equal(image, self.image + 3)
+
+    def test_flipped_view_is_copied_out(self):
+        in_place, image = self.run_tool(FlipRows)["Image"]
+        self.assertFalse(in_place)
+        np.testing.assert_array_equal(image, self.image[::-1])
+
+    def test_state_skips_arrays_delta_parent_and_handles(self):
+        tool = AddOffset().add_image(self.image)
+        tool.offset = 3
+        tool.directory_id = uuid4()
+        tool.quality = {"High": 70, "Mid": 40}
+        tool.delta_parent = (1, 0, self.image.copy())
+        tool.faceMeshDetector = object()
+        self.assertEqual(
+            InferencePool._picklable_state(tool),
+            {"offset": 3, "directory_id": tool.directory_id, "quality": tool.quality},
+        )
+
+    def test_apply_releases_every_segment(self):
+        names = []
+        to_shared = InferencePool._to_shared
+
+        def record(array):
+            shm, spec = to_shared(array)
+            names.append(spec[0])
+            return shm, spec
+
+        pool = InferencePool.InferencePool(size=1, tools=["InvertInPlace"])
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        pool.executor = lambda: executor
+        tool = InvertInPlace().add_image(self.image.copy())
+        with mock.patch.object(InferencePool, "_to_shared", record):
+            pool.apply(tool)
+        np.testing.assert_array_equal(tool.Image, 255 - self.image)
+        self.assertEqual(len(names), 2)
+        for name in names:
+            with self.assertRaises(FileNotFoundError):
+                InferencePool.shared_memory.SharedMemory(name=name)
+
+
+class OutputTool(abstractTools.BodyTool):
+    def apply(self):
+        return self
+
+
+class SaveOutputsTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.root = self.directory.name
+        self.ring = VersionRing(4, 1 << 24, False)
+        for name, value in (
+            ("media_path", self.media_path),
+            ("version_ring", self.ring),
+            ("ENCODE_WORKERS", 1),
+            ("ImageVersion", mock.Mock()),
+        ):
+            patcher = mock.patch.object(abstractTools, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.versions = abstractTools.ImageVersion.objects
+
+    def media_path(self, directory, image_id, file_name=""):
+        return os.path.join(self.root, directory, str(image_id), file_name)
+
+    def tool(self):
+        tool = OutputTool().add_image(flat_image()).add_id(uuid4())
+        tool.add_quality_dict().add_preview("Low").image_model = mock.Mock()
+        tool.Mask = np.zeros((64, 96), np.uint8)
+        return tool
+
+    def files(self, directory, tool):
+        path = self.media_path(directory, tool.directory_id)
+        return sorted(os.listdir(path)) if os.path.isdir(path) else []
+
+    def test_serial_outputs_are_written_and_indexed(self):
+        tool = self.tool()
+        with mock.patch.object(abstractTools.write_behind, "enabled", False):
+            tool.save_outputs(with_mask=True)
+        self.assertEqual(self.files("Images", tool), ["0.jpg"])
+        self.assertEqual(self.files("ImageMasks", tool), ["0.jpg"])
+        self.versions.record.assert_called_once()
+        self.assertIsNotNone(self.ring.get(tool.directory_id, 0))
+
+    def test_serial_failure_drops_the_saved_version(self):
+        tool = self.tool()
+        # cv2.imwrite Raises On A Missing Mask
+        tool.Mask = None
+        with mock.patch.object(abstractTools.write_behind, "enabled", False):
+            with self.assertRaises(ImageNotSaved):
+                tool.save_outputs(with_mask=True)
+        self.assertEqual(self.files("Images", tool), [])
+        self.assertEqual(self.files("ImageMasks", tool), [])
+        self.versions.record.assert_called_once()
+        self.versions.filter.assert_called_once_with(
+            image_id=tool.directory_id, index=0
+        )
+        self.versions.filter.return_value.delete.assert_called_once_with()
+        self.assertIsNone(self.ring.get(tool.directory_id, 0))
+
+
+class WriteBehindTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.root = self.directory.name
+        self.store = self.new_store()
+
+    def new_store(self):
+        store = WriteBehindStore(True, 1, 2)
+        store.temp_dir = os.path.join(self.root, ".writebehind")
+        self.addCleanup(store.flush)
+        return store
+
+    def test_placeholder_until_written(self):
+        sub_path = os.path.join(self.root, "Images")
+        index, path = self.store.reserve(sub_path)
+        self.assertEqual((index, os.path.getsize(path)), (0, 0))
+        self.assertEqual(self.store.reserve(sub_path)[0], 1)
+        release = threading.Event()
+
+        def encode():
+            release.wait(2)
+            return b"version"
+
+        self.store.submit(path, encode)
+        self.assertIn(os.path.normpath(path), self.store.pending)
+        self.assertEqual(os.path.getsize(path), 0)
+        release.set()
+        self.store.wait(path)
+        with open(path, "rb") as file:
+            self.assertEqual(file.read(), b"version")
+        self.assertIsNone(self.store.read(path))
+        self.assertEqual(self.store.pending, {})
+
+    def test_wait_for_another_process(self):
+        _, path = self.store.reserve(os.path.join(self.root, "Images"))
+        # Its Writer Is Another Process, So Only The Empty File Is Seen
+        other = self.new_store()
+        other.submit(path, lambda: time.sleep(0.1) or b"version")
+        self.store.wait(path)
+        self.assertEqual(os.path.getsize(path), len(b"version"))
+
+    def test_failed_encode_removes_placeholder(self):
+        _, path = self.store.reserve(os.path.join(self.root, "Images"))
+        on_failure = mock.Mock()
+
+        def encode():
+            raise ValueError("encode")
+
+        with self.assertLogs("PiximaTools.WriteBehind", "ERROR"):
+            future = self.store.submit(path, encode, on_failure=on_failure)
+            with self.assertRaises(ValueError):
+                future.result()
+        self.assertFalse(os.path.exists(path))
+        on_failure.assert_called_once_with()
+        self.assertEqual(self.store.pending, {})
+        # Nothing Pending Or On Disk, Readers Do Not Block
+        self.store.wait(path)
+        self.assertIsNone(self.store.read(path))
+
+    def test_failed_version_is_unindexed(self):
+        image_id = uuid4()
+        with mock.patch.object(
+            abstractTools, "write_behind", self.store
+        ), mock.patch.object(
+            abstractTools,
+            "media_path",
+            lambda *parts: os.path.join(self.root, *map(str, parts)),
+        ), mock.patch.object(
+            abstractTools, "ImageVersion"
+        ) as versions:
+            # Five Channels, PIL Can Not Encode It
+            tool = OutputTool().add_image(np.zeros((8, 8, 5), np.uint8))
+            tool.add_id(image_id).image_model = mock.Mock()
+            with self.assertLogs("PiximaTools.WriteBehind", "ERROR"):
+                tool.save_image()
+                self.store.flush()
+        versions.objects.record.assert_called_once()
+        self.assertFalse(versions.objects.record.call_args.kwargs["written"])
+        versions.objects.filter.assert_called_once_with(image_id=image_id, index=0)
+        versions.objects.filter.return_value.delete.assert_called_once_with()
+        self.assertEqual(
+            os.listdir(os.path.join(self.root, "Images", str(image_id))), []
+        )
@@ -5,4 +5,9 @@ urlpatterns = [
     path('',view=views.Index.as_view(),name='Index'),
     path('api-upload_image',view=views.UploadImage.as_view(),name='UploadImageAPI'),
     path('api-get_images',view=views.GetImagesDirectoryId.as_view(),name='GetImagesAPI'),
+    path('api-undo',view=views.UndoVersion.as_view(),name='UndoAPI'),
+    path('api-redo',view=views.RedoVersion.as_view(),name='RedoAPI'),
+    path('api-ready',view=views.Readiness.as_view(),name='ReadinessAPI'),
+    path('api-memory_report',view=views.MemoryReport.as_view(),name='MemoryReportAPI'),
+    path('metrics',view=views.Metrics.as_view(),name='Metrics'),
 ]
\ No newline at end of file
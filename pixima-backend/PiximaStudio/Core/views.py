@@ -1,9 +1,18 @@
 from django.shortcuts import render
 from django.views import View
+from django.views.static import serve
+from django.http import HttpResponse
+from django.utils._os import safe_join
 from rest_framework.parsers import MultiPartParser, FormParser
 from . import serializers
-from PiximaStudio.settings import MEDIA_ROOT, PROJECT_DIR, MEDIA_URL
-from PiximaStudio.AbstractView import RESTView
+from .models import ImageModel, ImageVersion
+from AbstractSerializer.serializer import ImageSerializer
+from AbstractSerializer.serializerHandler import ImageSerializerHandler
+from PiximaStudio.settings import MEDIA_ROOT, MEDIA_URL
+from PiximaStudio.AbstractView import AbstractView, RESTView
+from PiximaStudio.MediaLayout import media_path, media_url
+from PiximaTools.abstractTools import Tool
+from PiximaTools.DeltaHistory import version_exists
 import os
 
 # Create your views here.
@@ -19,6 +28,63 @@ class Index(View):
         )
 
 
+class Readiness(AbstractView):
+    """
+    Load Balancer Probe: 503 Until The Worker Finished Warming Up Its Models, And
+    For Good When One Of Them Failed (Listed In errors)
+    """
+
+    def get(self, request):
+        from PiximaStudio.settings import WARMUP_ON_STARTUP
+        from PiximaTools.AI_Models import warmup_state
+
+        if not WARMUP_ON_STARTUP or warmup_state["ready"]:
+            return self.ok_request({"ready": True, **warmup_state})
+        return self.service_unavailable({"ready": False, **warmup_state})
+
+
+class MemoryReport(AbstractView):
+    def get(self, request):
+        from PiximaTools.AI_Models import worker_memory_report
+
+        return self.ok_request(worker_memory_report())
+
+
+class PendingMedia(View):
+    """
+    Media Files Not Written As Served: Write-Behind Outputs Still In Flight Are
+    Served From Memory, Delta Versions Are Rebuilt From Their Keyframe.
+    """
+
+    def get(self, request, path):
+        from PiximaTools.WriteBehind import write_behind
+        from PiximaTools.DeltaHistory import delta_path, materialize
+
+        full_path = safe_join(MEDIA_ROOT, path)
+        data = write_behind.read(full_path)
+        if data is not None:
+            return HttpResponse(data, content_type="image/jpeg")
+        write_behind.wait(full_path)
+        if not os.path.exists(full_path) and os.path.exists(delta_path(full_path)):
+            response = HttpResponse(materialize(full_path), content_type="image/jpeg")
+            response["Cache-Control"] = "max-age=31536000, immutable"
+            return response
+        return serve(request, path, document_root=MEDIA_ROOT)
+
+
+class Metrics(View):
+    "Prometheus Scrape Target, Merged Over All Worker Processes"
+
+    def get(self, request):
+        from PiximaTools.Metrics import metrics
+
+        if not metrics.enabled:
+            return HttpResponse("Metrics Are Disabled\n", status=404)
+        return HttpResponse(
+            metrics.exposition(), content_type="text/plain; version=0.0.4"
+        )
+
+
 class UploadImage(RESTView):
     parser_classes = [MultiPartParser, FormParser]
 
@@ -26,6 +92,14 @@ class UploadImage(RESTView):
         image_serializer = serializers.UploadImageSerializer(data=request.data)
         if image_serializer.is_valid():
             ins = image_serializer.save()
+            ImageVersion.objects.record(
+                ins.id,
+                0,
+                ins.Image.path,
+                width=ins.Image.width,
+                height=ins.Image.height,
+                tool="Upload",
+            )
             return self.ok_request(
                 {
                     "id": str(ins.id),
@@ -36,33 +110,107 @@ class UploadImage(RESTView):
 
 
 class GetImagesDirectoryId(RESTView):
+    "Version History, limit Versions With An Index After after From image_versions"
 
     parser_classes = [MultiPartParser, FormParser]
 
     def get(self, request, format=None):
-        id_serializer = serializers.GetImageSerializer(data=request.data)
+        id_serializer = serializers.GetImageSerializer(
+            data=request.data or request.query_params
+        )
         if id_serializer.is_valid():
-            path = os.path.join(
-                PROJECT_DIR, MEDIA_ROOT, "Images", id_serializer["id"].value
+            image_id = id_serializer.validated_data["id"]
+            after = id_serializer.validated_data["after"]
+            limit = id_serializer.validated_data["limit"]
+            versions = list(
+                ImageVersion.objects.filter(image_id=image_id, index__gt=after)
+                .values(
+                    "index",
+                    "path",
+                    "width",
+                    "height",
+                    "byte_size",
+                    "digest",
+                    "tool",
+                    "created",
+                )[: limit + 1]
             )
-            if os.path.exists(path):
-                numbers = [
-                    (int(x.split(".")[0]), x.split(".")[1]) for x in os.listdir(path)
-                ]
-                numbers = sorted(numbers, key=lambda x: x[0])
-                numbers = [str(num) + "." + suffix for num, suffix in numbers]
-
-                return self.ok_request(
-                    {
-                        "id": str(id_serializer["id"].value),
-                        "images": {
-                            i: os.path.join(
-                                MEDIA_URL, "Images", id_serializer["id"].value, x
-                            )
-                            for i, x in enumerate(numbers)
-                        },
-                    }
-                )
-            else:
+            if (
+                not versions
+                and after == -1
+                and not ImageModel.objects.filter(pk=image_id).exists()
+            ):
                 return self.bad_request({"id": ["NOT FOUND"]})
+            more = len(versions) > limit
+            versions = versions[:limit]
+            for version in versions:
+                version["url"] = os.path.join(MEDIA_URL, version.pop("path"))
+            return self.ok_request(
+                {
+                    "id": str(image_id),
+                    "images": {
+                        version["index"]: version["url"] for version in versions
+                    },
+                    "versions": versions,
+                    "next": versions[-1]["index"] if more else None,
+                }
+            )
         return self.bad_request(id_serializer.errors)
+
+
+class VersionPreview(Tool):
+    "Reads A Version (From The Version Ring When It Is There) And Writes Its Preview"
+
+    def apply(self, *args, **kwargs):
+        return self
+
+
+class StepVersion(RESTView):
+    """
+    Undo/Redo: The Version step Away From ImageIndex (-1 Is The Latest), Versions
+    Pruned From The Media Store Are Skipped. The Version Is Left Decoded In The
+    Version Ring, So The Next Tool Call On It Does Not Read It Again.
+    """
+
+    step = -1
+
+    def post(self, request, format=None):
+        serializer = ImageSerializer(data=request.data)
+        handler = ImageSerializerHandler(serializer)
+        if not handler.handle():
+            return self.bad_request(handler.errors)
+        image = handler.instance
+        latest = image.operations_count
+        index = serializer.data["ImageIndex"]
+        target = (latest if index == -1 else index) + self.step
+        while 0 <= target <= latest and not version_exists(
+            media_path("Images", image.id, f"{target}.jpg")
+        ):
+            target += self.step
+        if not 0 <= target <= latest:
+            return self.bad_request({"Message": "No Version To Step To"})
+        try:
+            tool = VersionPreview().add_image_model(image).serializer2data(serializer)
+            tool.read_image(target)
+            tool.lastidx = target
+            preview_path = tool.get_preview()
+        except Exception as e:
+            return self.bad_request({"Message": "Error While Loading The Version"})
+        return self.ok_request(
+            {
+                "id": str(image.id),
+                "ImageIndex": target,
+                "Image": media_url("Images", image.id, f"{target}.jpg"),
+                "ImagePreview": preview_path,
+                "CanUndo": target > 0,
+                "CanRedo": target < latest,
+            }
+        )
+
+
+class UndoVersion(StepVersion):
+    step = -1
+
+
+class RedoVersion(StepVersion):
+    step = 1
@@ -1,3 +1,74 @@
-from django.test import TestCase
+from types import SimpleNamespace
+from django.test import SimpleTestCase
+from PiximaTools.AI_Models import TwoStageFaceMesh
+import numpy as np
 
-# Create your tests here.
+
+def detection(xmin, ymin, width, height, score=0.9):
+    box = SimpleNamespace(xmin=xmin, ymin=ymin, width=width, height=height)
+    return SimpleNamespace(
+        score=[score], location_data=SimpleNamespace(relative_bounding_box=box)
+    )
+
+
+class StubDetector:
+    def __init__(self, detections):
+        self.detections = detections
+
+    def process(self, image):
+        return SimpleNamespace(detections=self.detections)
+
+
+class StubMesh:
+    "Finds One Face Of The Given Landmarks, Or None, Per Call"
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.images = []
+
+    def process(self, image):
+        self.images.append(image)
+        landmarks = self.answers.pop(0)
+        if landmarks is None:
+            return SimpleNamespace(multi_face_landmarks=None)
+        face = SimpleNamespace(
+            landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in landmarks]
+        )
+        return SimpleNamespace(multi_face_landmarks=[face])
+
+
+class TwoStageFaceMeshTests(SimpleTestCase):
+    def setUp(self):
+        self.image = np.arange(256 * 512 * 3, dtype=np.uint32).reshape(256, 512, 3)
+
+    def test_roi_landmarks_are_remapped_to_the_full_image(self):
+        mesh = StubMesh([(0.5, 0.25, 0.1), (0.0, 1.0, -0.5)])
+        # Padded By 0.25 The ROI Is Rows 32:224, Columns 96:288
+        two_stage = TwoStageFaceMesh(
+            StubDetector([detection(0.25, 0.25, 0.25, 0.5)]), mesh, padding=0.25
+        )
+        results = two_stage.process(self.image)
+        np.testing.assert_array_equal(mesh.images[0], self.image[32:224, 96:288])
+        landmarks = [
+            (point.x, point.y, point.z)
+            for point in results.multi_face_landmarks[0].landmark
+        ]
+        np.testing.assert_allclose(
+            landmarks, [(0.375, 0.3125, 0.0375), (0.1875, 0.875, -0.1875)]
+        )
+
+    def test_full_image_mesh_when_the_roi_finds_nothing(self):
+        mesh = StubMesh(None, [(0.5, 0.5, 0.0)])
+        two_stage = TwoStageFaceMesh(
+            StubDetector([detection(0.25, 0.25, 0.25, 0.5)]), mesh
+        )
+        results = two_stage.process(self.image)
+        self.assertIs(mesh.images[1], self.image)
+        self.assertEqual(results.multi_face_landmarks[0].landmark[0].x, 0.5)
+
+    def test_full_image_mesh_without_detections(self):
+        mesh = StubMesh([(0.5, 0.5, 0.0)])
+        results = TwoStageFaceMesh(StubDetector([]), mesh).process(self.image)
+        self.assertEqual(len(mesh.images), 1)
+        self.assertIs(mesh.images[0], self.image)
+        self.assertEqual(len(results.multi_face_landmarks), 1)
@@ -1,11 +1,13 @@
 from django.urls import path
 from . import views
+from PiximaStudio.AbstractView import tool_view
+
 urlpatterns = [
-    path("api-coloreyes_tool",view=views.EyesColorToolView.as_view(),name="ColorEyesToolAPI"),
-    path("api-resizeeyes_tool",view=views.EyesResizeToolView.as_view(),name="ResizeEyesToolAPI"),
-    path("api-resizenose_tool",view=views.NoseResizeToolView.as_view(),name="ResizeNoseToolAPI"),
-    path("api-smoothface_tool",view=views.SmoothFaceToolView.as_view(),name="SmoothFaceToolAPI"),
-    path("api-whiteteeth_tool",view=views.WhiteTeethToolView.as_view(),name="WhiteTeethToolAPI"),
-    path("api-colorlips_tool",view=views.ColorLipsToolView.as_view(),name="ColorLipsToolAPI"),
-    path("api-smile_tool",view=views.SmileToolView.as_view(),name="SmileToolAPI"),
+    path("api-coloreyes_tool",view=tool_view(views.EyesColorToolView),name="ColorEyesToolAPI"),
+    path("api-resizeeyes_tool",view=tool_view(views.EyesResizeToolView),name="ResizeEyesToolAPI"),
+    path("api-resizenose_tool",view=tool_view(views.NoseResizeToolView),name="ResizeNoseToolAPI"),
+    path("api-smoothface_tool",view=tool_view(views.SmoothFaceToolView),name="SmoothFaceToolAPI"),
+    path("api-whiteteeth_tool",view=tool_view(views.WhiteTeethToolView),name="WhiteTeethToolAPI"),
+    path("api-colorlips_tool",view=tool_view(views.ColorLipsToolView),name="ColorLipsToolAPI"),
+    path("api-smile_tool",view=tool_view(views.SmileToolView),name="SmileToolAPI"),
 ]
\ No newline at end of file
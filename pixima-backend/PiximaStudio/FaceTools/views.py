@@ -19,7 +19,7 @@ from .serializerHandler import (
 )
 from PiximaTools.FaceTools import EyesTool, NoseTool, FaceTools
 from PiximaTools.Exceptions import RequiredValue, NoFace
-from Core.models import ImageModel, ImageOperationsModel
+from Core.models import ImageOperationsModel
 
 
 class EyesColorToolView(RESTView):
@@ -29,10 +29,10 @@ class EyesColorToolView(RESTView):
         eyescolor_serializerhandler = EyesColorSerializerHandler(eyescolor_serializer)
         try:
             if "Image" in request.data.keys() and request.data["Image"] != "":
-                eyescolor_tool.request2data(request=request)()
-                image_path = eyescolor_tool.save_image()
-                imagepreview_path = eyescolor_tool.get_preview()
-                mask_path = eyescolor_tool.save_mask()
+                eyescolor_tool.request2data(request=request).process()
+                image_path, imagepreview_path, mask_path = eyescolor_tool.save_outputs(
+                    with_mask=True
+                )
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -41,16 +41,18 @@ class EyesColorToolView(RESTView):
                     }
                 )
             if eyescolor_serializerhandler.handle():
-                eyescolor_tool.serializer2data(
+                eyescolor_tool.add_image_model(
+                    eyescolor_serializerhandler.instance
+                ).serializer2data(
                     eyescolor_serializer
-                ).read_image().apply()
-                image_path = eyescolor_tool.save_image()
-                imagepreview_path = eyescolor_tool.get_preview()
-                mask_path = eyescolor_tool.save_mask()
-                ImageObj = ImageModel.objects.get(id=eyescolor_serializer["id"].value)
+                ).read_image().process()
+                image_path, imagepreview_path, mask_path = eyescolor_tool.save_outputs(
+                    with_mask=True
+                )
                 ImageOperationsModel.objects.create(
-                    image=ImageObj, operation_name="EyesColorTool"
-                ).save()
+                    image=eyescolor_serializerhandler.instance,
+                    operation_name="EyesColorTool",
+                )
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -76,9 +78,8 @@ class EyesResizeToolView(RESTView):
         )
         try:
             if "Image" in request.data.keys() and request.data["Image"] != "":
-                eyesresize_tool.request2data(request=request)()
-                image_path = eyesresize_tool.save_image()
-                imagepreview_path = eyesresize_tool.get_preview()
+                eyesresize_tool.request2data(request=request).process()
+                image_path, imagepreview_path = eyesresize_tool.save_outputs()
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -86,13 +87,16 @@ class EyesResizeToolView(RESTView):
                     }
                 )
             if eyesresize_serializerhandler.handle():
-                eyesresize_tool.serializer2data(eyesresize_serializer).read_image()()
-                image_path = eyesresize_tool.save_image()
-                imagepreview_path = eyesresize_tool.get_preview()
-                ImageObj = ImageModel.objects.get(id=eyesresize_serializer["id"].value)
+                eyesresize_tool.add_image_model(
+                    eyesresize_serializerhandler.instance
+                ).serializer2data(
+                    eyesresize_serializer
+                ).read_image().process()
+                image_path, imagepreview_path = eyesresize_tool.save_outputs()
                 ImageOperationsModel.objects.create(
-                    image=ImageObj, operation_name="EyesResizeTool"
-                ).save()
+                    image=eyesresize_serializerhandler.instance,
+                    operation_name="EyesResizeTool",
+                )
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -117,9 +121,8 @@ class NoseResizeToolView(RESTView):
         )
         try:
             if "Image" in request.data.keys() and request.data["Image"] != "":
-                noseresize_tool.request2data(request=request)()
-                image_path = noseresize_tool.save_image()
-                imagepreview_path = noseresize_tool.get_preview()
+                noseresize_tool.request2data(request=request).process()
+                image_path, imagepreview_path = noseresize_tool.save_outputs()
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -127,15 +130,16 @@ class NoseResizeToolView(RESTView):
                     }
                 )
             if noseresize_serializerhandler.handle():
-                noseresize_tool.serializer2data(
+                noseresize_tool.add_image_model(
+                    noseresize_serializerhandler.instance
+                ).serializer2data(
                     noseresize_serializer
-                ).read_image().apply()
-                image_path = noseresize_tool.save_image()
-                imagepreview_path = noseresize_tool.get_preview()
-                ImageObj = ImageModel.objects.get(id=noseresize_serializer["id"].value)
+                ).read_image().process()
+                image_path, imagepreview_path = noseresize_tool.save_outputs()
                 ImageOperationsModel.objects.create(
-                    image=ImageObj, operation_name="NoseResizeTool"
-                ).save()
+                    image=noseresize_serializerhandler.instance,
+                    operation_name="NoseResizeTool",
+                )
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -160,10 +164,10 @@ class SmoothFaceToolView(RESTView):
         )
         try:
             if "Image" in request.data.keys() and request.data["Image"] != "":
-                smoothface_tool.request2data(request=request)()
-                image_path = smoothface_tool.save_image()
-                imagepreview_path = smoothface_tool.get_preview()
-                mask_path = smoothface_tool.save_mask()
+                smoothface_tool.request2data(request=request).process()
+                image_path, imagepreview_path, mask_path = smoothface_tool.save_outputs(
+                    with_mask=True
+                )
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -172,16 +176,18 @@ class SmoothFaceToolView(RESTView):
                     }
                 )
             if smoothface_serializerhandler.handle():
-                smoothface_tool.serializer2data(
+                smoothface_tool.add_image_model(
+                    smoothface_serializerhandler.instance
+                ).serializer2data(
                     smoothface_serializer
-                ).read_image().apply()
-                image_path = smoothface_tool.save_image()
-                imagepreview_path = smoothface_tool.get_preview()
-                mask_path = smoothface_tool.save_mask()
-                ImageObj = ImageModel.objects.get(id=smoothface_serializer["id"].value)
+                ).read_image().process()
+                image_path, imagepreview_path, mask_path = smoothface_tool.save_outputs(
+                    with_mask=True
+                )
                 ImageOperationsModel.objects.create(
-                    image=ImageObj, operation_name="SmoothFaceTool"
-                ).save()
+                    image=smoothface_serializerhandler.instance,
+                    operation_name="SmoothFaceTool",
+                )
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -207,10 +213,10 @@ class WhiteTeethToolView(RESTView):
         )
         try:
             if "Image" in request.data.keys() and request.data["Image"] != "":
-                white_tool.request2data(request=request)()
-                image_path = white_tool.save_image()
-                imagepreview_path = white_tool.get_preview()
-                mask_path = white_tool.save_mask()
+                white_tool.request2data(request=request).process()
+                image_path, imagepreview_path, mask_path = white_tool.save_outputs(
+                    with_mask=True
+                )
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -219,14 +225,16 @@ class WhiteTeethToolView(RESTView):
                     }
                 )
             if whiteteeth_serializerhandler.handle():
-                white_tool.serializer2data(whiteteeth_serializer).read_image().apply()
-                image_path = white_tool.save_image()
-                imagepreview_path = white_tool.get_preview()
-                mask_path = white_tool.save_mask()
-                ImageObj = ImageModel.objects.get(id=whiteteeth_serializer["id"].value)
+                white_tool.add_image_model(
+                    whiteteeth_serializerhandler.instance
+                ).serializer2data(whiteteeth_serializer).read_image().process()
+                image_path, imagepreview_path, mask_path = white_tool.save_outputs(
+                    with_mask=True
+                )
                 ImageOperationsModel.objects.create(
-                    image=ImageObj, operation_name="WhiteTeethTool"
-                ).save()
+                    image=whiteteeth_serializerhandler.instance,
+                    operation_name="WhiteTeethTool",
+                )
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -252,10 +260,10 @@ class ColorLipsToolView(RESTView):
         )
         try:
             if "Image" in request.data.keys() and request.data["Image"] != "":
-                colorlips_tool.request2data(request)()
-                image_path = colorlips_tool.save_image()
-                imagepreview_path = colorlips_tool.get_preview()
-                mask_path = colorlips_tool.save_mask()
+                colorlips_tool.request2data(request).process()
+                image_path, imagepreview_path, mask_path = colorlips_tool.save_outputs(
+                    with_mask=True
+                )
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -264,14 +272,18 @@ class ColorLipsToolView(RESTView):
                     }
                 )
             if colorlips_serializerhandler.handle():
-                colorlips_tool.serializer2data(colorlips_serializer).read_image()()
-                image_path = colorlips_tool.save_image()
-                imagepreview_path = colorlips_tool.get_preview()
-                mask_path = colorlips_tool.save_mask()
-                ImageObj = ImageModel.objects.get(id=colorlips_serializer["id"].value)
+                colorlips_tool.add_image_model(
+                    colorlips_serializerhandler.instance
+                ).serializer2data(
+                    colorlips_serializer
+                ).read_image().process()
+                image_path, imagepreview_path, mask_path = colorlips_tool.save_outputs(
+                    with_mask=True
+                )
                 ImageOperationsModel.objects.create(
-                    image=ImageObj, operation_name="ColorLipsTool"
-                ).save()
+                    image=colorlips_serializerhandler.instance,
+                    operation_name="ColorLipsTool",
+                )
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -297,10 +309,10 @@ class SmileToolView(RESTView):
         smile_serializerhandler = SmileToolSerializerHandler(smile_serializer)
         try:
             if "Image" in request.data.keys() and request.data["Image"] != "":
-                smile_tool.request2data(request)()
-                image_path = smile_tool.save_image()
-                imagepreview_path = smile_tool.get_preview()
-                mask_path = smile_tool.save_mask()
+                smile_tool.request2data(request).process()
+                image_path, imagepreview_path, mask_path = smile_tool.save_outputs(
+                    with_mask=True
+                )
                 return self.ok_request(
                     {
                         "Image": image_path,
@@ -309,14 +321,15 @@ class SmileToolView(RESTView):
                     }
                 )
             if smile_serializerhandler.handle():
-                smile_tool.serializer2data(smile_serializer).read_image()()
-                image_path = smile_tool.save_image()
-                imagepreview_path = smile_tool.get_preview()
-                mask_path = smile_tool.save_mask()
-                ImageObj = ImageModel.objects.get(id=smile_serializer["id"].value)
+                smile_tool.add_image_model(
+                    smile_serializerhandler.instance
+                ).serializer2data(smile_serializer).read_image().process()
+                image_path, imagepreview_path, mask_path = smile_tool.save_outputs(
+                    with_mask=True
+                )
                 ImageOperationsModel.objects.create(
-                    image=ImageObj, operation_name="SmileTool"
-                ).save()
+                    image=smile_serializerhandler.instance, operation_name="SmileTool"
+                )
                 return self.ok_request(
                     {
                         "Image": image_path,
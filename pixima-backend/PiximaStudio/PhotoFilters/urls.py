@@ -1,15 +1,16 @@
 from django.urls import path
 from . import views
+from PiximaStudio.AbstractView import tool_view
 
 urlpatterns = [
     path(
         "api-glitch_filter",
-        view=views.GlitchFilterView.as_view(),
+        view=tool_view(views.GlitchFilterView),
         name="GlitchFilterAPI",
     ),
     path(
         "api-circle_filter",
-        view=views.CircleFilterView.as_view(),
+        view=tool_view(views.CircleFilterView),
         name="CircleFilterAPI",
     ),
 ]
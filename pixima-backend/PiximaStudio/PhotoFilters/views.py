@@ -1,6 +1,6 @@
 from . import serializer, serializerHandler
 from PiximaTools import Filters
-from Core.models import ImageModel,ImageOperationsModel
+from Core.models import ImageOperationsModel
 from PiximaStudio.AbstractView import RESTView
 
 
@@ -13,25 +13,23 @@ class GlitchFilterView(RESTView):
         )
         try:
             if "Image" in request.data.keys() and request.data["Image"] != "":
-                glitch_filter.request2data(request=request)()
-                image_path = glitch_filter.save_image()
-                imagepreview_path = glitch_filter.get_preview()
+                glitch_filter.request2data(request=request).process()
+                image_path, imagepreview_path = glitch_filter.save_outputs()
                 return self.ok_request({
                         "Image": image_path,
                         "ImagePreview": imagepreview_path,
                     }
                 )
             if filter_handler.handle():
-                image_path = (
-                    glitch_filter.serializer2data(glicth_serializer)
-                    .read_image()()
-                    .save_image()
+                image_path, imagepreview_path = (
+                    glitch_filter.add_image_model(filter_handler.instance)
+                    .serializer2data(glicth_serializer)
+                    .read_image().process()
+                    .save_outputs()
                 )
-                imagepreview_path = glitch_filter.get_preview()
-                ImageObj = ImageModel.objects.get(id=glicth_serializer["id"].value)
                 ImageOperationsModel.objects.create(
-                    image=ImageObj, operation_name="GlitchFilter"
-                ).save()
+                    image=filter_handler.instance, operation_name="GlitchFilter"
+                )
 
                 return self.ok_request({
                         "Image": image_path,
@@ -53,24 +51,21 @@ class CircleFilterView(RESTView):
         try:
             if "Image" in request.data.keys() and request.data["Image"] != "":
                 file = request.data["Image"].file
-                circles_filter.request2data(request=request)()
-                image_path = circles_filter.save_image()
-                imagepreview_path = circles_filter.get_preview()
+                circles_filter.request2data(request=request).process()
+                image_path, imagepreview_path = circles_filter.save_outputs()
                 return self.ok_request({
                         "Image": image_path,
                         "ImagePreview": imagepreview_path,
                     }
                 )
             if filter_handler.handle():
-                circles_filter.serializer2data(
+                circles_filter.add_image_model(filter_handler.instance).serializer2data(
                     serializer=circles_serializer
-                ).read_image().apply()
-                image_path = circles_filter.save_image()
-                imagepreview_path = circles_filter.get_preview()
-                ImageObj = ImageModel.objects.get(id=circles_filter["id"].value)
+                ).read_image().process()
+                image_path, imagepreview_path = circles_filter.save_outputs()
                 ImageOperationsModel.objects.create(
-                    image=ImageObj, operation_name="CircleFilter"
-                ).save()
+                    image=filter_handler.instance, operation_name="CircleFilter"
+                )
                 return self.ok_request({
                         "Image": image_path,
                         "ImagePreview": imagepreview_path,
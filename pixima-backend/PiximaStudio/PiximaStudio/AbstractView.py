@@ -1,7 +1,20 @@
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import time
+from asgiref.sync import sync_to_async
 from django.views import View
+from django.db import close_old_connections
 from rest_framework.views import APIView
-from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_400_BAD_REQUEST,
+    HTTP_503_SERVICE_UNAVAILABLE,
+)
 from django.http import JsonResponse
+from PiximaTools.Timing import stage
+from PiximaTools.Metrics import metrics
+from PiximaStudio.Profiling import profiled
+from PiximaStudio.settings import ASYNC_TOOL_VIEWS, ASYNC_TOOL_WORKERS, REQUEST_TIMING
 
 
 class AbstractView(View):
@@ -14,5 +27,87 @@ class AbstractView(View):
     def ok_request(self,info: dict):
         return JsonResponse(data={"code": HTTP_200_OK, "status": "OK", **info})
 
+    def service_unavailable(self, info: dict):
+        return JsonResponse(
+            data={
+                "code": HTTP_503_SERVICE_UNAVAILABLE,
+                "status": "SERVICE UNAVAILABLE",
+                **info,
+            },
+            status=HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
 class RESTView(AbstractView,APIView):
-    pass
\ No newline at end of file
+    def dispatch(self, request, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return profiled(
+                request,
+                type(self).__name__,
+                lambda: super(RESTView, self).dispatch(request, *args, **kwargs),
+            )
+        finally:
+            metrics.observe(
+                "pixima_request_seconds",
+                time.perf_counter() - started,
+                view=type(self).__name__,
+            )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if REQUEST_TIMING:
+            # Parse The Upload Here So It Shows Up As Its Own Stage
+            with stage("parse"):
+                try:
+                    request.data
+                except Exception:
+                    pass
+
+
+# Bounded: Slow Uploads And Queued Jobs Wait On The Event Loop, Not On A Thread Each
+tool_executor = ThreadPoolExecutor(
+    max_workers=ASYNC_TOOL_WORKERS, thread_name_prefix="PiximaTool"
+)
+metrics.register_collector(
+    lambda registry: registry.set_gauge(
+        "pixima_queue_depth", tool_executor._work_queue.qsize(), queue="async_tools"
+    )
+)
+
+
+def _run_view(view, request, *args, **kwargs):
+    # tool_executor Threads Outlive A Request, So Connections Are Closed Per Job
+    close_old_connections()
+    try:
+        return view(request, *args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def async_tool_view(view_class):
+    """
+    Async Version Of A Tool View For ASGI Deployments (ASYNC_TOOL_VIEWS).
+    \nThe Event Loop Only Awaits, The Sync View Itself (Form Parsing, Image Decode,
+    Tool.apply And Encode) Runs In tool_executor, sync_to_async Carries The
+    Request Context (Stage Timings) Into The Worker Thread.
+    """
+    view = view_class.as_view()
+    run = sync_to_async(
+        functools.partial(_run_view, view),
+        thread_sensitive=False,
+        executor=tool_executor,
+    )
+
+    # Django 4.0 Only Runs Function Views Asynchronously
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        return await run(request, *args, **kwargs)
+
+    return async_view
+
+
+def tool_view(view_class):
+    "URL Helper: Serves view_class Through async_tool_view When ASYNC_TOOL_VIEWS Is On"
+    if ASYNC_TOOL_VIEWS:
+        return async_tool_view(view_class)
+    return view_class.as_view()
@@ -0,0 +1,124 @@
+import os
+import threading
+from PIL import Image
+from django.http import JsonResponse
+from django.urls import resolve, Resolver404
+from rest_framework.status import (
+    HTTP_429_TOO_MANY_REQUESTS,
+    HTTP_503_SERVICE_UNAVAILABLE,
+)
+from PiximaTools.Metrics import metrics
+from PiximaStudio.MediaLayout import media_path
+from PiximaTools.DeltaHistory import version_shape
+from PiximaStudio.settings import (
+    ADMISSION_TOOLS,
+    ADMISSION_MEMORY_BUDGET_MB,
+    ADMISSION_DEFAULT_PIXELS,
+    ADMISSION_RETRY_AFTER,
+)
+
+
+class MemoryBudget:
+    """
+    Per Process Budget Of The Bytes Held By Admitted Tool Requests.
+    \nA Request Bigger Than The Whole Budget Is Still Admitted When Nothing Else
+    Is Running, Otherwise It Could Never Be Served.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self.in_use = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, size: int) -> bool:
+        with self._lock:
+            if self.in_use and self.in_use + size > self.budget_bytes:
+                return False
+            self.in_use += size
+            return True
+
+    def release(self, size: int):
+        with self._lock:
+            self.in_use -= size
+
+
+class AdmissionMiddleware:
+    """
+    Admission Control For The Heavy Tool Endpoints Listed In ADMISSION_TOOLS.
+    \nEach Listed Url Name Gets A Concurrency Semaphore And Is Charged
+    pixels * bytes_per_pixel Against ADMISSION_MEMORY_BUDGET_MB, Requests Over
+    The Limit Get 429 (Concurrency) Or 503 (Memory) With Retry-After.
+    Endpoints Not Listed (BasicPhotoTools, Filters) Are Never Held Back.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.semaphores = {
+            name: threading.BoundedSemaphore(limits["concurrency"])
+            for name, limits in ADMISSION_TOOLS.items()
+        }
+        self.budget = MemoryBudget(ADMISSION_MEMORY_BUDGET_MB * 1024 * 1024)
+
+    def __call__(self, request):
+        name = self.url_name(request)
+        if request.method != "POST" or name not in ADMISSION_TOOLS:
+            return self.get_response(request)
+
+        semaphore = self.semaphores[name]
+        if not semaphore.acquire(blocking=False):
+            return self.reject(HTTP_429_TOO_MANY_REQUESTS, "TOO MANY REQUESTS", name)
+        try:
+            bytes_per_pixel = ADMISSION_TOOLS[name]["bytes_per_pixel"]
+            size = self.image_pixels(request) * bytes_per_pixel
+            if not self.budget.reserve(size):
+                return self.reject(
+                    HTTP_503_SERVICE_UNAVAILABLE, "SERVICE UNAVAILABLE", name
+                )
+            try:
+                return self.get_response(request)
+            finally:
+                self.budget.release(size)
+        finally:
+            semaphore.release()
+
+    @staticmethod
+    def url_name(request):
+        try:
+            return resolve(request.path_info).url_name
+        except Resolver404:
+            return None
+
+    @staticmethod
+    def image_pixels(request) -> int:
+        "Image Size From The Upload Or The Stored Image, Only The Header Is Read"
+        try:
+            if "Image" in request.FILES:
+                file = request.FILES["Image"]
+                width, height = Image.open(file).size
+                file.seek(0)
+                return width * height
+            if "id" in request.POST:
+                # The Latest Version (ImageIndex -1) Is Sized By The Original
+                index = max(int(request.POST.get("ImageIndex", -1)), 0)
+                path = media_path(
+                    "Images", os.path.basename(request.POST["id"]), f"{index}.jpg"
+                )
+                height, width = version_shape(path)[:2]
+                return width * height
+        except Exception:
+            pass
+        return ADMISSION_DEFAULT_PIXELS
+
+    @staticmethod
+    def reject(code, status, name):
+        metrics.inc("pixima_admission_rejected_total", tool=name, status=code)
+        response = JsonResponse(
+            data={
+                "code": code,
+                "status": status,
+                "Message": f"{name} Is Busy, Retry Later",
+            },
+            status=code,
+        )
+        response["Retry-After"] = str(ADMISSION_RETRY_AFTER)
+        return response
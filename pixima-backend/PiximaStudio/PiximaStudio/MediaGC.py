@@ -0,0 +1,318 @@
+from typing import NamedTuple
+from uuid import UUID
+from django.db import connection
+from PiximaStudio.settings import (
+    MEDIA_ROOT,
+    MEDIA_PREVIEW_TTL_S,
+    MEDIA_MASK_TTL_S,
+    MEDIA_ORPHAN_TTL_S,
+    MEDIA_MAX_VERSIONS,
+    MEDIA_QUOTA_MB,
+    MEDIA_SWEEP_INTERVAL_S,
+    WRITE_BEHIND_WAIT_S,
+)
+from PiximaTools.Metrics import metrics
+from PiximaTools.DeltaHistory import delta_parent
+from PiximaStudio.MediaLayout import DIRECTORIES, image_dirs
+import fcntl
+import logging
+import os
+import shutil
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class MediaFile(NamedTuple):
+    directory: str
+    image_id: str
+    index: int
+    path: str
+    size: int
+    # Last Read Or Written
+    used: float
+
+
+class SweepLocked(Exception):
+    pass
+
+
+class MediaSweeper:
+    """
+    Keeps MEDIA_ROOT Bounded, In This Order:
+    \n- Directories Of Images Without An ImageModel (Tool Calls On An Uploaded
+    File) Once Untouched For orphan_ttl_s
+    \n- Previews (Temp) And Masks (ImageMasks) Unused For preview_ttl_s / mask_ttl_s
+    \n- Versions Beyond max_versions Per Image, Oldest First
+    \n- Then, Over quota_bytes, Previews And Masks By LRU, Then Old Versions By LRU
+    \nThe Upload (Version 0) And The Latest Version Of An Image Are Never Evicted,
+    Nor Are The Versions A Kept Delta Version Is Rebuilt From. Write-Behind
+    Placeholders (Empty Files) Are Skipped, Until They Are placeholder_ttl_s Old:
+    Their Write Failed Or Its Process Died, Readers Would Wait On Them Forever.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        preview_ttl_s: float,
+        mask_ttl_s: float,
+        orphan_ttl_s: float,
+        max_versions: int,
+        quota_bytes: int,
+        interval_s: float,
+        placeholder_ttl_s: float = WRITE_BEHIND_WAIT_S,
+    ):
+        self.root = root
+        self.preview_ttl_s = preview_ttl_s
+        self.mask_ttl_s = mask_ttl_s
+        self.orphan_ttl_s = orphan_ttl_s
+        self.max_versions = max_versions
+        self.quota_bytes = quota_bytes
+        self.interval_s = interval_s
+        self.placeholder_ttl_s = placeholder_ttl_s
+        self._thread = None
+
+    def scan(self, placeholders: list = None) -> dict:
+        """
+        image_id -> Files Of That Image In All DIRECTORIES, Empty Placeholders Are
+        Appended To placeholders Instead
+        """
+        images = {}
+        for directory in DIRECTORIES:
+            for image_id, sub_path in image_dirs(directory, self.root):
+                files = images.setdefault(image_id, [])
+                for file_name in os.listdir(sub_path):
+                    stem = file_name.split(".")[0].split("_")[0]
+                    path = os.path.join(sub_path, file_name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    if not stem.isdigit():
+                        continue
+                    file = MediaFile(
+                        directory,
+                        image_id,
+                        int(stem),
+                        path,
+                        stat.st_size,
+                        max(stat.st_atime, stat.st_mtime),
+                    )
+                    if stat.st_size > 0:
+                        files.append(file)
+                    elif placeholders is not None:
+                        placeholders.append(file)
+        return images
+
+    @staticmethod
+    def stored_ids(image_ids) -> set:
+        from Core.models import ImageModel
+
+        valid = []
+        for image_id in image_ids:
+            try:
+                valid.append(UUID(image_id))
+            except ValueError:
+                pass
+        return {
+            str(pk)
+            for pk in ImageModel.objects.filter(pk__in=valid).values_list(
+                "pk", flat=True
+            )
+        }
+
+    def sweep(self, dry_run: bool = False) -> dict:
+        """
+        One Pass Over MEDIA_ROOT, Returns The Report:
+        {reason: {"files": n, "bytes": n}, "total_bytes": n, "remaining_bytes": n}
+        """
+        now = time.time()
+        placeholders = []
+        images = self.scan(placeholders)
+        stored = self.stored_ids(images)
+        reasons = ("placeholders", "orphans", "previews", "masks", "history", "quota")
+        report = {reason: {"files": 0, "bytes": 0} for reason in reasons}
+        report["total_bytes"] = sum(
+            file.size for files in images.values() for file in files
+        )
+        evicted_versions, evicted = {}, set()
+
+        def evict(file, reason):
+            report[reason]["files"] += 1
+            report[reason]["bytes"] += file.size
+            evicted.add(file.path)
+            if dry_run:
+                return
+            try:
+                os.remove(file.path)
+            except FileNotFoundError:
+                return
+            metrics.inc(
+                "pixima_media_bytes_reclaimed_total",
+                file.size,
+                directory=file.directory,
+                reason=reason,
+            )
+            if file.directory == "Images":
+                evicted_versions.setdefault(file.image_id, []).append(file.index)
+
+        for file in placeholders:
+            if now - file.used <= self.placeholder_ttl_s:
+                continue
+            try:
+                # Its Write May Have Landed Since The Scan
+                if os.path.getsize(file.path) > 0:
+                    continue
+            except FileNotFoundError:
+                continue
+            evict(file, "placeholders")
+
+        kept = []
+        for image_id, files in images.items():
+            if image_id not in stored:
+                last_used = max((file.used for file in files), default=now)
+                if now - last_used > self.orphan_ttl_s:
+                    for file in files:
+                        evict(file, "orphans")
+                    if not dry_run:
+                        for sub_path in {os.path.dirname(file.path) for file in files}:
+                            shutil.rmtree(sub_path, ignore_errors=True)
+                    continue
+
+            versions = sorted(
+                (file for file in files if file.directory == "Images"),
+                key=lambda file: file.index,
+            )
+            protected = {0, versions[-1].index} if versions else {0}
+            previews, masks = [], []
+            for file in files:
+                if file.directory == "Temp":
+                    if now - file.used > self.preview_ttl_s:
+                        evict(file, "previews")
+                    else:
+                        previews.append(file)
+                elif file.directory == "ImageMasks":
+                    if now - file.used > self.mask_ttl_s:
+                        evict(file, "masks")
+                    else:
+                        masks.append(file)
+
+            parents = {file.index: delta_parent(file.path) for file in versions}
+            intermediate = [file for file in versions if file.index not in protected]
+            if self.max_versions > 0:
+                excess = max(len(versions) - max(self.max_versions, len(protected)), 0)
+                oldest = {file.index for file in intermediate[:excess]}
+                needed = self.ancestors(parents, set(parents) - oldest)
+                for file in intermediate[:excess]:
+                    if file.index not in needed:
+                        evict(file, "history")
+                intermediate = [
+                    file
+                    for file in intermediate
+                    if file.index not in oldest or file.index in needed
+                ]
+            remaining = protected | {file.index for file in intermediate}
+            needed = protected | self.ancestors(parents, remaining)
+            kept.extend((0, file) for file in previews + masks)
+            kept.extend(
+                (2 if file.index in needed else 1, file)
+                for file in versions
+                if file.index in remaining
+            )
+
+        remaining = sum(file.size for _, file in kept)
+        if self.quota_bytes > 0 and remaining > self.quota_bytes:
+            candidates = sorted(
+                (item for item in kept if item[0] < 2),
+                key=lambda item: (item[0], item[1].used),
+            )
+            for _, file in candidates:
+                if remaining <= self.quota_bytes:
+                    break
+                evict(file, "quota")
+                remaining -= file.size
+        report["remaining_bytes"] = remaining
+
+        if dry_run:
+            return report
+        if evicted_versions:
+            self.unindex(evicted_versions)
+        for directory in DIRECTORIES:
+            metrics.set_gauge(
+                "pixima_media_bytes",
+                sum(
+                    file.size
+                    for _, file in kept
+                    if file.directory == directory and file.path not in evicted
+                ),
+                directory=directory,
+            )
+        return report
+
+    @staticmethod
+    def ancestors(parents: dict, indexes) -> set:
+        "Versions The Delta Versions Among indexes Are Rebuilt From"
+        needed = set()
+        for index in indexes:
+            parent = parents.get(index)
+            while parent is not None and parent not in needed:
+                needed.add(parent)
+                parent = parents.get(parent)
+        return needed
+
+    @staticmethod
+    def unindex(evicted_versions: dict):
+        "Drops The image_versions Rows Of Evicted Version Files"
+        from Core.models import ImageVersion
+
+        for image_id, indexes in evicted_versions.items():
+            ImageVersion.objects.filter(image_id=image_id, index__in=indexes).delete()
+
+    def locked_sweep(self, dry_run: bool = False) -> dict:
+        "sweep() Under MEDIA_ROOT/.sweep.lock, One Sweep At A Time Across Processes"
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, ".sweep.lock"), "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise SweepLocked("Another Sweep Is Running")
+            try:
+                return self.sweep(dry_run=dry_run)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def run(self):
+        while True:
+            time.sleep(self.interval_s)
+            try:
+                report = self.locked_sweep()
+                logger.info("Media sweep: %s", report)
+            except SweepLocked:
+                pass
+            except Exception:
+                logger.exception("Media sweep failed")
+            finally:
+                connection.close()
+
+    def start(self):
+        "Background Sweeper Every interval_s (Off At 0), Every Worker Tries, One Sweeps"
+        if self.interval_s <= 0:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self.run, name="MediaSweeper", daemon=True
+        )
+        self._thread.start()
+
+
+media_sweeper = MediaSweeper(
+    MEDIA_ROOT,
+    MEDIA_PREVIEW_TTL_S,
+    MEDIA_MASK_TTL_S,
+    MEDIA_ORPHAN_TTL_S,
+    MEDIA_MAX_VERSIONS,
+    MEDIA_QUOTA_MB * 1024 * 1024,
+    MEDIA_SWEEP_INTERVAL_S,
+)
@@ -0,0 +1,55 @@
+from PiximaStudio.settings import MEDIA_ROOT, MEDIA_URL, MEDIA_SHARD_DEPTH
+import os
+
+# Media Directories Holding One Sub-Directory Per Image
+DIRECTORIES = ("Images", "Temp", "ImageMasks")
+
+
+def shard(image_id, depth: int = MEDIA_SHARD_DEPTH) -> str:
+    """
+    Directory Of An Image Below Images, Temp And ImageMasks: With depth 2
+    Image 3f2a9c41-... Lives In 3f/2a/3f2a9c41-..., depth 0 Is The Flat Layout.
+    """
+    image_id = str(image_id)
+    digits = image_id.replace("-", "")
+    prefixes = [digits[2 * level : 2 * level + 2] for level in range(depth)]
+    return os.path.join(*prefixes, image_id)
+
+
+def media_name(directory: str, image_id, file_name: str = "", depth=None) -> str:
+    "Path Relative To MEDIA_ROOT, As Stored In The Database"
+    if depth is None:
+        depth = MEDIA_SHARD_DEPTH
+    return os.path.join(directory, shard(image_id, depth), file_name)
+
+
+def media_path(directory: str, image_id, file_name: str = "", depth=None) -> str:
+    return os.path.join(MEDIA_ROOT, media_name(directory, image_id, file_name, depth))
+
+
+def media_url(directory: str, image_id, file_name: str) -> str:
+    return os.path.join(MEDIA_URL, media_name(directory, image_id, file_name))
+
+
+def is_shard(name: str) -> bool:
+    return len(name) == 2 and all(c in "0123456789abcdef" for c in name)
+
+
+def image_dirs(directory: str, root: str = MEDIA_ROOT):
+    """
+    Yields (image_id, path) For Every Image Directory Below root/directory,
+    Whatever The Depth It Was Sharded With (shard_media Moves Between Layouts).
+    """
+    top = os.path.join(root, directory)
+    if not os.path.isdir(top):
+        return
+    stack = [top]
+    while stack:
+        current = stack.pop()
+        for entry in os.scandir(current):
+            if not entry.is_dir():
+                continue
+            if is_shard(entry.name):
+                stack.append(entry.path)
+            else:
+                yield entry.name, entry.path
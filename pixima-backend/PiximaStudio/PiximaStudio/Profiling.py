@@ -0,0 +1,85 @@
+from contextvars import ContextVar
+from datetime import datetime
+import cProfile
+import json
+import os
+import random
+import time
+from PiximaStudio.settings import (
+    PROFILE_DIR,
+    PROFILE_HEADER,
+    PROFILE_TOKEN,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_MAX_FILES,
+)
+
+# Tags Of The Request Being Profiled (Tool, Image Size), None Otherwise
+_tags = ContextVar("pixima_profile_tags", default=None)
+
+
+def tag(**values):
+    "Adds Tags To The Running Profile, A No-Op When The Request Is Not Profiled"
+    tags = _tags.get()
+    if tags is not None:
+        tags.update(values)
+
+
+def should_profile(request) -> bool:
+    """
+    PROFILE_SAMPLE_RATE Of All Requests, Plus Any Request Sending The
+    PROFILE_HEADER With PROFILE_TOKEN (The Header Is Ignored Without A Token).
+    """
+    if PROFILE_TOKEN and request.headers.get(PROFILE_HEADER) == PROFILE_TOKEN:
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def profiled(request, view_name: str, handler):
+    "Runs handler() Under cProfile When should_profile, Spools The Result"
+    if not should_profile(request):
+        return handler()
+
+    tags = {"view": view_name}
+    token = _tags.set(tags)
+    profile = cProfile.Profile()
+    started = time.perf_counter()
+    response = None
+    try:
+        response = profile.runcall(handler)
+        return response
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        _tags.reset(token)
+        tags.update(
+            {
+                "path": request.path,
+                "method": request.method,
+                "status": getattr(response, "status_code", None),
+                "duration_ms": round(duration_ms, 1),
+                "time": datetime.now().isoformat(timespec="seconds"),
+            }
+        )
+        spool(profile, tags)
+
+
+def spool(profile, tags: dict):
+    "PROFILE_DIR/<time>_<view>_<image>.prof And A .json With Its Tags"
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = "_".join(
+        [
+            datetime.now().strftime("%Y%m%d-%H%M%S-%f"),
+            tags.get("tool", tags["view"]),
+            tags.get("image", "noimage"),
+        ]
+    )
+    profile.dump_stats(os.path.join(PROFILE_DIR, f"{name}.prof"))
+    with open(os.path.join(PROFILE_DIR, f"{name}.json"), "w") as file:
+        json.dump(tags, file)
+
+    captured = sorted(f for f in os.listdir(PROFILE_DIR) if f.endswith(".prof"))
+    for old in captured[: max(len(captured) - PROFILE_MAX_FILES, 0)]:
+        for extension in (".prof", ".json"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, old[: -len(".prof")] + extension))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,44 @@
+import json
+import logging
+import time
+from PiximaTools.Timing import begin, end
+
+logger = logging.getLogger(__name__)
+
+
+class ServerTimingMiddleware:
+    """
+    Per Request Stage Timings (REQUEST_TIMING): Attached As A Server-Timing
+    Header And Logged As One JSON Line On The "PiximaStudio.ServerTiming" Logger.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = begin()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            stages = end(token)
+        total = (time.perf_counter() - started) * 1000
+
+        response["Server-Timing"] = ", ".join(
+            [f"{name};dur={duration:.1f}" for name, duration in stages.items()]
+            + [f"total;dur={total:.1f}"]
+        )
+        logger.info(
+            json.dumps(
+                {
+                    "path": request.path,
+                    "method": request.method,
+                    "status": response.status_code,
+                    "total_ms": round(total, 1),
+                    "stages_ms": {
+                        name: round(duration, 1) for name, duration in stages.items()
+                    },
+                }
+            )
+        )
+        return response
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.0/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 import Config as configrations
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -37,6 +38,183 @@ REST_FRAMWORK = {
 }
 MEDIA_ROOT = os.path.join(PROJECT_DIR,'pixima_media')
 MEDIA_URL = '/pixima_media/'
+
+# DNN Inference Configrations
+# Concurrent predict calls are grouped into one forward pass of up to
+# DNN_BATCH_SIZE items, waiting at most DNN_BATCH_WAIT_MS for the batch to fill
+DNN_BATCH_SIZE = 8
+DNN_BATCH_WAIT_MS = 5
+# "keras" runs the .h5 models, "tflite" runs the files written by
+# `manage.py export_tflite` on the TFLite interpreter
+DNN_BACKEND = 'keras'
+TFLITE_NUM_THREADS = 2
+# Which exported variant the tflite backend loads: "none", "float16" or "int8"
+TFLITE_QUANTIZATION = 'none'
+# Run every model once at process start, api-ready reports 503 until it is
+# done. Off by default: it imports mediapipe and tensorflow and builds every
+# graph in each worker, also in ones that only serve the basic tools. Turn it
+# on only where the face and body tools are served and every .h5 model under
+# DNN_Models is present, a missing model fails the warm up and api-ready then
+# keeps reporting 503
+WARMUP_ON_STARTUP = False
+# Read model weights in the master process before the workers are forked
+# (gunicorn --preload), needs DNN_BACKEND = 'tflite'
+PRELOAD_MODELS = False
+
+# Inference Pool Configrations
+# Sidecar processes that run Tool.apply for the listed tools, images are handed
+# over through shared memory. 0 runs every tool in the request thread
+INFERENCE_POOL_SIZE = 0
+INFERENCE_POOL_TOOLS = [
+    'SmoothFaceTool',
+    'ColorHairTool',
+    'EyesColorTool',
+    'EyesResizeTool',
+    'NoseResizeTool',
+    'WhiteTeethTool',
+    'ColorLipsTool',
+    'SmileTool',
+]
+
+# Async Views Configrations
+# Serve the tool endpoints through async_tool_view (run under asgi.py), the
+# same views then run on a pool of ASYNC_TOOL_WORKERS threads
+ASYNC_TOOL_VIEWS = False
+ASYNC_TOOL_WORKERS = 4
+
+# Admission Control Configrations
+# Per url name limits for the heavy tools, a request over "concurrency" gets
+# 429, and one that would push the estimated memory (image pixels *
+# "bytes_per_pixel") of this process over ADMISSION_MEMORY_BUDGET_MB gets 503,
+# both with Retry-After. Endpoints not listed here are always admitted
+ADMISSION_TOOLS = {
+    'SmoothFaceToolAPI': {'concurrency': 2, 'bytes_per_pixel': 96},
+    'HairToolAPI': {'concurrency': 2, 'bytes_per_pixel': 96},
+    'ColorEyesToolAPI': {'concurrency': 4, 'bytes_per_pixel': 48},
+    'ResizeEyesToolAPI': {'concurrency': 4, 'bytes_per_pixel': 32},
+    'ResizeNoseToolAPI': {'concurrency': 4, 'bytes_per_pixel': 32},
+    'WhiteTeethToolAPI': {'concurrency': 4, 'bytes_per_pixel': 48},
+    'ColorLipsToolAPI': {'concurrency': 4, 'bytes_per_pixel': 48},
+    'SmileToolAPI': {'concurrency': 4, 'bytes_per_pixel': 48},
+}
+ADMISSION_MEMORY_BUDGET_MB = 2048
+# Used when the image size can not be read from the request (12 MP)
+ADMISSION_DEFAULT_PIXELS = 4000 * 3000
+ADMISSION_RETRY_AFTER = 2
+
+# Write-Behind Configrations
+# Respond as soon as the output paths are reserved, the JPEG encodes and writes
+# run on WRITE_BEHIND_WORKERS threads. Media requests for files still in flight
+# are answered from memory, readers wait up to WRITE_BEHIND_WAIT_S for a file,
+# pending writes are flushed when the process exits
+WRITE_BEHIND = False
+WRITE_BEHIND_WORKERS = 2
+WRITE_BEHIND_WAIT_S = 10
+# Threads shared by all requests that encode the version, preview and mask of
+# one request in parallel when the writes stay synchronous, below 2 encodes
+# them one after the other
+ENCODE_WORKERS = 6
+
+# Request Timing Configrations
+# Record per stage durations (parse, decode, read_image, mediapipe, dnn, mask,
+# apply, encode, db) of every request, sent back as a Server-Timing header and
+# logged as one JSON line. Off means the instrumented code runs unwrapped
+REQUEST_TIMING = False
+
+# Metrics Configrations
+# Tool/model latency histograms, cache hits, queue depths and bytes written,
+# scraped from /metrics. Every worker writes its values to METRICS_DIR at most
+# every METRICS_FLUSH_S seconds, the endpoint merges the files of all workers
+METRICS_ENABLED = True
+METRICS_DIR = os.environ.get(
+    'PIXIMA_METRICS_DIR', os.path.join(tempfile.gettempdir(), 'pixima_metrics')
+)
+METRICS_FLUSH_S = 5
+
+# Profiling Configrations
+# Requests are run under cProfile and spooled to PROFILE_DIR (tagged with the
+# tool and image size) when they send PROFILE_HEADER with PROFILE_TOKEN, or for
+# a PROFILE_SAMPLE_RATE fraction of all requests. `manage.py profiles` lists and
+# summarizes them. No token means the header is ignored
+PROFILE_HEADER = 'X-Pixima-Profile'
+PROFILE_TOKEN = os.environ.get('PIXIMA_PROFILE_TOKEN', '')
+PROFILE_SAMPLE_RATE = 0.0
+PROFILE_DIR = os.path.join(PROJECT_DIR, 'pixima_profiles')
+PROFILE_MAX_FILES = 200
+
+# Version Index Configrations
+# Every saved version is indexed in the image_versions table, api-get_images
+# pages through it (after/limit) instead of listing the image directory.
+# `manage.py index_versions` indexes versions saved before the table existed
+VERSIONS_PAGE_SIZE = 50
+VERSIONS_MAX_PAGE_SIZE = 500
+
+# Version Ring Configrations
+# The last VERSION_RING_SIZE versions of each image read or saved by a worker are
+# kept decoded in memory, VERSION_RING_MEMORY_MB for all images (least recently
+# used out first). read_image and the undo/redo endpoints use them before the
+# media store, VERSION_RING_COMPRESS keeps them zlib compressed (smaller, slower
+# to read). 0 turns the ring off
+VERSION_RING_SIZE = 8
+VERSION_RING_MEMORY_MB = 512
+VERSION_RING_COMPRESS = False
+
+# Delta History Configrations
+# Versions made by region-local tools (eyes, nose, teeth, lips, smile) are stored
+# as <index>.delta: the JPEG patch of the changed bounding box and its offset
+# against the version the tool read. A full keyframe is written instead every
+# DELTA_KEYFRAME_INTERVAL versions of a chain, or when the box covers more than
+# DELTA_MAX_AREA of the image. Media requests for <index>.jpg of a delta are
+# rebuilt by the media view (the last DELTA_CACHE_SIZE are kept), keep the view
+# routed (DELTA_HISTORY on) while delta versions exist
+DELTA_HISTORY = False
+DELTA_KEYFRAME_INTERVAL = 8
+DELTA_MAX_AREA = 0.25
+DELTA_CACHE_SIZE = 32
+
+# Tiled Processing Configrations
+# Images of at least TILING_MIN_MEGAPIXELS are copied into memory-mapped scratch
+# files below TILING_DIR by the tools that support it (glitch, contrast,
+# saturation, flip, resize), which then stream TILE_ROWS rows at a time into a
+# memory-mapped result, so the tool intermediates exist for a few bands instead
+# of whole frames. Decoding and encoding are not tiled: a worker still holds one
+# full decoded frame while the file is read and while the result is encoded.
+# 0 turns tiling off
+TILING_MIN_MEGAPIXELS = 40
+TILE_ROWS = 256
+TILING_DIR = os.path.join(tempfile.gettempdir(), 'pixima_tiles')
+# Pointwise tools (contrast, saturation, lips and hair color) split images of at
+# least BAND_MIN_MEGAPIXELS into row bands run on BAND_WORKERS threads shared by
+# the requests of a process. With several gunicorn workers per host keep
+# workers * BAND_WORKERS near the core count, below 2 runs bands in the request
+# thread
+BAND_WORKERS = min(os.cpu_count() or 1, 8)
+BAND_MIN_MEGAPIXELS = 1
+
+# Media Layout Configrations
+# Image directories below Images, Temp and ImageMasks are sharded by the first
+# hex digits of the image id, two per level: with 2, Images/3f/2a/3f2a9c41-.../0.jpg.
+# 0 is the flat layout. Media is only looked up at the configured depth, so
+# switching (2 is recommended for large stores) means stopping the workers,
+# running `manage.py shard_media --depth N` and deploying with the new value
+MEDIA_SHARD_DEPTH = 0
+
+# Media Retention Configrations
+# What `manage.py prune_media` and the background sweeper evict: previews and
+# masks unused for their TTL, directories of images never stored in the database
+# (tool calls on an uploaded file), versions past MEDIA_MAX_VERSIONS per image,
+# then least recently used files while MEDIA_ROOT is over MEDIA_QUOTA_MB. The
+# upload and the latest version of an image are always kept. Empty write-behind
+# placeholders older than WRITE_BEHIND_WAIT_S (failed or abandoned writes) are
+# removed first. 0 turns a limit (and MEDIA_SWEEP_INTERVAL_S the background
+# sweeper) off
+MEDIA_PREVIEW_TTL_S = 24 * 3600
+MEDIA_MASK_TTL_S = 24 * 3600
+MEDIA_ORPHAN_TTL_S = 24 * 3600
+MEDIA_MAX_VERSIONS = 50
+MEDIA_QUOTA_MB = 0
+MEDIA_SWEEP_INTERVAL_S = 0
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -55,6 +233,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'PiximaStudio.Admission.AdmissionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -62,6 +241,8 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+if REQUEST_TIMING:
+    MIDDLEWARE.insert(0, 'PiximaStudio.ServerTiming.ServerTimingMiddleware')
 
 ROOT_URLCONF = 'PiximaStudio.urls'
 
@@ -98,6 +279,10 @@ DATABASES = {
         'PASSWORD': configrations.DB_CONFIG['PASSWORD'],
         'HOST': configrations.DB_CONFIG['HOST'],
         'PORT': configrations.DB_CONFIG['PORT'],
+        # Keep connections open across requests instead of connecting for each
+        # one. Django closes a connection that raised and no longer answers at
+        # the start and end of every request
+        'CONN_MAX_AGE': 60,
     }
 }
 
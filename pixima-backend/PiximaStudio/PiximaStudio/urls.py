@@ -14,9 +14,10 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path,include
+from django.urls import path,include,re_path
 from django.conf.urls.static import static
 from . import settings
+from Core.views import PendingMedia
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('',include('Core.urls')),
@@ -26,4 +27,12 @@ urlpatterns = [
     path('',include('BodyTools.urls')),
 ]
 
+if settings.WRITE_BEHIND or settings.DELTA_HISTORY:
+    urlpatterns.append(
+        re_path(
+            r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'),
+            PendingMedia.as_view(),
+            name='PendingMedia',
+        )
+    )
 urlpatterns+=static(settings.MEDIA_URL,document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -14,3 +14,21 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'PiximaStudio.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings
+from PiximaTools.AI_Models import preload_models, start_warm_up
+from PiximaStudio.MediaGC import media_sweeper
+
+if settings.PRELOAD_MODELS:
+    preload_models()
+    # Warming Up Starts Runtime Threads, Which Must Happen In The Workers
+    if settings.WARMUP_ON_STARTUP:
+        os.register_at_fork(after_in_child=start_warm_up)
+elif settings.WARMUP_ON_STARTUP:
+    start_warm_up()
+
+# Same As Warming Up: Preloaded Apps Are Forked, The Sweeper Thread Runs In The Workers
+if settings.PRELOAD_MODELS:
+    os.register_at_fork(after_in_child=media_sweeper.start)
+else:
+    media_sweeper.start()
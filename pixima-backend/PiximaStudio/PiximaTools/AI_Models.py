@@ -1,28 +1,196 @@
 from abc import ABC, abstractmethod
-import mediapipe as mp
-import keras as ke
+from concurrent.futures import Future
+import functools
+import gc
+import logging
+import queue
+import threading
+import time
 import numpy as np
-from PiximaStudio.settings import PROJECT_DIR
+import cv2
+from PiximaStudio.settings import (
+    PROJECT_DIR,
+    DNN_BATCH_SIZE,
+    DNN_BATCH_WAIT_MS,
+    DNN_BACKEND,
+    TFLITE_NUM_THREADS,
+    TFLITE_QUANTIZATION,
+)
+from PiximaTools.Timing import stage, timed_model
+from PiximaTools.Metrics import metrics
 import os
-from mediapipe.python.solutions.drawing_utils import DrawingSpec
-from mediapipe.python.solutions.drawing_utils import draw_landmarks
-mp_face_detection = mp.solutions.face_detection
-mp_face_mesh = mp.solutions.face_mesh
-mp_drawing_styles = mp.solutions.drawing_styles
 
-mp_selfie_segmentation = mp.solutions.selfie_segmentation
-selfie_segmentation_model = mp_selfie_segmentation.SelfieSegmentation(model_selection=0)
+logger = logging.getLogger(__name__)
 
-face_detection_model = mp_face_detection.FaceDetection(
-    model_selection=1, min_detection_confidence=0.5
-)
+# MediaPipe And Keras Pull In TensorFlow, Which Takes Seconds To Import.
+# Nothing Here Imports Them Or Builds A Graph Until A Tool Asks For One,
+# So manage.py Commands And The Basic Tools Never Pay For It.
+# Measured With mediapipe 0.10 And TensorFlow 2.16 (Median Of 5 Runs),
+# manage.py check Went From 4.8 s To 0.85 s And Starting A Worker (Importing
+# PiximaStudio.wsgi, Loading The URL Configuration) From 4.6 s To 1.1 s. That Holds
+# With WARMUP_ON_STARTUP Off, Warming Up Imports Them Right After Start.
+# Core.tests.LazyImportTests Keeps Worker Start Free Of Them.
+
+
+def _once(factory):
+    lock = threading.Lock()
+    value = []
+
+    @functools.wraps(factory)
+    def wrapper():
+        if not value:
+            with lock:
+                if not value:
+                    value.append(factory())
+        return value[0]
+
+    return wrapper
+
+
+@_once
+def mediapipe_solutions():
+    import mediapipe as mp
+
+    return mp.solutions
+
+
+@_once
+def get_selfie_segmentation_model():
+    return timed_model(
+        mediapipe_solutions().selfie_segmentation.SelfieSegmentation(
+            model_selection=0
+        ),
+        "mediapipe",
+    )
+
+
+@_once
+def get_face_detection_model():
+    return timed_model(
+        mediapipe_solutions().face_detection.FaceDetection(
+            model_selection=1, min_detection_confidence=0.5
+        ),
+        "mediapipe",
+    )
+
+
+@_once
+def get_face_mesh_model():
+    return timed_model(
+        mediapipe_solutions().face_mesh.FaceMesh(
+            static_image_mode=True,
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.5,
+        ),
+        "mediapipe",
+    )
+
+
+@_once
+def get_two_stage_face_mesh_model():
+    return TwoStageFaceMesh()
+
+
+_LAZY_ATTRIBUTES = {
+    "mp_face_detection": lambda: mediapipe_solutions().face_detection,
+    "mp_face_mesh": lambda: mediapipe_solutions().face_mesh,
+    "mp_drawing_styles": lambda: mediapipe_solutions().drawing_styles,
+    "mp_selfie_segmentation": lambda: mediapipe_solutions().selfie_segmentation,
+    "DrawingSpec": lambda: mediapipe_solutions().drawing_utils.DrawingSpec,
+    "draw_landmarks": lambda: mediapipe_solutions().drawing_utils.draw_landmarks,
+    "selfie_segmentation_model": get_selfie_segmentation_model,
+    "face_detection_model": get_face_detection_model,
+    "face_mesh_model": get_face_mesh_model,
+    "two_stage_face_mesh_model": get_two_stage_face_mesh_model,
+}
+
+
+def __getattr__(name):
+    "AI_Models.face_mesh_model And Friends Still Work, They Are Just Created On First Access"
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = _LAZY_ATTRIBUTES[name]()
+    globals()[name] = value
+    return value
+
+
+class FaceMeshResults:
+    def __init__(self, multi_face_landmarks=None):
+        self.multi_face_landmarks = multi_face_landmarks
+
+
+class TwoStageFaceMesh:
+    "Drop-in face_mesh_model: Detects Faces On A Thumbnail, Meshes Only Their ROIs"
+
+    def __init__(
+        self,
+        faceDetector=None,
+        faceMeshDetector=None,
+        max_side=640,
+        padding=0.25,
+        max_num_faces=1,
+    ):
+        if faceDetector is None:
+            faceDetector = get_face_detection_model()
+        if faceMeshDetector is None:
+            faceMeshDetector = get_face_mesh_model()
+        self.faceDetector = faceDetector
+        self.faceMeshDetector = faceMeshDetector
+        self.max_side = max_side
+        self.padding = padding
+        self.max_num_faces = max_num_faces
+
+    def __thumbnail(self, image):
+        h, w = image.shape[:2]
+        scale = self.max_side / max(h, w)
+        if scale >= 1:
+            return image
+        return cv2.resize(
+            image,
+            (max(1, int(w * scale)), max(1, int(h * scale))),
+            interpolation=cv2.INTER_AREA,
+        )
+
+    def __padded_roi(self, rbb, w, h):
+        pad_x, pad_y = rbb.width * self.padding, rbb.height * self.padding
+        x0 = int(max(0.0, rbb.xmin - pad_x) * w)
+        y0 = int(max(0.0, rbb.ymin - pad_y) * h)
+        x1 = int(min(1.0, rbb.xmin + rbb.width + pad_x) * w)
+        y1 = int(min(1.0, rbb.ymin + rbb.height + pad_y) * h)
+        return x0, y0, x1, y1
+
+    def process(self, image):
+        h, w = image.shape[:2]
+        detections = self.faceDetector.process(self.__thumbnail(image)).detections
+        if not detections:
+            # The Detector Can Miss Faces The Mesh Still Finds, Keep The Old Behaviour
+            return self.faceMeshDetector.process(image)
+
+        detections = sorted(detections, key=lambda d: d.score[0], reverse=True)
+        multi_face_landmarks = []
+        for detection in detections[: self.max_num_faces]:
+            x0, y0, x1, y1 = self.__padded_roi(
+                detection.location_data.relative_bounding_box, w, h
+            )
+            if x1 - x0 < 2 or y1 - y0 < 2:
+                continue
+            roi = np.ascontiguousarray(image[y0:y1, x0:x1])
+            results = self.faceMeshDetector.process(roi)
+            if not results.multi_face_landmarks:
+                continue
+            rw, rh = x1 - x0, y1 - y0
+            for face_landmarks in results.multi_face_landmarks:
+                for landmark in face_landmarks.landmark:
+                    landmark.x = (x0 + landmark.x * rw) / w
+                    landmark.y = (y0 + landmark.y * rh) / h
+                    landmark.z = landmark.z * rw / w
+                multi_face_landmarks.append(face_landmarks)
+        if not multi_face_landmarks:
+            # Tight Boxes, Profiles Or Small Faces Can Defeat The ROI Mesh
+            return self.faceMeshDetector.process(image)
+        return FaceMeshResults(multi_face_landmarks)
 
-face_mesh_model = mp_face_mesh.FaceMesh(
-    static_image_mode=True,
-    max_num_faces=1,
-    refine_landmarks=True,
-    min_detection_confidence=0.5,
-)
 
 class AIModel(ABC):
     @classmethod
@@ -34,28 +202,366 @@ class AIModel(ABC):
     @abstractmethod
     def predict(self,input):
         pass
-    
-class DNNModel(AIModel):
-    pass
 
-class FaceSegmentationModel(DNNModel):
-    def __init__(self,path=os.path.join(PROJECT_DIR,"DNN_Models","FaceSeg-Model.h5")):
-        self.model = ke.models.load_model(path)
 
-    def load_model(self,path=os.path.join(PROJECT_DIR,"DNN_Models","FaceSeg-Model.h5")):
+class BatchInferenceService:
+    "Batches The predict Calls Of A Worker's Request Threads Into One Forward Pass"
+
+    def __init__(self, forward, max_batch_size=8, max_wait_ms=5):
+        self.forward = forward
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.__queue = queue.Queue()
+        self.__lock = threading.Lock()
+        self.__worker = None
+        self.__stats = {
+            "requests": 0,
+            "batches": 0,
+            "max_batch_size": 0,
+            "total_latency": 0.0,
+            "max_latency": 0.0,
+            "total_forward_time": 0.0,
+        }
+
+    def __start(self):
+        # The Thread Does Not Survive A Fork, So Check Liveness Instead Of A Flag
+        if self.__worker is not None and self.__worker.is_alive():
+            return
+        with self.__lock:
+            if self.__worker is None or not self.__worker.is_alive():
+                self.__worker = threading.Thread(
+                    target=self.__run, name="BatchInferenceService", daemon=True
+                )
+                self.__worker.start()
+
+    def submit(self, item):
+        future = Future()
+        self.__start()
+        self.__queue.put((item, future, time.perf_counter()))
+        return future
+
+    def predict(self, item):
+        return self.submit(item).result()
+
+    def __collect(self):
+        batch = [self.__queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.__queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def __run(self):
+        while True:
+            batch = self.__collect()
+            forward_start = time.perf_counter()
+            try:
+                outputs = self.forward(np.asarray([item for item, _, _ in batch]))
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            done = time.perf_counter()
+            for (_, future, _), output in zip(batch, outputs):
+                future.set_result(output)
+            self.__record(batch, forward_start, done)
+
+    def __record(self, batch, forward_start, done):
+        latencies = [done - start for _, _, start in batch]
+        with self.__lock:
+            self.__stats["requests"] += len(batch)
+            self.__stats["batches"] += 1
+            self.__stats["max_batch_size"] = max(
+                self.__stats["max_batch_size"], len(batch)
+            )
+            self.__stats["total_latency"] += sum(latencies)
+            self.__stats["max_latency"] = max(
+                self.__stats["max_latency"], max(latencies)
+            )
+            self.__stats["total_forward_time"] += done - forward_start
+
+    def queue_depth(self):
+        return self.__queue.qsize()
+
+    def metrics(self):
+        with self.__lock:
+            stats = dict(self.__stats)
+        requests, batches = stats["requests"], stats["batches"]
+        return {
+            "requests": requests,
+            "batches": batches,
+            "avg_batch_size": requests / batches if batches else 0.0,
+            "max_batch_size": stats["max_batch_size"],
+            "avg_latency_ms": 1000 * stats["total_latency"] / requests if requests else 0.0,
+            "max_latency_ms": 1000 * stats["max_latency"],
+            "avg_forward_ms": 1000 * stats["total_forward_time"] / batches if batches else 0.0,
+            "queue_depth": self.queue_depth(),
+        }
+
+
+class KerasBackend:
+    def __init__(self, path):
+        import keras as ke
+
+        self.path = path
         self.model = ke.models.load_model(path)
 
-    def predict(self,input):
+    def forward(self, batch):
+        # Calling The Model Directly Skips The Per-Call Setup Of Keras model.predict
+        return np.asarray(self.model(batch.astype(np.float32), training=False))
+
+
+class TFLiteBackend:
+    "Runs An Exported .tflite Model On CPU Without Loading The Keras Stack"
+
+    def __init__(self, path, num_threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite.python.interpreter import Interpreter
+        if num_threads is None:
+            num_threads = TFLITE_NUM_THREADS
+        self.path = path
+        if path in preloaded_weights:
+            # Bytes Read By The Master Before Fork, Shared Copy-On-Write With Every Worker
+            self.interpreter = Interpreter(
+                model_content=preloaded_weights[path], num_threads=num_threads
+            )
+        else:
+            self.interpreter = Interpreter(model_path=path, num_threads=num_threads)
+        self.__input = self.interpreter.get_input_details()[0]
+        self.__output = self.interpreter.get_output_details()[0]
+        self.__batch_size = None
+        # The Interpreter Is Not Thread Safe And predict_batch Can Race The Batch Queue
+        self.__lock = threading.Lock()
+
+    def __resize(self, batch_size):
+        if batch_size == self.__batch_size:
+            return
+        shape = [batch_size, *self.__input["shape"][1:]]
+        self.interpreter.resize_tensor_input(self.__input["index"], shape)
+        self.interpreter.allocate_tensors()
+        self.__input = self.interpreter.get_input_details()[0]
+        self.__output = self.interpreter.get_output_details()[0]
+        self.__batch_size = batch_size
+
+    def forward(self, batch):
+        batch = batch.astype(np.float32)
+        with self.__lock:
+            self.__resize(batch.shape[0])
+            scale, zero_point = self.__input["quantization"]
+            if self.__input["dtype"] != np.float32 and scale:
+                batch = np.round(batch / scale + zero_point)
+            self.interpreter.set_tensor(
+                self.__input["index"], batch.astype(self.__input["dtype"])
+            )
+            self.interpreter.invoke()
+            output = self.interpreter.get_tensor(self.__output["index"]).copy()
+            scale, zero_point = self.__output["quantization"]
+        if self.__output["dtype"] != np.float32 and scale:
+            output = (output.astype(np.float32) - zero_point) * scale
+        return output
+
+
+def tflite_path(path, quantization=None):
+    "FaceSeg-Model.h5 -> FaceSeg-Model.tflite Or FaceSeg-Model-float16.tflite"
+    if quantization is None:
+        quantization = TFLITE_QUANTIZATION
+    suffix = "" if quantization in (None, "none") else f"-{quantization}"
+    return f"{os.path.splitext(path)[0]}{suffix}.tflite"
+
+
+model_registry = {}
+registered_model_classes = []
+preloaded_weights = {}
+_registry_lock = threading.Lock()
+
+
+class DNNModel(AIModel):
+    default_path = None
+    input_shape = (256, 256, 1)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.default_path is not None:
+            registered_model_classes.append(cls)
+
+    def __init__(self, path=None, backend=None):
+        self.load_model(path, backend)
+        self.service = BatchInferenceService(
+            self.forward, DNN_BATCH_SIZE, DNN_BATCH_WAIT_MS
+        )
+
+    @classmethod
+    def shared(cls, path=None):
+        "One Instance Per Worker, So Concurrent Requests Share The Weights And The Batch Queue"
+        key = (cls.__name__, path)
+        with _registry_lock:
+            hit = key in model_registry
+            if not hit:
+                model_registry[key] = cls(path)
+        metrics.inc(
+            "pixima_cache_requests_total",
+            cache="model_registry",
+            result="hit" if hit else "miss",
+        )
+        return model_registry[key]
+
+    def load_model(self, path=None, backend=None):
+        "backend Is keras Or tflite (Next To The .h5), Defaults To DNN_BACKEND"
+        if path is None:
+            path = self.default_path
+        if backend is None:
+            backend = DNN_BACKEND
+        if backend == "tflite":
+            if path.endswith(".h5"):
+                path = tflite_path(path)
+            self.backend = TFLiteBackend(path)
+        elif backend == "keras":
+            self.backend = KerasBackend(path)
+        else:
+            raise ValueError(f"Unknown DNN Backend {backend}")
+        self.path = path
+
+    def forward(self, batch):
+        started = time.perf_counter()
+        try:
+            return self.backend.forward(batch)
+        finally:
+            metrics.observe(
+                "pixima_model_inference_seconds",
+                time.perf_counter() - started,
+                model=type(self).__name__,
+            )
+
+    def predict_batch(self, inputs):
+        "Inputs <Gray Images> Should Have shape like (N,256,256,1)"
+        h, w, _ = self.input_shape
+        return self.forward(np.asarray(inputs)).reshape((-1, h, w))
+
+    def predict(self, input):
         "Input <Gray Image> Should Have shape like (256,256,1)"
-        return self.model.predict(np.asarray([input])).reshape((256,256))
+        h, w, _ = self.input_shape
+        with stage("dnn"):
+            return self.service.predict(input).reshape((h, w))
+
+
+class FaceSegmentationModel(DNNModel):
+    default_path = os.path.join(PROJECT_DIR, "DNN_Models", "FaceSeg-Model.h5")
+
 
 class HairSegmentationModel(DNNModel):
-    def __init__(self,path=os.path.join(PROJECT_DIR,"DNN_Models","HairSeg-Model.h5")):
-        self.model = ke.models.load_model(path)
+    default_path = os.path.join(PROJECT_DIR, "DNN_Models", "HairSeg-Model.h5")
 
-    def load_model(self,path=os.path.join(PROJECT_DIR,"DNN_Models","HairSeg-Model.h5")):
-        self.model = ke.models.load_model(path)
 
-    def predict(self,input):
-        "Input <Gray Image> Should Have shape like (256,256,1)"
-        return self.model.predict(np.asarray([input])).reshape((256,256))
+def _dnn_queue_depths(registry):
+    for (name, _), model in list(model_registry.items()):
+        registry.set_gauge(
+            "pixima_queue_depth", model.service.queue_depth(), queue=f"dnn:{name}"
+        )
+
+
+metrics.register_collector(_dnn_queue_depths)
+
+warmup_state = {
+    "started": False,
+    "finished": False,
+    # Finished Without Errors, A Model That Failed To Load Fails Every Request Using It
+    "ready": False,
+    "durations_ms": {},
+    "errors": {},
+}
+_warmup_lock = threading.Lock()
+
+
+def _warm_up_dnn(model_class):
+    return lambda: model_class.shared().predict(
+        np.zeros(model_class.input_shape, np.float32)
+    )
+
+
+def warm_up():
+    "Runs Every Model And MediaPipe Graph Once On A Blank Image"
+    image = np.zeros((256, 256, 3), np.uint8)
+    jobs = [
+        (model_class.__name__, _warm_up_dnn(model_class))
+        for model_class in registered_model_classes
+    ]
+    jobs += [
+        ("face_detection_model", lambda: get_face_detection_model().process(image)),
+        ("face_mesh_model", lambda: get_face_mesh_model().process(image)),
+        (
+            "selfie_segmentation_model",
+            lambda: get_selfie_segmentation_model().process(image),
+        ),
+    ]
+    for name, job in jobs:
+        start = time.perf_counter()
+        try:
+            job()
+        except Exception as e:
+            warmup_state["errors"][name] = str(e)
+        warmup_state["durations_ms"][name] = 1000 * (time.perf_counter() - start)
+    warmup_state["ready"] = not warmup_state["errors"]
+    warmup_state["finished"] = True
+    if warmup_state["errors"]:
+        logger.error(
+            "worker %s warm up failed: %s", os.getpid(), warmup_state["errors"]
+        )
+    logger.info("worker %s warmed up, memory %s", os.getpid(), worker_memory_report())
+
+
+def start_warm_up():
+    "Starts warm_up Once Per Process In The Background, See warmup_state"
+    with _warmup_lock:
+        if warmup_state["started"]:
+            return
+        warmup_state["started"] = True
+    threading.Thread(target=warm_up, name="ModelWarmUp", daemon=True).start()
+
+
+def preload_models():
+    "Reads The tflite Weights In The Master So Forked Workers Share Them"
+    if DNN_BACKEND != "tflite":
+        logger.warning(
+            "PRELOAD_MODELS needs DNN_BACKEND = 'tflite', %s models load per worker",
+            DNN_BACKEND,
+        )
+        return
+    for model_class in registered_model_classes:
+        path = tflite_path(model_class.default_path)
+        with open(path, "rb") as f:
+            preloaded_weights[path] = f.read()
+    # Keep The Collector From Touching (And Copying) Objects Created Before Fork
+    gc.freeze()
+
+
+def worker_memory_report():
+    "Memory Of This Process In kB, Pss Summed Over Workers Is The Host Footprint"
+    report = {
+        "pid": os.getpid(),
+        "loaded_models": [name for name, _ in model_registry],
+        "preloaded_bytes": sum(len(w) for w in preloaded_weights.values()),
+    }
+    fields = (
+        "Rss",
+        "Pss",
+        "Shared_Clean",
+        "Shared_Dirty",
+        "Private_Clean",
+        "Private_Dirty",
+    )
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in fields:
+                    report[key] = int(value.split()[0])
+    except OSError:
+        pass
+    return report
@@ -1,7 +1,10 @@
 from abc import abstractmethod
 from PiximaTools.abstractTools import Tool
+from PiximaTools import Tiling
+from PiximaStudio.settings import TILE_ROWS
 import numpy as np
 import cv2
+import math
 from skimage.transform import rotate
 import PIL
 
@@ -98,6 +101,8 @@ class CropTool(PhotoTool):
 
 
 class FlipTool(PhotoTool):
+    tileable = True
+
     def __init__(self, direction: str = None) -> None:
         if direction is None:
             self.direction = "Hor"
@@ -125,9 +130,25 @@ class FlipTool(PhotoTool):
 
     def apply(self, *args, **kwargs):
         if self.direction == "Hor":
-            self.Image = cv2.flip(self.Image, 0)
+            code = 0
         elif self.direction == "Ver":
-            self.Image = cv2.flip(self.Image, 1)
+            code = 1
+        else:
+            return self
+        if not Tiling.should_tile(self.Image.shape):
+            self.Image = cv2.flip(self.Image, code)
+            return self
+        source = self.Image
+        height = source.shape[0]
+        flipped = Tiling.allocate(source.shape, source.dtype)
+        for top, bottom in Tiling.bands(height):
+            # Upside Down, Band top:bottom Comes From The Mirrored Source Rows
+            if code == 0:
+                band = source[height - bottom : height - top]
+            else:
+                band = source[top:bottom]
+            flipped[top:bottom] = cv2.flip(np.asarray(band), code)
+        self.Image = flipped
         return self
 
 
@@ -199,6 +220,8 @@ class RotatTool(PhotoTool):
 
 
 class ResizeTool(PhotoTool):
+    tileable = True
+
     def __init__(self, width=720, high=480) -> None:
         self.width = width
         self.high = high
@@ -247,13 +270,52 @@ class ResizeTool(PhotoTool):
         )
 
     def apply(self, *args, **kwargs):
+        if Tiling.should_tile(self.Image.shape) or Tiling.should_tile(
+            (self.width, self.high)
+        ):
+            self.Image = self.tiled_resize(self.Image, self.high, self.width)
+            return self
         self.Image = cv2.resize(
             self.Image, (self.high, self.width), interpolation=cv2.INTER_CUBIC
         )
         return self
 
+    @staticmethod
+    def tiled_resize(source, width: int, height: int):
+        """
+        cv2.resize With INTER_CUBIC, Band By Band: Each Output Band Is An Affine
+        Warp Of The Source Rows Under It Plus A Halo For The Cubic Kernel, Equal
+        To The Whole Frame Resize Up To Rounding.
+        """
+        source_height, source_width = source.shape[:2]
+        scale_x, scale_y = source_width / width, source_height / height
+        resized = Tiling.allocate((height, width) + source.shape[2:], source.dtype)
+        # Output Rows Per Band, So That Each Band Reads About TILE_ROWS Source Rows
+        rows = max(int(TILE_ROWS / max(scale_y, 1)), 1)
+        for top, bottom in Tiling.bands(height, rows):
+            start = max(math.floor((top + 0.5) * scale_y - 0.5) - 2, 0)
+            stop = min(math.ceil((bottom - 0.5) * scale_y - 0.5) + 3, source_height)
+            # Output (x, y) Of The Band Samples Source Band (x', y'), Pixel Centers
+            # Aligned As In cv2.resize
+            matrix = np.float32(
+                [
+                    [scale_x, 0, 0.5 * scale_x - 0.5],
+                    [0, scale_y, (top + 0.5) * scale_y - 0.5 - start],
+                ]
+            )
+            resized[top:bottom] = cv2.warpAffine(
+                np.asarray(source[start:stop]),
+                matrix,
+                (width, bottom - top),
+                flags=cv2.INTER_CUBIC | cv2.WARP_INVERSE_MAP,
+                borderMode=cv2.BORDER_REPLICATE,
+            )
+        return resized
+
 
 class ContrastTool(PhotoTool):
+    tileable = True
+
     def __init__(self, contrast=0, brightness=0) -> None:
         self.contrast = contrast
         self.brightness = brightness
@@ -304,11 +366,17 @@ class ContrastTool(PhotoTool):
     def apply(self, *args, **kwargs):
         alpha = self.contrast / 50
         beta = int(self.brightness)
-        self.Image = cv2.convertScaleAbs(self.Image, alpha=alpha, beta=beta)
+
+        def contrast(image):
+            return cv2.convertScaleAbs(image, alpha=alpha, beta=beta)
+
+        self.Image = Tiling.parallel(self.Image, contrast)
         return self
 
 
 class SaturationTool(PhotoTool):
+    tileable = True
+
     def __init__(self, saturation=0) -> None:
         self.saturation = saturation
 
@@ -334,7 +402,11 @@ class SaturationTool(PhotoTool):
     def apply(self, *args, **kwargs):
         from PIL import ImageEnhance
 
-        image = PIL.Image.fromarray(self.Image)
-        after_enh_image = ImageEnhance.Color(image).enhance(self.saturation / 50)
-        self.Image = np.array(after_enh_image)
+        def saturate(image):
+            image = PIL.Image.fromarray(image)
+            after_enh_image = ImageEnhance.Color(image).enhance(self.saturation / 50)
+            return np.array(after_enh_image)
+
+        # Color Blends Each Pixel With Its Own Gray, Bands Need No Halo
+        self.Image = Tiling.parallel(self.Image, saturate)
         return self
@@ -1,10 +1,12 @@
 import time
 from rest_framework.serializers import Serializer, IntegerField
 from PiximaTools.abstractTools import BodyTool
+from PiximaTools.Timing import timed
+from PiximaTools import Tiling
 from PiximaTools.AI_Models import (
-    face_detection_model,
+    get_face_detection_model,
     HairSegmentationModel,
-    selfie_segmentation_model,
+    get_selfie_segmentation_model,
 )
 from PiximaTools.Exceptions import NoFace, RequiredValue
 from skimage.color import rgb2gray
@@ -24,11 +26,11 @@ class ColorHairTool(BodyTool):
         IMW=256
     ) -> None:
         if faceDetector is None:
-            faceDetector = face_detection_model
+            faceDetector = get_face_detection_model()
         if hair_seg_model is None:
-            hair_seg_model = HairSegmentationModel()
+            hair_seg_model = HairSegmentationModel.shared()
         if selfie_segmentation is None:
-            selfie_segmentation = selfie_segmentation_model
+            selfie_segmentation = get_selfie_segmentation_model()
         self.selfieSegmentation = selfie_segmentation
         self.hair_segmentation = hair_seg_model
         self.faceDetector = faceDetector
@@ -90,6 +92,7 @@ class ColorHairTool(BodyTool):
             .add_color(serialzier=serializer)
         )
 
+    @timed("mask")
     def __selfie_mask(self):
         BG_COLOR = (192, 192, 192) 
         MASK_COLOR = (255, 255, 255)
@@ -106,6 +109,7 @@ class ColorHairTool(BodyTool):
         newImage[cond] = self.Image[cond]
         self.InputImage = newImage
         
+    @timed("mask")
     def __model_mask(self):
         h, w, _ = self.InputImage.shape
         model_input_img = cv2.resize(
@@ -129,16 +133,27 @@ class ColorHairTool(BodyTool):
         self.model_mask = cv2.resize(mask,(w,h),interpolation=cv2.INTER_CUBIC)
 
     def __color_hair(self):
-        hsv_image = cv2.cvtColor(self.Image,cv2.COLOR_RGB2HSV)
-        h,s,v = cv2.split(hsv_image)
+        # The Mask Is Blurred And Eroded Whole, Then Only The Box Around The Hair
+        # Is Recolored, In Bands And In Place
         mask = cv2.GaussianBlur(self.model_mask,(3,3),0.5)
         mask = cv2.morphologyEx(mask,cv2.MORPH_ERODE,(15,35),iterations=10)
         mask = np.roll(mask,-5,0)
         cond = mask >= 1
-        h[cond] = self.color
-        s[cond] += self.saturation
-        hsv_image = cv2.merge([h,s,v])
-        self.Image = cv2.cvtColor(hsv_image,cv2.COLOR_HSV2RGB)
+        box = Tiling.mask_box(cond)
+        if box is None:
+            return
+        top, bottom, left, right = box
+        hair = self.Image[top:bottom, left:right]
+        Tiling.parallel(
+            hair, self.__color_band, cond[top:bottom, left:right], destination=hair
+        )
+
+    def __color_band(self, image, cond):
+        "Recolors The Pixels Of image Under cond, Others Keep Their Exact Values"
+        hsv_image = cv2.cvtColor(image,cv2.COLOR_RGB2HSV)
+        hsv_image[cond, 0] = self.color
+        hsv_image[cond, 1] += self.saturation
+        image[cond] = cv2.cvtColor(hsv_image,cv2.COLOR_HSV2RGB)[cond]
 
     def apply(self, *args, **kwargs):
         self.__selfie_mask()
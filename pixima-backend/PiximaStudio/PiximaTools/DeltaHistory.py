@@ -0,0 +1,148 @@
+"""
+Delta Versions: <index>.delta Replaces <index>.jpg For Versions Made By
+Region-Local Tools. The File Is A Header (Parent Index, Chain Depth, Offset And
+Image Shape) Followed By The JPEG Patch Of The Changed Bounding Box, The Full
+Image Is Its Parent With The Patch Pasted At The Offset.
+"""
+from functools import lru_cache
+from io import BytesIO
+from PIL import Image
+from uuid import uuid4
+from skimage.io import imread
+from PiximaStudio.settings import (
+    DELTA_KEYFRAME_INTERVAL,
+    DELTA_MAX_AREA,
+    DELTA_CACHE_SIZE,
+)
+import json
+import os
+import struct
+import numpy as np
+
+DELTA_SUFFIX = ".delta"
+_HEADER = struct.Struct("<I")
+
+
+def delta_path(version_path: str) -> str:
+    return os.path.splitext(version_path)[0] + DELTA_SUFFIX
+
+
+def version_exists(version_path: str) -> bool:
+    return os.path.exists(version_path) or os.path.exists(delta_path(version_path))
+
+
+def changed_box(parent, image):
+    "(top, bottom, left, right) Of The Pixels That Differ, None If The Shape Changed"
+    if parent.shape != image.shape:
+        return None
+    changed = parent != image
+    if changed.ndim == 3:
+        changed = changed.any(axis=2)
+    rows = np.flatnonzero(changed.any(axis=1))
+    if rows.size == 0:
+        return (0, 0, 0, 0)
+    columns = np.flatnonzero(changed.any(axis=0))
+    return (rows[0], rows[-1] + 1, columns[0], columns[-1] + 1)
+
+
+def encode_delta(parent_index: int, parent_depth: int, parent, image, quality=90):
+    """
+    The .delta Bytes Of image Against Version parent_index, None When A Full
+    Keyframe Should Be Written Instead (Chain Too Deep, Shape Changed Or The
+    Changed Box Covers More Than DELTA_MAX_AREA).
+    """
+    depth = parent_depth + 1
+    if depth >= DELTA_KEYFRAME_INTERVAL:
+        return None
+    box = changed_box(parent, image)
+    if box is None:
+        return None
+    top, bottom, left, right = box
+    height, width = image.shape[:2]
+    if (bottom - top) * (right - left) > DELTA_MAX_AREA * height * width:
+        return None
+    patch = b""
+    if bottom > top:
+        buffer = BytesIO()
+        Image.fromarray(image[top:bottom, left:right]).save(
+            buffer, format="JPEG", quality=quality
+        )
+        patch = buffer.getvalue()
+    header = json.dumps(
+        {
+            "parent": int(parent_index),
+            "depth": depth,
+            "top": int(top),
+            "left": int(left),
+            "shape": list(image.shape),
+        }
+    ).encode()
+    return _HEADER.pack(len(header)) + header + patch
+
+
+def write_delta(path: str, data: bytes):
+    "Atomic, Readers See The Reserved Placeholder Or The Whole File"
+    temp_path = os.path.join(os.path.dirname(path), f".{uuid4().hex}.tmp")
+    with open(temp_path, "wb") as file:
+        file.write(data)
+    os.replace(temp_path, path)
+
+
+def read_delta(path: str, with_patch: bool = True):
+    "(header, patch bytes) Of A .delta File"
+    with open(path, "rb") as file:
+        (length,) = _HEADER.unpack(file.read(_HEADER.size))
+        header = json.loads(file.read(length))
+        return header, file.read() if with_patch else b""
+
+
+def version_depth(version_path: str) -> int:
+    "Deltas Between The Version And Its Keyframe, 0 For A Full Version"
+    if os.path.exists(version_path):
+        return 0
+    return read_delta(delta_path(version_path), with_patch=False)[0]["depth"]
+
+
+def version_shape(version_path: str):
+    "Image Shape Of A Version Without Decoding It"
+    if os.path.exists(version_path):
+        with Image.open(version_path) as img:
+            return (img.height, img.width)
+    return tuple(read_delta(delta_path(version_path), with_patch=False)[0]["shape"])
+
+
+def read_version(version_path: str):
+    "Pixels Of A Version, Delta Versions Are Rebuilt From Their Keyframe"
+    chain = []
+    directory = os.path.dirname(version_path)
+    while not os.path.exists(version_path):
+        header, patch = read_delta(delta_path(version_path))
+        chain.append((header, patch))
+        version_path = os.path.join(directory, f"{header['parent']}.jpg")
+    image = imread(version_path)
+    for header, patch in reversed(chain):
+        if patch:
+            pixels = np.asarray(Image.open(BytesIO(patch)))
+            top, left = header["top"], header["left"]
+            image[top : top + pixels.shape[0], left : left + pixels.shape[1]] = pixels
+    return image
+
+
+@lru_cache(maxsize=DELTA_CACHE_SIZE)
+def materialize(version_path: str, quality: int = 90) -> bytes:
+    "JPEG Bytes Of A Delta Version For The Media View, Versions Never Change"
+    buffer = BytesIO()
+    Image.fromarray(read_version(version_path)).save(
+        buffer, format="JPEG", quality=quality
+    )
+    return buffer.getvalue()
+
+
+def delta_parent(path: str):
+    "Parent Index Of A .delta File, None For Full Versions"
+    if not path.endswith(DELTA_SUFFIX):
+        return None
+    try:
+        return read_delta(path, with_patch=False)[0]["parent"]
+    except (OSError, ValueError, struct.error):
+        return None
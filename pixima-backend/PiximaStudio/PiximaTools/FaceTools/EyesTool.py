@@ -1,10 +1,15 @@
 from abc import abstractmethod, ABC
 from .FaceTools import FaceTool
+from PiximaTools.Timing import timed
 from PiximaTools.Exceptions import NoFace, RequiredValue
-from PiximaTools.AI_Models import face_detection_model, face_mesh_model
+from PiximaTools import AI_Models
+from PiximaTools.AI_Models import (
+    get_face_detection_model,
+    get_face_mesh_model,
+    get_two_stage_face_mesh_model,
+)
 import cv2
 import numpy as np
-import mediapipe as mp
 import decimal
 from rest_framework.serializers import ListField, IntegerField, Serializer, FloatField
 
@@ -17,9 +22,11 @@ class EyesTool(FaceTool):
 
 
 class EyesColorTool(EyesTool):
+    region_local = True
+
     def __init__(self, faceMeshDetector=None):
         if faceMeshDetector is None:
-            faceMeshDetector = face_mesh_model
+            faceMeshDetector = get_two_stage_face_mesh_model()
         self.faceMeshDetector = faceMeshDetector
 
     def __call__(self, *args, **kwargs):
@@ -117,7 +124,7 @@ class EyesColorTool(EyesTool):
             decimal.MAX_EMAX,
             0,
         )
-        mp_face_mesh = mp.solutions.face_mesh
+        mp_face_mesh = AI_Models.mp_face_mesh
         h, w, _ = self.Image.shape
         for tup1, tup2 in zip(
             mp_face_mesh.FACEMESH_RIGHT_EYE, mp_face_mesh.FACEMESH_LEFT_EYE
@@ -143,6 +150,7 @@ class EyesColorTool(EyesTool):
         # Calculating the Distance between the two values
         return (right_max_p - right_min_p > dist, left_max_p - left_min_p > dist)
 
+    @timed("mask")
     def __extract_iris_mask(self, face_landmarks, k: tuple = (3, 3), iter: int = 1):
         h, w, _ = self.Image.shape
         right_th, left_th = None, None
@@ -153,7 +161,7 @@ class EyesColorTool(EyesTool):
         # Do MORPH_DILATE to expand the mask and getrid of balckholes (NOTE: Have better results than MORPH_OPENING)
         # End up with bitwise_and between Ellipse Mask and Previous mask
         if self.__is_left_open:
-            for tup in mp.solutions.face_mesh.FACEMESH_LEFT_IRIS:
+            for tup in AI_Models.mp_face_mesh.FACEMESH_LEFT_IRIS:
                 sor_idx, _ = tup
                 source = face_landmarks.landmark[sor_idx]
                 rel_source = self.normaliz_pixel(source.x, source.y, w, h)
@@ -181,7 +189,7 @@ class EyesColorTool(EyesTool):
             ] = left_th.copy()
         # Extract The Right (Iris & Eye) mask With Bin_Inv and Otsu
         if self.__is_right_open:
-            for tup in mp.solutions.face_mesh.FACEMESH_RIGHT_IRIS:
+            for tup in AI_Models.mp_face_mesh.FACEMESH_RIGHT_IRIS:
                 sor_idx, _ = tup
                 source = face_landmarks.landmark[sor_idx]
                 rel_source = self.normaliz_pixel(source.x, source.y, w, h)
@@ -253,14 +261,16 @@ class EyesColorTool(EyesTool):
 
 
 class EyesResizeTool(FaceTool):
+    region_local = True
+
     def __init__(self, factor=1.1, radius=75,faceDetector=None,faceMeshDetector=None):
         self.factor = factor
         self.radius = radius
         
         if faceDetector is None:
-            faceDetector = face_detection_model
+            faceDetector = get_face_detection_model()
         if faceMeshDetector is None:
-            faceMeshDetector = face_mesh_model
+            faceMeshDetector = get_face_mesh_model()
 
         self.faceDetector = faceDetector
         self.faceMeshDetector = faceMeshDetector
@@ -361,7 +371,7 @@ class EyesResizeTool(FaceTool):
         return self
 
     def __get_eyes_key_points(self, mesh, w, h):
-        mp_face_mesh = mp.solutions.face_mesh
+        mp_face_mesh = AI_Models.mp_face_mesh
         right_eye_list, left_eye_list = [], []
         for face_landmarks in mesh.multi_face_landmarks:
             for tup in mp_face_mesh.FACEMESH_RIGHT_EYE:
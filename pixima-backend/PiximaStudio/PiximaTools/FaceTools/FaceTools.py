@@ -2,16 +2,17 @@ from abc import abstractmethod, ABC
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from skimage.color import rgb2gray
 from PiximaTools.Exceptions import RequiredValue, NoFace
+from PiximaTools import AI_Models
 from PiximaTools.AI_Models import (
     FaceSegmentationModel,
-    face_mesh_model,
-    mp_drawing_styles,
-    face_detection_model,
-    DrawingSpec,
-    draw_landmarks,
+    get_face_mesh_model,
+    get_two_stage_face_mesh_model,
+    get_face_detection_model,
 )
 from rest_framework.serializers import IntegerField, Serializer
 from PiximaTools.abstractTools import BodyTool
+from PiximaTools.Timing import timed
+from PiximaTools import Tiling
 from molesq import ImageTransformer
 from molesq.utils import grid_field
 import numpy as np
@@ -31,8 +32,15 @@ class FaceLandMarksArray:
     leftEyeBrowLower = [295, 282, 283, 276]
     lipsUpperOuter = [61, 185, 40, 39, 37, 0, 267, 269, 270, 409, 291]
     lipsLowerOuter = [146, 91, 181, 84, 17, 314, 405, 321, 375, 291]
-    faceOval = mp_drawing_styles.face_mesh_connections.FACEMESH_FACE_OVAL
-    faceTesselation = mp_drawing_styles.face_mesh_connections.FACEMESH_TESSELATION
+
+    # MediaPipe Is Loaded Lazily, So The Connection Sets Are Looked Up On Use
+    @staticmethod
+    def faceOval():
+        return AI_Models.mp_face_mesh.FACEMESH_FACE_OVAL
+
+    @staticmethod
+    def faceTesselation():
+        return AI_Models.mp_face_mesh.FACEMESH_TESSELATION
 
 
 class FaceTool(BodyTool, ABC):
@@ -53,11 +61,11 @@ class SmoothFaceTool(FaceTool):
         method_options=["BiB", "GaB"],
     ):
         if faceMeshDetector is None:
-            faceMeshDetector = face_mesh_model
+            faceMeshDetector = get_face_mesh_model()
         if faceDetector is None:
-            faceDetector = face_detection_model
+            faceDetector = get_face_detection_model()
         if face_segmentation is None:
-            face_segmentation = FaceSegmentationModel()
+            face_segmentation = FaceSegmentationModel.shared()
 
         self.faceMeshDetector = faceMeshDetector
         self.faceDetector = faceDetector
@@ -313,12 +321,12 @@ class SmoothFaceTool(FaceTool):
         self.face_mesh_results = results.multi_face_landmarks
         for face_landmark in self.face_mesh_results:
             faceovalMask = np.zeros((h, w, 3), np.uint8)
-            draw_landmarks(
+            AI_Models.draw_landmarks(
                 image=faceovalMask,
                 landmark_list=face_landmark,
-                connections=mp_drawing_styles.face_mesh_connections.FACEMESH_FACE_OVAL,
+                connections=FaceLandMarksArray.faceOval(),
                 landmark_drawing_spec=None,
-                connection_drawing_spec=DrawingSpec((255, 255, 255), 5, 10),
+                connection_drawing_spec=AI_Models.DrawingSpec((255, 255, 255), 5, 10),
             )
             ret, thresh = cv2.threshold(
                 cv2.cvtColor(faceovalMask, cv2.COLOR_BGR2GRAY),
@@ -390,6 +398,7 @@ class SmoothFaceTool(FaceTool):
         res = cv2.resize(res, (w, h))
         return res
 
+    @timed("mask")
     def constract_final_mask(self):
         self.ROI()
         face_mask = self.__get_face_mask()
@@ -426,9 +435,11 @@ class SmoothFaceTool(FaceTool):
 
 
 class WhiteTeethTool(FaceTool):
+    region_local = True
+
     def __init__(self, faceMeshDetector=None, saturation=40, brightness=20) -> None:
         if faceMeshDetector is None:
-            faceMeshDetector = face_mesh_model
+            faceMeshDetector = get_two_stage_face_mesh_model()
         self.faceMeshDetector = faceMeshDetector
         self.saturation = saturation
         self.brightness = brightness
@@ -494,6 +505,7 @@ class WhiteTeethTool(FaceTool):
         for face_landmarks in self.results.multi_face_landmarks:
             self.__make_mask_teeth(face_landmarks, th)
 
+    @timed("mask")
     def __make_mask_teeth(self, face_landmarks, th=100):
         h, w, _ = self.Image.shape
 
@@ -561,9 +573,11 @@ class WhiteTeethTool(FaceTool):
 
 
 class ColorLipsTool(FaceTool):
+    region_local = True
+
     def __init__(self, faceMeshDetector=None, saturation=0, color=0) -> None:
         if faceMeshDetector is None:
-            faceMeshDetector = face_mesh_model
+            faceMeshDetector = get_two_stage_face_mesh_model()
         self.faceMeshDetector = faceMeshDetector
         self.saturation = saturation
         self.color = color
@@ -621,6 +635,7 @@ class ColorLipsTool(FaceTool):
             .add_color(serialzier=serializer)
         )
 
+    @timed("mask")
     def __lips_mask(self):
         h, w, _ = self.Image.shape
         results = self.faceMeshDetector.process(self.Image)
@@ -681,13 +696,22 @@ class ColorLipsTool(FaceTool):
         self.Mask = lips_mask
 
     def __color_lips(self):
-        hsv_img = cv2.cvtColor(self.Image, cv2.COLOR_RGB2HSV)
-        h, s, v = cv2.split(hsv_img)
+        # Only The Box Around The Lips Is Converted And Only Lips Pixels Are
+        # Written Back, The Rest Of The Image Is Left As Read
         cond = self.Mask == 255
-        h[cond] = self.color
-        s[cond] += self.saturation
-        hsv_img = cv2.merge([h, s, v])
-        self.Image = cv2.cvtColor(hsv_img, cv2.COLOR_HSV2RGB)
+        box = Tiling.mask_box(cond)
+        if box is None:
+            return
+        top, bottom, left, right = box
+
+        def color(image, mask):
+            hsv_img = cv2.cvtColor(image, cv2.COLOR_RGB2HSV)
+            hsv_img[mask, 0] = self.color
+            hsv_img[mask, 1] += self.saturation
+            image[mask] = cv2.cvtColor(hsv_img, cv2.COLOR_HSV2RGB)[mask]
+
+        lips = self.Image[top:bottom, left:right]
+        Tiling.parallel(lips, color, cond[top:bottom, left:right], destination=lips)
 
     def apply(self, *args, **kwargs):
         self.__lips_mask()
@@ -696,6 +720,8 @@ class ColorLipsTool(FaceTool):
 
 
 class SmileTool(FaceTool):
+    region_local = True
+
     point_indices = [
         186,
         43,
@@ -711,7 +737,7 @@ class SmileTool(FaceTool):
 
     def __init__(self, faceMeshDetector=None, factor=5) -> None:
         if faceMeshDetector is None:
-            faceMeshDetector = face_mesh_model
+            faceMeshDetector = get_two_stage_face_mesh_model()
         self.faceMeshDetector = faceMeshDetector
         self.factor = factor
 
@@ -751,7 +777,7 @@ class SmileTool(FaceTool):
             raise NoFace("No Face Detected In The Image")
         red_points_image = self.Image.copy()
         for face_landmarks in results.multi_face_landmarks:
-            for land_mark in FaceLandMarksArray.faceTesselation:
+            for land_mark in FaceLandMarksArray.faceTesselation():
                 sor, _ = land_mark
                 if sor in self.point_indices:
                     x1, y1 = (
@@ -1,14 +1,16 @@
 from rest_framework.serializers import IntegerField, FloatField, Serializer
 from .FaceTools import FaceTool
-from PiximaTools.AI_Models import face_detection_model
+from PiximaTools.AI_Models import get_face_detection_model
 from PiximaTools.Exceptions import NoFace, RequiredValue
 import cv2
 import numpy as np
 
 class NoseResizeTool(FaceTool):
+    region_local = True
+
     def __init__(self, faceDetector=None):
         if faceDetector is None:
-            faceDetector = face_detection_model
+            faceDetector = get_face_detection_model()
         self.faceDetector = faceDetector
 
     def __call__(self, *args, **kwargs):
@@ -1,14 +1,16 @@
 from abc import abstractmethod
 from random import Random
 from PiximaTools.abstractTools import Tool
+from PiximaTools import Tiling
 import cv2
 import numpy as np
-from .AI_Models import face_detection_model, mp_face_detection
+from . import AI_Models
 
+# Names Of mp_face_detection.FaceKeyPoint Members, Resolved When MediaPipe Is Loaded
 FaceKey_Dict = {
-    "RightEye": mp_face_detection.FaceKeyPoint.RIGHT_EYE,
-    "LeftEye": mp_face_detection.FaceKeyPoint.LEFT_EYE,
-    "Nose": mp_face_detection.FaceKeyPoint.NOSE_TIP,
+    "RightEye": "RIGHT_EYE",
+    "LeftEye": "LEFT_EYE",
+    "Nose": "NOSE_TIP",
 }
 
 
@@ -20,6 +22,8 @@ class Filter(Tool):
 
 
 class GlitchFilter(Filter):
+    tileable = True
+
     def __init__(self, shift=20, step=15, density=5) -> None:
         self.shift = shift
         self.step = step
@@ -79,16 +83,43 @@ class GlitchFilter(Filter):
     def apply(self, *args, **kwargs):
         img = self.Image
         h, w, _ = img.shape
-        kernal = np.zeros((h, w), np.uint8)
         thickness = 2
         if h > 1000:
             thickness = 4
         list_range = []
         for i in range(0, h, self.step):
             list_range.append((i - self.step, i))
-            kernal = cv2.line(
-                kernal, (0, int(i)), (int(w), int(i)), (255, 255, 255), thickness
+        if Tiling.should_tile(img.shape):
+            new_img = Tiling.allocate(img.shape, img.dtype)
+            for top, bottom in Tiling.bands(h):
+                new_img[top:bottom] = self.glitch(
+                    np.asarray(img[top:bottom]), top, h, thickness
+                )
+        else:
+            new_img = self.glitch(img, 0, h, thickness)
+        for i in Random().choices(list_range, k=self.density):
+            down = i[0]
+            upper = i[0] + (self.step * Random().randint(0, 3))
+            new_img[down:upper, :, :] = np.roll(
+                new_img[down:upper, :, :], Random().randint(-100, 100), 1
             )
+        self.Image = new_img
+        return self
+
+    def glitch(self, img, top: int, height: int, thickness: int):
+        """
+        Color Shifted And Lined Rows, img Being Rows top To top + len(img) Of An
+        Image height Rows High. Shifts Stay Within A Row, So Bands Need No Halo.
+        """
+        rows, w, _ = img.shape
+        # Lines Crossing The Band Edges Are Drawn On A Kernel thickness Rows Taller
+        pad = thickness
+        kernal = np.zeros((rows + 2 * pad, w), np.uint8)
+        first = -(-max(top - pad, 0) // self.step) * self.step
+        for i in range(first, min(top + rows + pad, height), self.step):
+            y = i - top + pad
+            kernal = cv2.line(kernal, (0, y), (int(w), y), (255, 255, 255), thickness)
+        kernal = kernal[pad : pad + rows]
         kernal = cv2.merge([kernal, kernal, kernal])
         cyan_img = img.copy()
         pink_img = img.copy()
@@ -98,21 +129,13 @@ class GlitchFilter(Filter):
         cyan_img = np.roll(cyan_img, -self.shift, 1)
         new_img = cv2.addWeighted(img, 0.5, pink_img, 0.9, 0)
         new_img = cv2.addWeighted(new_img, 0.5, cyan_img, 0.75, 0)
-        new_img = cv2.addWeighted(
+        return cv2.addWeighted(
             new_img,
             0.85,
             kernal,
             0.15,
             0,
         )
-        for i in Random().choices(list_range, k=self.density):
-            down = i[0]
-            upper = i[0] + (self.step * Random().randint(0, 3))
-            new_img[down:upper, :, :] = np.roll(
-                new_img[down:upper, :, :], Random().randint(-100, 100), 1
-            )
-        self.Image = new_img
-        return self
 
 
 class CirclesFilter(Filter):
@@ -179,14 +202,14 @@ class CirclesFilter(Filter):
         if self.x >= 0 and self.y >= 0:
             center = (self.x, self.y)
         else:
-            face_detection = face_detection_model
+            face_detection = AI_Models.get_face_detection_model()
+            mp_face_detection = AI_Models.mp_face_detection
             results = face_detection.process(self.Image)
             if not results.detections:
                 raise Exception("No Face Found")
             for detection in results.detections:
-                xy = mp_face_detection.get_key_point(
-                    detection, FaceKey_Dict[self.face_key]
-                )
+                key_point = mp_face_detection.FaceKeyPoint[FaceKey_Dict[self.face_key]]
+                xy = mp_face_detection.get_key_point(detection, key_point)
                 x, y = xy.x, xy.y
                 x, y = self.normaliz_pixel(x, y, img.shape[1], img.shape[0])
             center = (x, y)
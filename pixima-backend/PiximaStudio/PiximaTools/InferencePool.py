@@ -0,0 +1,172 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+from uuid import UUID
+from PiximaStudio.settings import INFERENCE_POOL_SIZE, INFERENCE_POOL_TOOLS
+from PiximaTools.Metrics import metrics
+import atexit
+import importlib
+import os
+import threading
+import numpy as np
+
+# Tool State That Travels With The Job, The Pixels Go Through Shared Memory
+_ARRAY_ATTRIBUTES = ("Image", "Mask")
+# Kept In The Web Process, save_image Encodes The Delta Against The Parent There
+_WEB_ATTRIBUTES = ("delta_parent",)
+_PLAIN_TYPES = (type(None), bool, int, float, str, bytes, UUID, np.generic)
+
+
+def _to_shared(array):
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, array.dtype, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def _attach(spec):
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+
+
+def _same_view(value, image) -> bool:
+    """
+    value Is image Itself, Not Just Another View Of Its Segment: image[::-1] Has
+    The Same Shape But Other Strides (And Start), Its Pixels Must Be Copied Out
+    """
+    return (
+        value.__array_interface__["data"][0] == image.__array_interface__["data"][0]
+        and value.shape == image.shape
+        and value.strides == image.strides
+        and value.dtype == image.dtype
+    )
+
+
+def _plain(value) -> bool:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return all(_plain(item) for item in value)
+    if isinstance(value, dict):
+        return all(_plain(key) and _plain(item) for key, item in value.items())
+    return isinstance(value, _PLAIN_TYPES)
+
+
+def _picklable_state(tool):
+    # Only Plain Parameters Travel, Model Handles, Locks And Graphs Are Rebuilt
+    # Inside The Worker
+    return {
+        key: value
+        for key, value in vars(tool).items()
+        if key not in _ARRAY_ATTRIBUTES
+        and key not in _WEB_ATTRIBUTES
+        and _plain(value)
+    }
+
+
+def _init_worker():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "PiximaStudio.settings")
+    import django
+
+    django.setup()
+
+
+def _run_tool(module, class_name, state, image_spec):
+    """
+    Worker Side: Builds The Tool With Its Own Models, Applies It On A Zero-Copy
+    View Of The Input Segment And Writes Image/Mask Back To Shared Memory.
+    """
+    tool = getattr(importlib.import_module(module), class_name)()
+    tool.__dict__.update(state)
+    shm, image = _attach(image_spec)
+    value = None
+    try:
+        tool.add_image(image).apply()
+        outputs = {}
+        for name in _ARRAY_ATTRIBUTES:
+            value = getattr(tool, name, None)
+            if not isinstance(value, np.ndarray):
+                continue
+            if value is image or _same_view(value, image):
+                # Edited In Place, The Input Segment Already Holds The Result
+                outputs[name] = image_spec
+                continue
+            out_shm, outputs[name] = _to_shared(np.ascontiguousarray(value))
+            out_shm.close()
+        return outputs
+    finally:
+        # The Segment Can Only Be Closed Once No Array Points Into It
+        del tool, image, value
+        shm.close()
+
+
+class InferencePool:
+    "Sidecar Processes That Run Tool.apply Outside The Request Threads Of The Web Worker"
+
+    def __init__(self, size=INFERENCE_POOL_SIZE, tools=INFERENCE_POOL_TOOLS):
+        self.size = size
+        self.tools = set(tools)
+        self.__executor = None
+        self.__lock = threading.Lock()
+        self.in_flight = 0
+
+    def handles(self, tool):
+        return self.size > 0 and type(tool).__name__ in self.tools
+
+    def executor(self):
+        with self.__lock:
+            if self.__executor is None:
+                # spawn: The Web Worker Has Threads (And Maybe TensorFlow) Running
+                self.__executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self.__executor
+
+    def apply(self, tool):
+        in_shm, image_spec = _to_shared(np.ascontiguousarray(tool.Image))
+        with self.__lock:
+            self.in_flight += 1
+        try:
+            outputs = (
+                self.executor()
+                .submit(
+                    _run_tool,
+                    type(tool).__module__,
+                    type(tool).__name__,
+                    _picklable_state(tool),
+                    image_spec,
+                )
+                .result()
+            )
+            for name, spec in outputs.items():
+                if spec[0] == in_shm.name:
+                    view = np.ndarray(spec[1], np.dtype(spec[2]), buffer=in_shm.buf)
+                    setattr(tool, name, view.copy())
+                    del view
+                    continue
+                out_shm, view = _attach(spec)
+                # One Copy Out, So The Segment Is Released Before The Response Is Built
+                setattr(tool, name, view.copy())
+                del view
+                out_shm.close()
+                out_shm.unlink()
+        finally:
+            with self.__lock:
+                self.in_flight -= 1
+            in_shm.close()
+            in_shm.unlink()
+        return tool
+
+    def shutdown(self):
+        with self.__lock:
+            if self.__executor is not None:
+                self.__executor.shutdown(wait=True)
+                self.__executor = None
+
+
+inference_pool = InferencePool()
+atexit.register(inference_pool.shutdown)
+metrics.register_collector(
+    lambda registry: registry.set_gauge(
+        "pixima_queue_depth", inference_pool.in_flight, queue="inference_pool"
+    )
+)
@@ -0,0 +1,243 @@
+from PiximaStudio.settings import (
+    MEDIA_ROOT,
+    METRICS_ENABLED,
+    METRICS_DIR,
+    METRICS_FLUSH_S,
+)
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+
+# Name -> (Type, Help, Buckets)
+METRICS = {
+    "pixima_request_seconds": (
+        "histogram",
+        "API view latency, from dispatch to response",
+        (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    ),
+    "pixima_tool_seconds": (
+        "histogram",
+        "Tool.process duration (apply, in the inference pool when routed there)",
+        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    ),
+    "pixima_image_megapixels": (
+        "histogram",
+        "Size of the images the tools were applied on",
+        (0.25, 0.5, 1, 2, 4, 8, 12, 16, 24, 48),
+    ),
+    "pixima_model_inference_seconds": (
+        "histogram",
+        "One MediaPipe process call or one batched DNN forward pass",
+        (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+    ),
+    "pixima_cache_requests_total": (
+        "counter",
+        "Cache lookups by cache and result (hit or miss)",
+        None,
+    ),
+    "pixima_media_bytes_written_total": (
+        "counter",
+        "Bytes written under MEDIA_ROOT by directory",
+        None,
+    ),
+    "pixima_media_bytes_reclaimed_total": (
+        "counter",
+        "Bytes deleted from MEDIA_ROOT by the media sweeper, by directory and reason",
+        None,
+    ),
+    "pixima_media_bytes": (
+        "gauge",
+        "Bytes kept under MEDIA_ROOT by directory, as of the last media sweep",
+        None,
+    ),
+    "pixima_version_ring_bytes": (
+        "gauge",
+        "Memory held by the in-memory ring of recent versions",
+        None,
+    ),
+    "pixima_admission_rejected_total": (
+        "counter",
+        "Requests turned away by admission control",
+        None,
+    ),
+    "pixima_queue_depth": (
+        "gauge",
+        "Items waiting in the worker queues, sampled when metrics are written",
+        None,
+    ),
+}
+
+
+class MetricsRegistry:
+    """
+    Multi-Process Metrics For Gunicorn: Every Process Keeps Its Values In
+    Memory And Writes Them To METRICS_DIR/<pid>.json At Most Every
+    METRICS_FLUSH_S Seconds (And At Exit), /metrics Merges The Files.
+    \nCounters And Histograms Of Exited Workers Are Kept So Totals Never Go Back,
+    Their Gauges Are Dropped.
+    """
+
+    def __init__(self, enabled: bool, directory: str, flush_s: float):
+        self.enabled = enabled
+        self.directory = directory
+        self.flush_s = flush_s
+        self.values = {}
+        self.collectors = []
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+
+    @staticmethod
+    def _key(name, labels):
+        labels = tuple(sorted((key, str(value)) for key, value in labels.items()))
+        return (name, labels)
+
+    def reset(self):
+        "Forked Workers Start Empty, The Parent Reports Its Own Values"
+        self.values = {}
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        self._maybe_flush()
+
+    def set_gauge(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.values[self._key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        buckets = METRICS[name][2]
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.values.get(key)
+            if histogram is None:
+                # Per Bucket Counts (Not Cumulative), Then +Inf, Sum
+                histogram = self.values[key] = [0] * (len(buckets) + 1) + [0.0]
+            histogram[bisect.bisect_left(buckets, value)] += 1
+            histogram[-1] += value
+        self._maybe_flush()
+
+    def media_written(self, path: str, size: int = None):
+        "Counts A File Written Under MEDIA_ROOT, Labelled By Its Top Directory"
+        if not self.enabled:
+            return
+        if size is None:
+            size = os.path.getsize(path)
+        directory = os.path.relpath(path, MEDIA_ROOT).split(os.sep)[0]
+        self.inc("pixima_media_bytes_written_total", size, directory=directory)
+
+    def register_collector(self, collector):
+        "collector(registry) Sets Gauges Right Before The Values Are Written"
+        self.collectors.append(collector)
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_s:
+            self.flush()
+
+    def flush(self):
+        if not self.enabled:
+            return
+        self._last_flush = time.monotonic()
+        for collector in self.collectors:
+            try:
+                collector(self)
+            except Exception:
+                pass
+        with self._lock:
+            values = [
+                [name, dict(labels), value]
+                for (name, labels), value in self.values.items()
+            ]
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump({"pid": os.getpid(), "values": values}, file)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+
+    def merged(self) -> dict:
+        "Values Of Every Process, Summed Per Metric And Labels"
+        self.flush()
+        merged = {}
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, file_name)) as file:
+                    snapshot = json.load(file)
+            except (OSError, ValueError):
+                continue
+            alive = self._alive(snapshot["pid"])
+            for name, labels, value in snapshot["values"]:
+                if METRICS[name][0] == "gauge" and not alive:
+                    continue
+                key = self._key(name, labels)
+                if isinstance(value, list):
+                    current = merged.setdefault(key, [0] * len(value))
+                    merged[key] = [a + b for a, b in zip(current, value)]
+                else:
+                    merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def exposition(self) -> str:
+        "Prometheus Text Format 0.0.4"
+        merged = self.merged()
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            series = sorted(
+                (labels, value)
+                for (key, labels), value in merged.items()
+                if key == name
+            )
+            if not series:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in series:
+                if kind != "histogram":
+                    lines.append(f"{name}{_labels(labels)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(buckets) + ["+Inf"], value[:-1]):
+                    cumulative += count
+                    bucket_labels = _labels(labels + (("le", str(bound)),))
+                    lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {value[-1]}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+metrics = MetricsRegistry(METRICS_ENABLED, METRICS_DIR, METRICS_FLUSH_S)
+atexit.register(metrics.flush)
+os.register_at_fork(after_in_child=metrics.reset)
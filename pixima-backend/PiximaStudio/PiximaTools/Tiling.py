@@ -0,0 +1,171 @@
+"""
+Tiled Processing For Very Large Images: Pixels Past TILING_MIN_MEGAPIXELS Live In
+Memory-Mapped Scratch Files And Tools Stream Them TILE_ROWS Rows At A Time, A Tile
+Being A Full Width Band Of Rows. Pointwise Tools Map Each Band On Its Own, Tools
+Reading Neighbouring Rows (Blurs, Resampling) Read halo Extra Rows Around It.
+\nWhat This Bounds Is The Tool Work: Its Intermediates (Color Planes, Kernels,
+Shifted Copies) Exist For A Few Bands At A Time. Decoding And Encoding Are Not
+Tiled, PIL Holds One Full Decoded Frame While A File Is Read (spill) And Again
+While The Result Is Encoded, So The Peak Is Still About One Frame Plus Bands
+Instead Of Several Frames.
+\nBands Also Run In Parallel On band_executor (parallel), OpenCV And numpy Release
+The GIL While They Work On A Band.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from PiximaStudio.settings import (
+    TILING_MIN_MEGAPIXELS,
+    TILE_ROWS,
+    TILING_DIR,
+    BAND_WORKERS,
+    BAND_MIN_MEGAPIXELS,
+)
+from PiximaTools.Metrics import metrics
+import os
+import tempfile
+import numpy as np
+
+# Shared By All Requests, Like encode_executor
+band_workers = max(BAND_WORKERS, 1)
+band_executor = ThreadPoolExecutor(
+    max_workers=band_workers, thread_name_prefix="PiximaBands"
+)
+
+metrics.register_collector(
+    lambda registry: registry.set_gauge(
+        "pixima_queue_depth", band_executor._work_queue.qsize(), queue="bands"
+    )
+)
+
+
+def should_tile(shape) -> bool:
+    "shape Is (height, width, ...) Of An Image"
+    if not TILING_MIN_MEGAPIXELS or len(shape) < 2:
+        return False
+    return shape[0] * shape[1] >= TILING_MIN_MEGAPIXELS * 1e6
+
+
+def allocate(shape, dtype=np.uint8):
+    """
+    Memory-Mapped Array For Large Shapes, A Plain One Otherwise. The Scratch File
+    Is Unlinked Once Mapped, Its Space Goes Back When The Array Is Collected.
+    """
+    shape = tuple(int(size) for size in shape)
+    if not should_tile(shape):
+        return np.empty(shape, dtype)
+    os.makedirs(TILING_DIR, exist_ok=True)
+    with tempfile.TemporaryFile(dir=TILING_DIR) as file:
+        return np.memmap(file, dtype=dtype, mode="w+", shape=shape)
+
+
+def bands(height: int, rows: int = TILE_ROWS):
+    "(top, bottom) Of Each Band Covering height Rows"
+    rows = max(int(rows), 1)
+    for top in range(0, height, rows):
+        yield top, min(top + rows, height)
+
+
+def map_bands(
+    source,
+    function,
+    *others,
+    destination=None,
+    halo: int = 0,
+    rows: int = TILE_ROWS,
+    executor=None,
+):
+    """
+    destination[top:bottom] = function(source Rows top - halo To bottom + halo),
+    Cropped Back To The Band. function Returns An Array Of The Rows It Was Given
+    (Same Height), The Destination Defaults To One Shaped Like The Source.
+    \nothers Are Arrays As High As source (Masks), Their Same Rows Are Passed
+    After The Band. function May Instead Write The Band In Place And Return None
+    (Pass source As destination, halo 0). With An executor The Bands Run On It,
+    Bands Never Overlap In destination So No Lock Is Needed.
+    """
+    height = source.shape[0]
+    if destination is None:
+        destination = allocate(source.shape, source.dtype)
+
+    def run(band):
+        top, bottom = band
+        start, stop = max(top - halo, 0), min(bottom + halo, height)
+        result = function(
+            np.asarray(source[start:stop]),
+            *(np.asarray(other[start:stop]) for other in others),
+        )
+        if result is not None:
+            destination[top:bottom] = result[top - start : bottom - start]
+
+    if executor is None:
+        for band in bands(height, rows):
+            run(band)
+    else:
+        # list() Raises The First Error Of Any Band
+        list(executor.map(run, bands(height, rows)))
+    return destination
+
+
+def parallel(source, function, *others, destination=None, halo: int = 0):
+    """
+    map_bands On band_executor, band_workers Bands (TILE_ROWS Rows Each For Tiled
+    Images). Images Below BAND_MIN_MEGAPIXELS Are Passed To function Whole, The
+    Thread Hand-Off Would Cost More Than It Saves.
+    """
+    height, width = source.shape[:2]
+    tiled = should_tile(source.shape)
+    if not tiled and (
+        band_workers < 2 or height * width < BAND_MIN_MEGAPIXELS * 1e6
+    ):
+        result = function(source, *others)
+        if result is None:
+            # Written In Place
+            return source
+        if destination is None:
+            return result
+        destination[...] = result
+        return destination
+    rows = TILE_ROWS if tiled else -(-height // band_workers)
+    return map_bands(
+        source,
+        function,
+        *others,
+        destination=destination,
+        halo=halo,
+        rows=rows,
+        executor=band_executor,
+    )
+
+
+def mask_box(mask):
+    "(top, bottom, left, right) Of The True Pixels Of A 2-D mask, None If None Are"
+    rows = np.flatnonzero(mask.any(axis=1))
+    if rows.size == 0:
+        return None
+    columns = np.flatnonzero(mask.any(axis=0))
+    return rows[0], rows[-1] + 1, columns[0], columns[-1] + 1
+
+
+def set_workers(count: int):
+    "Replaces band_executor With One Of count Threads (benchmark_tools --workers)"
+    global band_workers, band_executor
+    previous = band_executor
+    band_workers = max(int(count), 1)
+    band_executor = ThreadPoolExecutor(
+        max_workers=band_workers, thread_name_prefix="PiximaBands"
+    )
+    previous.shutdown(wait=True)
+
+
+def spill(img, rows: int = TILE_ROWS):
+    """
+    Pixels Of A PIL RGB Image Copied Band By Band Into A Memory-Mapped Array, None
+    When It Is Below TILING_MIN_MEGAPIXELS (Or Not RGB) And Is Better Read Whole.
+    \nThe First crop Decodes The Whole File Into PIL's Own Buffer, Which Is Only
+    Released When img Is Closed, The Copy Avoids A Second In-Memory Frame.
+    """
+    if img.mode != "RGB" or not should_tile((img.height, img.width)):
+        return None
+    image = allocate((img.height, img.width, 3))
+    for top, bottom in bands(img.height, rows):
+        image[top:bottom] = np.asarray(img.crop((0, top, img.width, bottom)))
+    return image
@@ -0,0 +1,103 @@
+from contextlib import nullcontext
+from contextvars import ContextVar
+from PiximaStudio.settings import REQUEST_TIMING, METRICS_ENABLED
+from PiximaTools.Metrics import metrics
+import functools
+import time
+
+# Stage Name -> Milliseconds For The Current Request, None Outside A Request.
+# Stages May Nest (apply Includes The Model Calls And Mask Building It Makes),
+# A Stage Entered Several Times Adds Up.
+_stages = ContextVar("pixima_stages", default=None)
+
+# With REQUEST_TIMING Off, stage() Hands Out This Shared No-Op And timed()
+# Returns The Function Itself, So Instrumented Code Runs As Before.
+_NULL_STAGE = nullcontext()
+
+
+def record(name: str, duration_ms: float):
+    stages = _stages.get()
+    if stages is not None:
+        stages[name] = stages.get(name, 0.0) + duration_ms
+
+
+class _Stage:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+def stage(name: str):
+    "with stage('read_image'): ..."
+    if not REQUEST_TIMING:
+        return _NULL_STAGE
+    return _Stage(name)
+
+
+def timed(name: str):
+    "Decorator Version Of stage"
+
+    def decorator(func):
+        if not REQUEST_TIMING:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TimedModel:
+    """
+    Proxy That Times model.process() As A Stage And In The
+    pixima_model_inference_seconds Metric, Everything Else Goes To The Model.
+    """
+
+    def __init__(self, model, name: str):
+        self._model = model
+        self._name = name
+        self._label = type(model).__name__
+
+    def process(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._model.process(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - started
+            record(self._name, duration * 1000)
+            metrics.observe(
+                "pixima_model_inference_seconds", duration, model=self._label
+            )
+
+    def __getattr__(self, attribute):
+        return getattr(self._model, attribute)
+
+
+def timed_model(model, name: str):
+    if not REQUEST_TIMING and not METRICS_ENABLED:
+        return model
+    return TimedModel(model, name)
+
+
+def begin():
+    "Starts Recording For A Request, Returns The Token For end()"
+    return _stages.set({})
+
+
+def end(token) -> dict:
+    stages = _stages.get()
+    _stages.reset(token)
+    return stages or {}
@@ -0,0 +1,101 @@
+from collections import OrderedDict
+from PiximaStudio.settings import (
+    VERSION_RING_SIZE,
+    VERSION_RING_MEMORY_MB,
+    VERSION_RING_COMPRESS,
+)
+from PiximaTools.Metrics import metrics
+import threading
+import zlib
+import numpy as np
+
+
+class VersionRing:
+    """
+    The Last size Versions Of Each Image Read Or Saved By This Worker, Decoded
+    (Or zlib Compressed With compress), At Most memory_bytes For All Images.
+    \nThe Least Recently Used Version Goes First, Evicted Versions Are Read Back
+    From The Media Store, Where Every Version Is Written Anyway. Arrays Are Copied
+    In And Out, Tools Draw On Their Image In Place.
+    """
+
+    def __init__(self, size: int, memory_bytes: int, compress: bool):
+        self.size = size
+        self.memory_bytes = memory_bytes
+        self.compress = compress
+        self.enabled = size > 0 and memory_bytes > 0
+        # (image_id, index) -> (nbytes, payload), In LRU Order
+        self.entries = OrderedDict()
+        self.counts = {}
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, image_id, index: int):
+        if not self.enabled:
+            return None
+        key = (str(image_id), index)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+        metrics.inc(
+            "pixima_cache_requests_total",
+            cache="version_ring",
+            result="miss" if entry is None else "hit",
+        )
+        if entry is None:
+            return None
+        payload = entry[1]
+        if isinstance(payload, np.ndarray):
+            return payload.copy()
+        shape, dtype, data = payload
+        return np.frombuffer(bytearray(zlib.decompress(data)), dtype=dtype).reshape(
+            shape
+        )
+
+    def put(self, image_id, index: int, image):
+        # Memory-Mapped (Tiled) Images Stay On Disk
+        if not self.enabled or image is None or isinstance(image, np.memmap):
+            return
+        if self.compress:
+            payload = (image.shape, image.dtype.str, zlib.compress(image.tobytes(), 1))
+            nbytes = len(payload[2])
+        else:
+            payload = np.array(image, copy=True)
+            nbytes = payload.nbytes
+        if nbytes > self.memory_bytes:
+            return
+        key = (str(image_id), index)
+        with self._lock:
+            self._remove(key)
+            self.entries[key] = (nbytes, payload)
+            self.counts[key[0]] = self.counts.get(key[0], 0) + 1
+            self.bytes += nbytes
+            if self.counts[key[0]] > self.size:
+                self._remove(next(k for k in self.entries if k[0] == key[0]))
+            while self.bytes > self.memory_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def discard(self, image_id, index: int):
+        "Drops A Version Removed From The Media Store Again"
+        with self._lock:
+            self._remove((str(image_id), index))
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes -= entry[0]
+        self.counts[key[0]] -= 1
+        if not self.counts[key[0]]:
+            del self.counts[key[0]]
+
+
+version_ring = VersionRing(
+    VERSION_RING_SIZE, VERSION_RING_MEMORY_MB * 1024 * 1024, VERSION_RING_COMPRESS
+)
+metrics.register_collector(
+    lambda registry: registry.set_gauge(
+        "pixima_version_ring_bytes", version_ring.bytes
+    )
+)
@@ -0,0 +1,150 @@
+from concurrent.futures import ThreadPoolExecutor
+from PiximaStudio.settings import (
+    MEDIA_ROOT,
+    WRITE_BEHIND,
+    WRITE_BEHIND_WORKERS,
+    WRITE_BEHIND_WAIT_S,
+)
+from PiximaTools.Metrics import metrics
+from uuid import uuid4
+import atexit
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindStore:
+    "Writes Tool Outputs On A Thread Pool After The Response (WRITE_BEHIND)"
+
+    def __init__(self, enabled: bool, workers: int, wait_s: float):
+        self.enabled = enabled
+        self.workers = workers
+        self.wait_s = wait_s
+        self.pending = {}
+        self.cache = {}
+        self._executor = None
+        self._lock = threading.Lock()
+        self.temp_dir = os.path.join(MEDIA_ROOT, ".writebehind")
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                os.makedirs(self.temp_dir, exist_ok=True)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="PiximaWriter"
+                )
+            return self._executor
+
+    @staticmethod
+    def reserve(sub_path: str, name: str = "{}.jpg"):
+        "Claims The Next Index In sub_path, Returns (index, full_path)"
+        os.makedirs(sub_path, exist_ok=True)
+        # Past The Highest Index, Gaps Left By prune_media Are Never Reused
+        stems = (file_name.split(".")[0] for file_name in os.listdir(sub_path))
+        index = 1 + max((int(stem) for stem in stems if stem.isdigit()), default=-1)
+        while True:
+            full_path = os.path.join(sub_path, name.format(index))
+            try:
+                os.close(os.open(full_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return index, full_path
+            except FileExistsError:
+                index += 1
+
+    def submit(self, full_path: str, encode, on_failure=None):
+        "Encodes And Writes full_path In The Background, on_failure() Runs If It Fails"
+        key = os.path.normpath(full_path)
+        executor = self.executor
+        # _write Pops The Entry Under The Same Lock, So It Can Not Finish First
+        with self._lock:
+            future = self.pending[key] = executor.submit(
+                self._write, key, encode, on_failure
+            )
+        return future
+
+    def _write(self, key: str, encode, on_failure=None):
+        try:
+            data = encode()
+            self.cache[key] = data
+            temp_path = os.path.join(self.temp_dir, f"{uuid4()}.jpg")
+            with open(temp_path, "wb") as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            # Atomic, Readers See The Placeholder Or The Whole File
+            os.replace(temp_path, key)
+            metrics.media_written(key, len(data))
+        except Exception:
+            logger.exception("Write-behind failed for %s", key)
+            # An Empty Placeholder Left Behind Would Pass For A Version Forever
+            self.discard(key)
+            if on_failure is not None:
+                try:
+                    on_failure()
+                except Exception:
+                    logger.exception("Write-behind cleanup failed for %s", key)
+            raise
+        finally:
+            with self._lock:
+                self.pending.pop(key, None)
+                self.cache.pop(key, None)
+
+    @staticmethod
+    def discard(full_path: str):
+        "Removes A Reserved Placeholder Whose Output Will Never Be Written"
+        try:
+            if os.path.getsize(full_path) == 0:
+                os.remove(full_path)
+        except OSError:
+            pass
+
+    def read(self, full_path: str):
+        "The Encoded Bytes Of A Pending Output, None Once It Is On Disk"
+        key = os.path.normpath(full_path)
+        future = self.pending.get(key)
+        if future is None:
+            return None
+        data = self.cache.get(key)
+        metrics.inc(
+            "pixima_cache_requests_total",
+            cache="write_behind",
+            result="miss" if data is None else "hit",
+        )
+        if data is not None:
+            return data
+        future.result(timeout=self.wait_s)
+        return None
+
+    def wait(self, full_path: str):
+        "Blocks Until full_path Is Written, Also When Another Process Reserved It"
+        key = os.path.normpath(full_path)
+        future = self.pending.get(key)
+        if future is not None:
+            future.result(timeout=self.wait_s)
+            return
+        deadline = time.monotonic() + self.wait_s
+        while os.path.exists(key) and os.path.getsize(key) == 0:
+            if time.monotonic() > deadline:
+                break
+            time.sleep(0.01)
+
+    def flush(self):
+        "Durability On Shutdown: Waits For Every Pending Write"
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+write_behind = WriteBehindStore(
+    WRITE_BEHIND, WRITE_BEHIND_WORKERS, WRITE_BEHIND_WAIT_S
+)
+metrics.register_collector(
+    lambda registry: registry.set_gauge(
+        "pixima_queue_depth", len(write_behind.pending), queue="write_behind"
+    )
+)
+atexit.register(write_behind.flush)
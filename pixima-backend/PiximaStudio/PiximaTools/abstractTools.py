@@ -1,28 +1,109 @@
 from abc import ABC, abstractmethod
-from PiximaStudio.settings import MEDIA_ROOT, MEDIA_URL
-from skimage.io import imsave, imread
+from concurrent.futures import ThreadPoolExecutor
+from PiximaStudio.settings import ENCODE_WORKERS, DELTA_HISTORY
+from skimage.io import imsave
 from PIL import Image
 from uuid import uuid4
 from . import Exceptions
-from Core.models import ImageOperationsModel
+from Core.models import ImageModel, ImageVersion
 from PiximaTools.Exceptions import ImageNotSaved
+from PiximaTools.InferencePool import inference_pool
+from PiximaTools.WriteBehind import write_behind
+from PiximaTools.VersionRing import version_ring
+from PiximaTools import Tiling
+from PiximaTools.DeltaHistory import (
+    DELTA_SUFFIX,
+    encode_delta,
+    read_version,
+    version_depth,
+    write_delta,
+)
+from PiximaTools.Timing import stage, timed, record
+from PiximaTools.Metrics import metrics
+from PiximaStudio.Profiling import tag
+from PiximaStudio.MediaLayout import media_path, media_url
+from io import BytesIO
 import os
 import cv2 
 import math
+import time
+import logging
 import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Shared By All Requests: Version, Preview And Mask Of One Request Encode In Parallel
+encode_executor = ThreadPoolExecutor(
+    max_workers=max(ENCODE_WORKERS, 1), thread_name_prefix="PiximaEncode"
+)
+
+
+def _discard(*paths):
+    "Removes Outputs Whose Write Failed Or Never Ran, Left Empty They Pass For Files"
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _timed(write):
+    started = time.perf_counter()
+    write()
+    return (time.perf_counter() - started) * 1000
+
+
+metrics.register_collector(
+    lambda registry: registry.set_gauge(
+        "pixima_queue_depth", encode_executor._work_queue.qsize(), queue="encode"
+    )
+)
+
+
 class Tool(ABC):
+    # Tools Changing A Small Region (Eyes, Nose, Teeth, Lips), With DELTA_HISTORY
+    # Their Versions Are Stored As The Changed Patch Against The Version Read
+    region_local = False
+    # Tools Running Band By Band (PiximaTools.Tiling) On Images Past
+    # TILING_MIN_MEGAPIXELS, Which They Read Into A Memory-Mapped Array
+    tileable = False
+
     @classmethod
     @abstractmethod
     def apply(self, *args, **kwargs):
         pass
 
+    def process(self, *args, **kwargs):
+        "Runs apply, In The Inference Pool When The Tool Is Listed In INFERENCE_POOL_TOOLS"
+        tool = type(self).__name__
+        image = getattr(self, "Image", None)
+        if image is not None:
+            tag(tool=tool, image=f"{image.shape[1]}x{image.shape[0]}")
+            metrics.observe(
+                "pixima_image_megapixels",
+                image.shape[0] * image.shape[1] / 1e6,
+                tool=tool,
+            )
+        started = time.perf_counter()
+        try:
+            with stage("apply"):
+                if inference_pool.handles(self):
+                    return inference_pool.apply(self)
+                return self.apply(*args, **kwargs)
+        finally:
+            metrics.observe(
+                "pixima_tool_seconds", time.perf_counter() - started, tool=tool
+            )
+
     def add_quality_dict(self, quality_dict: dict = {"High": 70, "Mid": 40, "Low": 15}):
         self.quality = quality_dict
         return self
 
+    @timed("decode")
     def file2image(self, file):
         img = Image.open(file)
-        self.Image = np.array(img)
+        image = Tiling.spill(img) if self.tileable else None
+        self.Image = np.array(img) if image is None else image
         self.add_id(uuid4())
         return self
 
@@ -51,56 +132,130 @@ class Tool(ABC):
         self.Image = img
         return self
 
+    def add_image_model(self, image_model):
+        "The ImageModel Validated By The Serializer Handler, Saves Looking It Up"
+        self.image_model = image_model
+        return self
+
     def add_image_index(self, index):
-        if index ==-1:
-            index = ImageOperationsModel.objects.filter(image=str(self.directory_id)).count()
+        image_model = getattr(self, "image_model", None)
+        if index == -1 and image_model is not None:
+            index = image_model.operations_count
+        elif index == -1:
+            with stage("db"):
+                index = (
+                    ImageModel.objects.filter(pk=str(self.directory_id))
+                    .values_list("operations_count", flat=True)
+                    .first()
+                    or 0
+                )
         self.image_index = index
         return self
 
+    @timed("read_image")
     def read_image(self, image_index: int = -1, path=None):
         if self.directory_id is None:
             raise Exceptions.NeedDirectoryID("Need Directory id")
         try:
             if path is not None:
-                img_path = path
-            elif image_index != -1:
-                img_path = os.path.join(
-                    MEDIA_ROOT, "Images", str(self.directory_id), f"{image_index}.jpg"
-                )
+                img_path, index, cached = path, None, None
+            else:
+                index = image_index if image_index != -1 else self.image_index
+                img_path = media_path("Images", self.directory_id, f"{index}.jpg")
+                cached = version_ring.get(self.directory_id, index)
+            if cached is not None:
+                self.Image = cached
             else:
-                img_path = os.path.join(
-                    MEDIA_ROOT,
-                    "Images",
-                    str(self.directory_id),
-                    f"{self.image_index}.jpg",
+                write_behind.wait(img_path)
+                self.Image = self.decode_version(img_path)
+                if index is not None:
+                    version_ring.put(self.directory_id, index, self.Image)
+            if DELTA_HISTORY and self.region_local and index is not None:
+                # Copied, Tools Draw On self.Image In Place
+                self.delta_parent = (
+                    index,
+                    version_depth(img_path),
+                    self.Image.copy(),
                 )
-            self.Image = imread(img_path)
             return self
         except Exception as e:
             raise Exceptions.ImageNotFound("Error In Loading Image")
 
-    def save_image(self, *args, **kwargs):
+    def decode_version(self, img_path: str):
+        "Large Full Versions Read By Tileable Tools Are Spilled To A Memory Map"
+        if self.tileable and os.path.exists(img_path):
+            with Image.open(img_path) as img:
+                image = Tiling.spill(img)
+            if image is not None:
+                return image
+        return read_version(img_path)
+
+    def save_image(self, *args, defer=None, **kwargs):
         if "id" in kwargs.keys():
             self.directory_id = kwargs["id"]
         if "quality" in kwargs.keys():
             quality = kwargs["quality"]
         else:
             quality = 90
+        self.version_path = self.version_file = None
         try:
-            sub_path = os.path.join(MEDIA_ROOT, "Images", str(self.directory_id))
-            if not os.path.exists(sub_path):
-                os.mkdir(sub_path)
-            self.lastidx = len(os.listdir(sub_path))
-            full_path = os.path.join(sub_path, f"{self.lastidx}.jpg")
-            imsave(full_path, self.Image, quality=quality)
-            image_path = os.path.join(
-                MEDIA_URL, "Images", str(self.directory_id), f"{self.lastidx}.jpg"
-            )
+            sub_path = media_path("Images", self.directory_id)
+            delta = self.encode_delta(quality)
+            if delta is not None:
+                self.lastidx, full_path = write_behind.reserve(
+                    sub_path, "{}" + DELTA_SUFFIX
+                )
+                self.version_file = full_path
+                try:
+                    write_delta(full_path, delta)
+                except Exception:
+                    _discard(full_path)
+                    raise
+                metrics.media_written(full_path, len(delta))
+                self.index_version(
+                    media_path("Images", self.directory_id, f"{self.lastidx}.jpg"),
+                    stored_path=full_path,
+                )
+            elif write_behind.enabled:
+                self.lastidx, full_path = write_behind.reserve(sub_path)
+                self.version_file = full_path
+                # Indexed First, A Failed Write Drops The Row Again
+                self.index_version(full_path, written=False)
+                write_behind.submit(
+                    full_path,
+                    self.jpeg_encoder(self.Image, quality=quality),
+                    on_failure=self.unindex_version(self.lastidx),
+                )
+            elif defer is not None:
+                self.lastidx, full_path = write_behind.reserve(sub_path)
+                # Indexed By save_outputs Once The Deferred Write Is Done
+                self.version_path = full_path
+                image = self.Image
+                defer(
+                    lambda: (
+                        imsave(full_path, image, quality=quality),
+                        metrics.media_written(full_path),
+                    ),
+                    full_path,
+                )
+            else:
+                self.lastidx, full_path = write_behind.reserve(sub_path)
+                self.version_file = full_path
+                try:
+                    imsave(full_path, self.Image, quality=quality)
+                except Exception:
+                    _discard(full_path)
+                    raise
+                metrics.media_written(full_path)
+                self.index_version(full_path)
+            if getattr(self, "image_model", None) is not None:
+                version_ring.put(self.directory_id, self.lastidx, self.Image)
+            image_path = media_url("Images", self.directory_id, f"{self.lastidx}.jpg")
             return image_path
         except Exception as e:
             raise Exceptions.ImageNotSaved("Error In Saving Image")
 
-    def get_preview(self):
+    def get_preview(self, defer=None):
         quality = self.quality["High"]
         if self.preview == "Low":
             quality = self.quality["Low"]
@@ -108,32 +263,159 @@ class Tool(ABC):
             quality = self.quality["Mid"]
 
         if quality == 90:
-            return os.path.join(
-                MEDIA_URL, "Images", str(self.directory_id), f"{self.lastidx}.jpg"
-            )
+            return media_url("Images", self.directory_id, f"{self.lastidx}.jpg")
         if self.lastidx is None:
             raise Exceptions.ImageIndexNotFound("Please Call Save Image First!!")
 
-        dir_path = os.path.join(MEDIA_ROOT, "Temp", str(self.directory_id))
-        if not os.path.exists(dir_path):
-            os.mkdir(dir_path)
-        image_path = os.path.join(
-            MEDIA_ROOT,
-            "Temp",
-            str(self.directory_id),
-            f"{self.lastidx}_{self.preview}.jpg",
-        )
+        preview_name = f"{self.lastidx}_{self.preview}.jpg"
+        os.makedirs(media_path("Temp", self.directory_id), exist_ok=True)
+        image_path = media_path("Temp", self.directory_id, preview_name)
         try:
-            Image.fromarray(self.Image).save(image_path, optimize=True, quality=quality)
-            return os.path.join(
-                MEDIA_URL,
-                "Temp",
-                str(self.directory_id),
-                f"{self.lastidx}_{self.preview}.jpg",
-            )
+            if write_behind.enabled:
+                write_behind.submit(
+                    image_path,
+                    self.jpeg_encoder(self.Image, optimize=True, quality=quality),
+                )
+            elif defer is not None:
+                image = self.Image
+                defer(
+                    lambda: (
+                        Image.fromarray(image).save(
+                            image_path, optimize=True, quality=quality
+                        ),
+                        metrics.media_written(image_path),
+                    ),
+                    image_path,
+                )
+            else:
+                Image.fromarray(self.Image).save(
+                    image_path, optimize=True, quality=quality
+                )
+                metrics.media_written(image_path)
+            return media_url("Temp", self.directory_id, preview_name)
         except Exception as e:
             raise Exceptions.ImageNotSaved("Error While Saving Preview Image")
 
+    def save_outputs(self, with_mask: bool = False):
+        "save_image, get_preview (And save_mask) In One Call, Returns Their Paths"
+        steps = [("Image", self.save_image), ("ImagePreview", self.get_preview)]
+        if with_mask:
+            steps.append(("Mask", self.save_mask))
+        if write_behind.enabled or ENCODE_WORKERS < 2:
+            with stage("encode"):
+                paths = [self.save_image()]
+                try:
+                    paths.extend(step() for _, step in steps[1:])
+                except Exception:
+                    # No Operation Is Recorded For The Version, Drop It Again
+                    self.drop_version()
+                    raise
+                return tuple(paths)
+
+        started = time.perf_counter()
+        paths, jobs = [], []
+        try:
+            for name, step in steps:
+                paths.append(
+                    step(
+                        defer=lambda write, path, name=name: jobs.append(
+                            (name, write, path)
+                        )
+                    )
+                )
+        except Exception:
+            # Reserved By The Earlier Steps, Never Written
+            _discard(*(path for _, _, path in jobs))
+            raise
+        futures = [
+            (name, path, encode_executor.submit(_timed, write))
+            for name, write, path in jobs
+        ]
+        timings, failed = {}, []
+        # Every Future Is Awaited, None Is Still Writing When Failures Are Removed
+        for name, path, future in futures:
+            try:
+                timings[name] = future.result()
+            except Exception:
+                failed.append(path)
+        if failed:
+            _discard(*failed)
+            raise Exceptions.ImageNotSaved("Error In Saving Image")
+        timings["wall"] = (time.perf_counter() - started) * 1000
+        self.encode_timings = timings
+        record("encode", timings["wall"])
+        logger.debug(
+            "%s outputs encoded in %.1f ms (%.1f ms serial)",
+            type(self).__name__,
+            timings["wall"],
+            sum(value for name, value in timings.items() if name != "wall"),
+        )
+        if self.version_path is not None:
+            self.index_version(self.version_path)
+        return tuple(paths)
+
+    def encode_delta(self, quality: int):
+        "The .delta Of The New Version, None When A Full Version Is Written"
+        parent = getattr(self, "delta_parent", None)
+        if parent is None:
+            return None
+        self.delta_parent = None
+        parent_index, parent_depth, parent_image = parent
+        return encode_delta(
+            parent_index, parent_depth, parent_image, self.Image, quality=quality
+        )
+
+    def index_version(self, full_path: str, written: bool = True, stored_path=None):
+        "ImageVersion Row Of The Saved Version, Skipped Without An ImageModel"
+        if getattr(self, "image_model", None) is None:
+            return
+        height, width = self.Image.shape[:2]
+        ImageVersion.objects.record(
+            self.directory_id,
+            self.lastidx,
+            full_path,
+            written=written,
+            stored_path=stored_path,
+            width=width,
+            height=height,
+            tool=type(self).__name__,
+        )
+
+    def unindex_version(self, index: int):
+        "Callable Dropping The ImageVersion Row Of A Version That Was Not Written"
+        image_id = self.directory_id
+
+        def unindex():
+            ImageVersion.objects.filter(image_id=image_id, index=index).delete()
+
+        return unindex
+
+    def drop_version(self):
+        "Removes The Version Written By save_image, Its File And Its ImageVersion Row"
+        if self.version_file is None:
+            return
+        try:
+            # A Pending Write-Behind Would Land After The Removal
+            write_behind.wait(self.version_file)
+        except Exception:
+            pass
+        _discard(self.version_file)
+        version_ring.discard(self.directory_id, self.lastidx)
+        if getattr(self, "image_model", None) is not None:
+            self.unindex_version(self.lastidx)()
+        self.version_file = None
+
+    @staticmethod
+    def jpeg_encoder(image, **params):
+        "Deferred JPEG Encode For The Write-Behind Store"
+
+        def encode():
+            buffer = BytesIO()
+            Image.fromarray(image).save(buffer, format="JPEG", **params)
+            return buffer.getvalue()
+
+        return encode
+
     def normalize8(self, I):
         mn = I.min()
         mx = I.max()
@@ -163,17 +445,34 @@ class BodyTool(Tool,ABC):
     def apply(self, *args, **kwargs):
         pass
 
-    def save_mask(self, *args, **kwargs):
+    def save_mask(self, *args, defer=None, **kwargs):
+        # Own Index, self.lastidx Stays The Version Index Used By get_preview
         try:
-            sub_path = os.path.join(MEDIA_ROOT, "ImageMasks", str(self.directory_id))
-            if not os.path.exists(sub_path):
-                os.mkdir(sub_path)
-            self.lastidx = len(os.listdir(sub_path))
-            full_path = os.path.join(sub_path, f"{self.lastidx}.jpg")
-            cv2.imwrite(full_path, self.Mask)
-            mask_path = os.path.join(
-                MEDIA_URL, "ImageMasks", str(self.directory_id), f"{self.lastidx}.jpg"
-            )
+            sub_path = media_path("ImageMasks", self.directory_id)
+            mask = self.Mask
+            if write_behind.enabled:
+                mask_idx, full_path = write_behind.reserve(sub_path)
+                write_behind.submit(
+                    full_path, lambda: cv2.imencode(".jpg", mask)[1].tobytes()
+                )
+            elif defer is not None:
+                mask_idx, full_path = write_behind.reserve(sub_path)
+                defer(
+                    lambda: (
+                        cv2.imwrite(full_path, mask),
+                        metrics.media_written(full_path),
+                    ),
+                    full_path,
+                )
+            else:
+                mask_idx, full_path = write_behind.reserve(sub_path)
+                try:
+                    cv2.imwrite(full_path, mask)
+                except Exception:
+                    _discard(full_path)
+                    raise
+                metrics.media_written(full_path)
+            mask_path = media_url("ImageMasks", self.directory_id, f"{mask_idx}.jpg")
             return mask_path
         except Exception as e:
             raise ImageNotSaved("Error In Save Image Mask")
@@ -0,0 +1,26 @@
+# gunicorn -c gunicorn.conf.py PiximaStudio.wsgi
+import multiprocessing
+import os
+from PiximaStudio.settings import PRELOAD_MODELS
+
+bind = os.environ.get("PIXIMA_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("PIXIMA_WORKERS", multiprocessing.cpu_count()))
+# With PRELOAD_MODELS the app and the model weights are imported once in the master
+# and shared copy-on-write, wsgi.py then starts warm-up and the sweeper after each
+# fork. Without it every worker imports the app and warms up on its own, the master
+# never loads TensorFlow or MediaPipe
+preload_app = PRELOAD_MODELS
+
+
+def on_starting(server):
+    # Metrics files of the previous run would be merged into this one
+    import shutil
+    from PiximaStudio.settings import METRICS_DIR
+
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+
+
+def post_fork(server, worker):
+    from PiximaTools.AI_Models import worker_memory_report
+
+    server.log.info("worker %s forked, memory %s", worker.pid, worker_memory_report())